@@ -1,22 +1,90 @@
 from __future__ import annotations
 
-from datetime import datetime
+from collections import defaultdict
+from datetime import date
 from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
 import pandas as pd
 
+from . import metrics
+from .config import MONEY_SCALE, QTY_SCALE
+from .records import RecordStore
 
-__all__ = ["analyse"]
 
+__all__ = ["analyse", "to_fixed_frame", "TradeAggregator"]
 
-def _best_routes(buys: pd.DataFrame, sells: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
-    """Return top profitable buy→sell routes per commodity."""
+_MONEY_COLUMNS = ("price", "amount", "shopPricePerCentiSCU")
+# fixed-point money / fixed-point quantity → aUEC per SCU
+_UNIT = QTY_SCALE / MONEY_SCALE
+
+
+def _route_table(
+    buy_avg: pd.DataFrame, sell_avg: pd.DataFrame, top_n: int = 5, pairs: int = 1
+) -> pd.DataFrame:
+    """Rank buy→sell shop pairs from mean unit prices per (resource, shop).
+
+    Only the ``pairs`` cheapest buy shops and ``pairs`` dearest sell shops of
+    each commodity can form its ``pairs`` best routes, so the cross join is
+    bounded by ``pairs²`` rows per commodity.  Returns the ``top_n`` most
+    profitable commodities, best pair first.
+    """
+    if buy_avg.empty or sell_avg.empty:
+        return pd.DataFrame()
+
+    buy_avg = buy_avg.assign(unit_price=buy_avg.unit_price.astype(float))
+    sell_avg = sell_avg.assign(unit_price=sell_avg.unit_price.astype(float))
+    cheapest = (
+        buy_avg.sort_values(["resourceGUID", "unit_price"], kind="stable")
+        .groupby("resourceGUID", sort=False)
+        .head(pairs)
+    )
+    dearest = (
+        sell_avg.sort_values(
+            ["resourceGUID", "unit_price"], ascending=[True, False], kind="stable"
+        )
+        .groupby("resourceGUID", sort=False)
+        .head(pairs)
+    )
+    routes = cheapest.merge(dearest, on="resourceGUID", suffixes=("_buy", "_sell"))
+    routes["profitPerUnit"] = routes.unit_price_sell - routes.unit_price_buy
+    routes = routes[routes.profitPerUnit > 0]
+    if routes.empty:
+        return pd.DataFrame()
+
+    routes = routes.sort_values(
+        ["resourceGUID", "profitPerUnit"], ascending=[True, False], kind="stable"
+    )
+    routes = routes.groupby("resourceGUID", sort=False).head(pairs)
+    best = routes.groupby("resourceGUID", sort=False).profitPerUnit.transform("max")
+    routes = routes.assign(_best=best).sort_values(
+        ["_best", "resourceGUID", "profitPerUnit"],
+        ascending=[False, True, False],
+        kind="stable",
+    )
+    keep = routes.resourceGUID.drop_duplicates().head(top_n)
+    routes = routes[routes.resourceGUID.isin(keep)]
+    return routes.rename(
+        columns={"shopId_buy": "buyShopId", "shopId_sell": "sellShopId"}
+    )[["resourceGUID", "buyShopId", "sellShopId", "profitPerUnit"]].reset_index(
+        drop=True
+    )
+
+
+def _unit_price(value: pd.Series, quantity: pd.Series) -> pd.Series:
+    """aUEC per SCU from fixed-point money and quantity columns."""
+    return value / quantity * _UNIT
+
+
+def _best_routes(
+    buys: pd.DataFrame, sells: pd.DataFrame, top_n: int = 5, pairs: int = 1
+) -> pd.DataFrame:
+    """Return the best buy→sell routes of the top profitable commodities."""
     if buys.empty or sells.empty:
         return pd.DataFrame()
 
-    buy_unit = buys.assign(unit_price=buys.price / buys.quantity)
-    sell_unit = sells.assign(unit_price=sells.amount / sells.quantity)
+    buy_unit = buys.assign(unit_price=_unit_price(buys.price, buys.quantity))
+    sell_unit = sells.assign(unit_price=_unit_price(sells.amount, sells.quantity))
 
     buy_avg = (
         buy_unit.groupby(["resourceGUID", "shopId"]).unit_price.mean().reset_index()
@@ -24,29 +92,7 @@ def _best_routes(buys: pd.DataFrame, sells: pd.DataFrame, top_n: int = 5) -> pd.
     sell_avg = (
         sell_unit.groupby(["resourceGUID", "shopId"]).unit_price.mean().reset_index()
     )
-
-    routes = []
-    for res in set(buy_avg.resourceGUID) & set(sell_avg.resourceGUID):
-        buy_opts = buy_avg[buy_avg.resourceGUID == res]
-        sell_opts = sell_avg[sell_avg.resourceGUID == res]
-        best_buy = buy_opts.sort_values("unit_price").iloc[0]
-        best_sell = sell_opts.sort_values("unit_price", ascending=False).iloc[0]
-        profit = best_sell.unit_price - best_buy.unit_price
-        if profit <= 0:
-            continue
-        routes.append(
-            {
-                "resourceGUID": res,
-                "buyShopId": best_buy.shopId,
-                "sellShopId": best_sell.shopId,
-                "profitPerUnit": float(profit),
-            }
-        )
-
-    if not routes:
-        return pd.DataFrame()
-    df_routes = pd.DataFrame(routes).sort_values("profitPerUnit", ascending=False)
-    return df_routes.head(top_n)
+    return _route_table(buy_avg, sell_avg, top_n, pairs)
 
 
 def _pending_inventory(buys: pd.DataFrame, sells: pd.DataFrame) -> pd.DataFrame:
@@ -54,7 +100,7 @@ def _pending_inventory(buys: pd.DataFrame, sells: pd.DataFrame) -> pd.DataFrame:
     if buys.empty:
         return pd.DataFrame()
 
-    buys_unit = buys.assign(price_per_scu=buys.price / buys.quantity)
+    buys_unit = buys.assign(price_per_scu=_unit_price(buys.price, buys.quantity))
 
     # Stats from buys: quantity purchased, spend and max unit price (per SCU)
     buy_stats = buys_unit.groupby("resourceGUID").agg(
@@ -72,17 +118,18 @@ def _pending_inventory(buys: pd.DataFrame, sells: pd.DataFrame) -> pd.DataFrame:
     else:
         sells_unit = sells.assign(unit_price=sells.amount / sells.quantity)
         best_shops = (
-            sells_unit.sort_values("unit_price", ascending=False)
+            sells_unit.sort_values("unit_price", ascending=False, kind="stable")
             .drop_duplicates("resourceGUID")
             .set_index("resourceGUID")["shopId"]
         )
 
     pending = buy_stats.join(sell_stats, how="left").fillna(0)
-    pending["pending_qty"] = pending.bought_qty - pending.sold_qty
+    pending["pending_qty"] = (pending.bought_qty - pending.sold_qty).astype("int64")
     pending = pending[pending.pending_qty > 0].copy()
     pending["pending_uec"] = (
-        pending.pending_qty * pending.maxPriceperSCU
+        pending.pending_qty / QTY_SCALE * pending.maxPriceperSCU
     ).fillna(0)
+    pending["pending_qty"] = pending.pending_qty / QTY_SCALE
     pending["suggested shopId"] = (
         pending.index.map(best_shops).fillna("noShopId")
     )
@@ -93,18 +140,16 @@ def _pending_inventory(buys: pd.DataFrame, sells: pd.DataFrame) -> pd.DataFrame:
 
 
 def _records(df: pd.DataFrame) -> List[dict]:
-    """Convert a DataFrame to a list of dicts with Decimals cast to float."""
+    """Convert a DataFrame to a list of JSON-ready dicts.
+
+    Numeric columns are native dtypes, so only datetime columns need a
+    conversion and it is done column-wise rather than per cell.
+    """
     if df.empty:
         return []
-    records = []
-    for rec in df.to_dict("records"):
-        for k, v in rec.items():
-            if isinstance(v, Decimal):
-                rec[k] = float(v)
-            elif isinstance(v, (datetime, pd.Timestamp)):
-                rec[k] = v.isoformat()
-        records.append(rec)
-    return records
+    for col in df.columns[[dtype.kind == "M" for dtype in df.dtypes]]:
+        df = df.assign(**{col: df[col].map(pd.Timestamp.isoformat)})
+    return df.to_dict("records")
 
 
 def _last_transactions(df: pd.DataFrame) -> pd.DataFrame:
@@ -140,17 +185,18 @@ def _last_transactions(df: pd.DataFrame) -> pd.DataFrame:
     buy_mask = last.operation == "Buy"
     sell_mask = last.operation == "Sell"
 
-    last.loc[buy_mask, "cost_sc"] = last.loc[buy_mask, "price"].astype(float)
+    last.loc[buy_mask, "cost_sc"] = last.loc[buy_mask, "price"] / MONEY_SCALE
 
     if sell_mask.any():
         avg_cost = last.loc[sell_mask, "resourceGUID"].map(unit_cost).fillna(0)
         last.loc[sell_mask, "profit_sc"] = (
             last.loc[sell_mask, "amount"]
             - avg_cost * last.loc[sell_mask, "quantity"]
-        ).astype(float)
+        ) / MONEY_SCALE
 
+    last["quantity"] = last.quantity / QTY_SCALE
     last["timestamp"] = last.timestamp.dt.strftime("%Y-%m-%d %H:%M:%S")
-    return last.sort_values("timestamp", ascending=False)[
+    return last.sort_values("timestamp", ascending=False, kind="stable")[
         [
             "shopId",
             "operation",
@@ -168,10 +214,6 @@ def _daily_profit_series(buys: pd.DataFrame, sells: pd.DataFrame) -> Dict[str, L
     if buys.empty and sells.empty:
         return {"labels": [], "values": []}
 
-    # ensure date column
-    all_ops = pd.concat([buys, sells], ignore_index=True)
-    all_ops["date"] = all_ops.timestamp.dt.date
-
     buy_daily = buys.groupby(buys.timestamp.dt.date).price.sum()
     sell_daily = sells.groupby(sells.timestamp.dt.date).amount.sum()
 
@@ -179,49 +221,88 @@ def _daily_profit_series(buys: pd.DataFrame, sells: pd.DataFrame) -> Dict[str, L
 
     return {
         "labels": [d.isoformat() for d in daily.index],
-        "values": [float(v) for v in daily.values],
+        "values": [int(v) / MONEY_SCALE for v in daily.values],
     }
 
 
-def _summary_table_buy(buys: pd.DataFrame) -> pd.DataFrame:
-    if buys.empty:
+def _kpi(buys: pd.DataFrame, sells: pd.DataFrame) -> dict:
+    # Total profit calculation, exact on the integer columns
+    total_profit = int(sells.amount.sum()) - int(buys.price.sum())
+    return {
+        "total_profit_sc": total_profit / MONEY_SCALE,
+        "total_buys": int(len(buys)),
+        "total_sells": int(len(sells)),
+    }
+
+
+def _summary_table(df: pd.DataFrame, value: str, label: str) -> pd.DataFrame:
+    if df.empty:
         return pd.DataFrame()
-    buys_unit = buys.assign(price_per_scu=buys.price / buys.quantity)
+    unit = df.assign(
+        quantity=df.quantity / QTY_SCALE,
+        unit_price=_unit_price(df[value], df.quantity),
+    )
     return (
-        buys_unit.groupby(["shopId", "resourceGUID"])
+        unit.groupby(["shopId", "resourceGUID"])
         .agg(
             minQuantity=("quantity", "min"),
             avgQuantity=("quantity", "mean"),
             maxQuantity=("quantity", "max"),
-            minPriceperSCU=("price_per_scu", "min"),
-            avgPriceperSCU=("price_per_scu", "mean"),
-            maxPriceperSCU=("price_per_scu", "max"),
+            **{
+                f"min{label}": ("unit_price", "min"),
+                f"avg{label}": ("unit_price", "mean"),
+                f"max{label}": ("unit_price", "max"),
+            },
         )
         .reset_index()
     )
 
 
+def _summary_table_buy(buys: pd.DataFrame) -> pd.DataFrame:
+    return _summary_table(buys, "price", "PriceperSCU")
+
+
 def _summary_table_sell(sells: pd.DataFrame) -> pd.DataFrame:
-    if sells.empty:
-        return pd.DataFrame()
-    sells = sells.copy()
-    sells["amountSell"] = sells.amount / sells.quantity
-    return (
-        sells.groupby(["shopId", "resourceGUID"])
-        .agg(
-            minQuantity=("quantity", "min"),
-            avgQuantity=("quantity", "mean"),
-            maxQuantity=("quantity", "max"),
-            minAmountSell=("amountSell", "min"),
-            avgAmountSell=("amountSell", "mean"),
-            maxAmountSell=("amountSell", "max"),
-        )
-        .reset_index()
+    return _summary_table(sells, "amount", "AmountSell")
+
+
+def _to_fixed(values: pd.Series, scale: int) -> pd.Series:
+    """Scale Decimal/float/int values to an int64 fixed-point column."""
+    return pd.Series(
+        [round(v * scale) for v in values], index=values.index, dtype="int64"
     )
 
 
-def analyse(df: pd.DataFrame) -> dict:
-    """Compute KPIs and summaries from the combined log DataFrame."""
+def to_fixed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` with quantity and money columns as int64 fixed-point.
+
+    Quantities become centi-SCU (``QTY_SCALE``) and prices/amounts
+    micro-aUEC (``MONEY_SCALE``); sums over them are exact and every
+    aggregation in this module runs on native NumPy dtypes.
+    """
+    out = df.copy()
+    out["quantity"] = _to_fixed(df.quantity, QTY_SCALE)
+    for col in _MONEY_COLUMNS:
+        if col in df:
+            out[col] = _to_fixed(df[col], MONEY_SCALE)
+    return out
+
+
+def analyse(
+    df: pd.DataFrame, route_pairs: int = 1, numeric: str = "decimal"
+) -> dict:
+    """Compute KPIs and summaries from the combined log DataFrame.
+
+    ``route_pairs`` is the number of buy/sell shop pairs listed per commodity
+    in ``best_routes``.  ``numeric="fixed"`` declares that the numeric
+    columns already hold the fixed-point integers produced by
+    ``iter_records(..., numeric="fixed")``; otherwise they are converted once
+    on entry.  A :class:`RecordStore` may be passed instead of a DataFrame.
+    """
+    timed = metrics.timed
+    if isinstance(df, RecordStore):
+        with timed("analysis.dataframe"):
+            df, numeric = df.to_frame(), "fixed"
     if df.empty:
         return {
             "kpi": {
@@ -234,29 +315,32 @@ def analyse(df: pd.DataFrame) -> dict:
             "sell_summary": [],
         }
 
-    # filter out zero / negative qty rows, copy to avoid SettingWithCopy
-    df = df[df.quantity > 0].copy()
+    with timed("analysis.dataframe"):
+        if numeric != "fixed":
+            df = to_fixed_frame(df)
 
-    buys = df[df.operation == "Buy"].copy()
-    sells = df[df.operation == "Sell"].copy()
+        # filter out zero / negative qty rows, copy to avoid SettingWithCopy
+        df = df[df.quantity > 0].copy()
 
-    # Total profit calculation
-    total_profit = sells.amount.sum() - buys.price.sum()
+        buys = df[df.operation == "Buy"].copy()
+        sells = df[df.operation == "Sell"].copy()
 
-    kpi = {
-        "total_profit_sc": float(total_profit),
-        "total_buys": int(len(buys)),
-        "total_sells": int(len(sells)),
-    }
+    with timed("analysis.kpi"):
+        kpi = _kpi(buys, sells)
 
-    daily_profit = _daily_profit_series(buys, sells)
+    with timed("analysis.daily_profit"):
+        daily_profit = _daily_profit_series(buys, sells)
 
-    buy_summary = _records(_summary_table_buy(buys))
-    sell_summary = _records(_summary_table_sell(sells))
+    with timed("analysis.summaries"):
+        buy_summary = _records(_summary_table_buy(buys))
+        sell_summary = _records(_summary_table_sell(sells))
 
-    best_routes = _records(_best_routes(buys, sells))
-    pending_goods = _records(_pending_inventory(buys, sells))
-    last_transactions = _records(_last_transactions(df))
+    with timed("analysis.best_routes"):
+        best_routes = _records(_best_routes(buys, sells, pairs=route_pairs))
+    with timed("analysis.pending_goods"):
+        pending_goods = _records(_pending_inventory(buys, sells))
+    with timed("analysis.last_transactions"):
+        last_transactions = _records(_last_transactions(df))
 
     return {
         "kpi": kpi,
@@ -267,3 +351,212 @@ def analyse(df: pd.DataFrame) -> dict:
         "pending_goods": pending_goods,
         "last_transactions": last_transactions,
     }
+
+
+# ───────────────── incremental engine ──────────────────
+
+
+class _GroupStats:
+    """Running count/sum/min/max of quantity and unit price for one group."""
+
+    __slots__ = ("count", "q_sum", "q_min", "q_max", "u_sum", "u_min", "u_max")
+
+    def __init__(self, qty: Decimal, unit: Decimal) -> None:
+        self.count = 1
+        self.q_sum = self.q_min = self.q_max = qty
+        self.u_sum = self.u_min = self.u_max = unit
+
+    def add(self, qty: Decimal, unit: Decimal) -> None:
+        self.count += 1
+        self.q_sum += qty
+        self.u_sum += unit
+        if qty < self.q_min:
+            self.q_min = qty
+        if qty > self.q_max:
+            self.q_max = qty
+        if unit < self.u_min:
+            self.u_min = unit
+        if unit > self.u_max:
+            self.u_max = unit
+
+    def row(self, prefix: str) -> dict:
+        return {
+            "minQuantity": float(self.q_min),
+            "avgQuantity": float(self.q_sum / self.count),
+            "maxQuantity": float(self.q_max),
+            f"min{prefix}": float(self.u_min),
+            f"avg{prefix}": float(self.u_sum / self.count),
+            f"max{prefix}": float(self.u_max),
+        }
+
+
+class TradeAggregator:
+    """Stateful counterpart of :func:`analyse` that is fed records as they arrive.
+
+    ``add`` updates running sums, counts and extremes per (shopId,
+    resourceGUID), per day, per resource and per shop in O(1); ``result``
+    only walks those groups and returns the same dict shape as ``analyse``.
+    """
+
+    def __init__(self) -> None:
+        self.seen = 0
+        self.n_buys = 0
+        self.n_sells = 0
+        self.spent = Decimal("0")
+        self.earned = Decimal("0")
+        self.daily: Dict[date, Decimal] = defaultdict(Decimal)
+        self.buy_groups: Dict[tuple, _GroupStats] = {}
+        self.sell_groups: Dict[tuple, _GroupStats] = {}
+        # resourceGUID -> [bought qty, spent, max price per SCU]
+        self.bought: Dict[str, list] = {}
+        self.sold: Dict[str, Decimal] = defaultdict(Decimal)
+        # resourceGUID -> (best single sell unit price, shopId)
+        self.best_sell: Dict[str, tuple] = {}
+        self.last: Dict[str, dict] = {}
+
+    def add(self, rec: dict) -> None:
+        self.seen += 1
+        qty = rec["quantity"]
+        if not qty > 0:
+            return
+        op = rec["operation"]
+        shop, res = rec["shopId"], rec["resourceGUID"]
+        prev = self.last.get(shop)
+        if prev is None or rec["timestamp"] > prev["timestamp"]:
+            self.last[shop] = rec
+
+        if op == "Buy":
+            price = rec["price"]
+            unit = price / qty
+            self.n_buys += 1
+            self.spent += price
+            self.daily[rec["timestamp"].date()] -= price
+            stats = self.buy_groups.get((shop, res))
+            if stats is None:
+                self.buy_groups[(shop, res)] = _GroupStats(qty, unit)
+            else:
+                stats.add(qty, unit)
+            tot = self.bought.get(res)
+            if tot is None:
+                self.bought[res] = [qty, price, unit]
+            else:
+                tot[0] += qty
+                tot[1] += price
+                if unit > tot[2]:
+                    tot[2] = unit
+        elif op == "Sell":
+            amount = rec["amount"]
+            unit = amount / qty
+            self.n_sells += 1
+            self.earned += amount
+            self.daily[rec["timestamp"].date()] += amount
+            stats = self.sell_groups.get((shop, res))
+            if stats is None:
+                self.sell_groups[(shop, res)] = _GroupStats(qty, unit)
+            else:
+                stats.add(qty, unit)
+            self.sold[res] += qty
+            best = self.best_sell.get(res)
+            if best is None or unit > best[0]:
+                self.best_sell[res] = (unit, shop)
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for rec in records:
+            self.add(rec)
+
+    # ────────── result tables ──────────
+    @staticmethod
+    def _summary(groups: Dict[tuple, _GroupStats], prefix: str) -> List[dict]:
+        rows = []
+        for shop, res in sorted(groups):
+            row = {"shopId": shop, "resourceGUID": res}
+            row.update(groups[(shop, res)].row(prefix))
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _mean_prices(groups: Dict[tuple, _GroupStats]) -> pd.DataFrame:
+        rows = sorted(
+            (res, shop, float(st.u_sum / st.count))
+            for (shop, res), st in groups.items()
+        )
+        return pd.DataFrame(rows, columns=["resourceGUID", "shopId", "unit_price"])
+
+    def _best_routes(self, top_n: int = 5, pairs: int = 1) -> List[dict]:
+        return _records(
+            _route_table(
+                self._mean_prices(self.buy_groups),
+                self._mean_prices(self.sell_groups),
+                top_n,
+                pairs,
+            )
+        )
+
+    def _pending(self) -> List[dict]:
+        rows = []
+        for res in sorted(self.bought):
+            qty, _, max_unit = self.bought[res]
+            pending = qty - self.sold.get(res, 0)
+            if not pending > 0:
+                continue
+            best = self.best_sell.get(res)
+            rows.append(
+                {
+                    "resourceGUID": res,
+                    "pending_qty": float(pending),
+                    "pending_uec": float(pending * max_unit),
+                    "suggested shopId": best[1] if best else "noShopId",
+                }
+            )
+        return rows
+
+    def _last_transactions(self) -> List[dict]:
+        rows = []
+        for shop, rec in self.last.items():
+            op = rec["operation"]
+            cost = profit = 0.0
+            if op == "Buy":
+                cost = float(rec["price"])
+            elif op == "Sell":
+                tot = self.bought.get(rec["resourceGUID"])
+                unit_cost = tot[1] / tot[0] if tot else 0
+                profit = float(rec["amount"] - unit_cost * rec["quantity"])
+            rows.append(
+                {
+                    "shopId": shop,
+                    "operation": op,
+                    "resourceGUID": rec["resourceGUID"],
+                    "quantity": float(rec["quantity"]),
+                    "cost_sc": cost,
+                    "profit_sc": profit,
+                    "timestamp": rec["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+                }
+            )
+        rows.sort(key=lambda r: r["timestamp"], reverse=True)
+        return rows
+
+    def result(self, route_pairs: int = 1) -> dict:
+        """Return the current state in the shape produced by ``analyse``."""
+        if not self.seen:
+            return analyse(pd.DataFrame())
+        with metrics.timed("analysis.result"):
+            return self._result(route_pairs)
+
+    def _result(self, route_pairs: int) -> dict:
+        days = sorted(self.daily)
+        return {
+            "kpi": {
+                "total_profit_sc": float(self.earned - self.spent),
+                "total_buys": self.n_buys,
+                "total_sells": self.n_sells,
+            },
+            "daily_profit": {
+                "labels": [d.isoformat() for d in days],
+                "values": [float(self.daily[d]) for d in days],
+            },
+            "buy_summary": self._summary(self.buy_groups, "PriceperSCU"),
+            "sell_summary": self._summary(self.sell_groups, "AmountSell"),
+            "best_routes": self._best_routes(pairs=route_pairs),
+            "pending_goods": self._pending(),
+            "last_transactions": self._last_transactions(),
+        }
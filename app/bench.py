@@ -0,0 +1,212 @@
+"""Stage timings of the parse → analyse → serve pipeline, as plain dicts.
+
+``bench_corpora`` runs these on ``sample-data`` and synthetic corpora for
+``scripts/bench.py``, the command line front end, and for the ``BENCH=1``
+tests; ``compare`` lines two such results up stage by stage.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from . import analysis
+from .hauls import track_hauls
+from .log_parser import collect_files, iter_records, to_fixed
+from .report import render_html
+from .synth import synthetic_records, write_logs
+from .web.hub import dumps
+
+__all__ = [
+    "bench_corpora",
+    "bench_files",
+    "bench_records",
+    "bench_synthetic",
+    "bench_synthetic_logs",
+    "compare",
+    "environment",
+    "time_call",
+]
+
+
+def time_call(fn: Callable, repeat: int = 3) -> Tuple[object, dict]:
+    """Run ``fn`` ``repeat`` times; return its last result and the timings."""
+    times = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return result, {
+        "best_s": round(min(times), 6),
+        "mean_s": round(sum(times) / len(times), 6),
+        "runs": len(times),
+    }
+
+
+def bench_records(records: List[dict], repeat: int = 3) -> Dict[str, dict]:
+    """Time everything after parsing on parser-shaped (Decimal) records."""
+    stages: Dict[str, dict] = {}
+
+    def stage(name: str, fn: Callable):
+        result, stages[name] = time_call(fn, repeat)
+        return result
+
+    fixed = [to_fixed(dict(rec)) for rec in records]
+    df = stage("dataframe", lambda: pd.DataFrame(fixed))
+    df = df[df.quantity > 0]
+    buys = df[df.operation == "Buy"]
+    sells = df[df.operation == "Sell"]
+    for name, fn in (
+        ("kpi", lambda: analysis._kpi(buys, sells)),
+        ("daily_profit_series", lambda: analysis._daily_profit_series(buys, sells)),
+        ("summary_table_buy", lambda: analysis._summary_table_buy(buys)),
+        ("summary_table_sell", lambda: analysis._summary_table_sell(sells)),
+        ("best_routes", lambda: analysis._best_routes(buys, sells)),
+        ("pending_inventory", lambda: analysis._pending_inventory(buys, sells)),
+        ("last_transactions", lambda: analysis._last_transactions(df)),
+    ):
+        stage(f"analysis.{name}", fn)
+    ctx = stage("analyse", lambda: analysis.analyse(df, numeric="fixed"))
+    stage("track_hauls", lambda: track_hauls(records))
+    with tempfile.TemporaryDirectory() as tmp:
+        html = Path(tmp) / "report.html"
+        stage("render_html", lambda: render_html(ctx, html))
+    stage("json.dumps", lambda: json.dumps(ctx))
+    stage("hub.dumps", lambda: dumps(ctx))
+    return stages
+
+
+def bench_files(
+    inputs: Iterable[str], repeat: int = 3, jobs: int = 1
+) -> Tuple[dict, List[dict]]:
+    """Time file discovery and parsing, then :func:`bench_records`.
+
+    The records of the last timed parse feed the later stages, so the
+    corpus is read ``repeat`` times, not once more.  Returns the corpus
+    result and the parsed records.
+    """
+    inputs = list(inputs)
+    files, discover = time_call(lambda: collect_files(inputs), repeat)
+    records, parse = time_call(lambda: list(iter_records(files, jobs=jobs)), repeat)
+    stages = {"collect_files": discover, "iter_records": parse}
+    stages.update(bench_records(records, repeat))
+    size = sum(f.stat().st_size for f in files)
+    return {
+        "files": len(files),
+        "bytes": size,
+        "events": len(records),
+        "parse_mb_per_s": round(size / 1e6 / max(parse["best_s"], 1e-9), 1),
+        "stages": stages,
+    }, records
+
+
+def bench_synthetic(events: int, repeat: int = 3, seed: int = 0, **kw) -> dict:
+    """:func:`bench_records` on ``synthetic_records(events, ...)``."""
+    records = list(synthetic_records(events, seed=seed, **kw))
+    return {"events": len(records), "stages": bench_records(records, repeat)}
+
+
+def bench_synthetic_logs(
+    events: int,
+    repeat: int = 3,
+    files: int = 10,
+    noise: float = 20.0,
+    jobs: int = 1,
+    seed: int = 0,
+    **kw,
+) -> dict:
+    """:func:`bench_files` on logs written by :func:`synth.write_logs`."""
+    records = synthetic_records(events, seed=seed, **kw)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_logs(Path(tmp), records, files=files, noise=noise, seed=seed)
+        result, _ = bench_files([tmp], repeat, jobs)
+    return result
+
+
+def bench_corpora(
+    log_paths: Iterable[str] = (),
+    synthetic: Iterable[int] = (),
+    logs: Iterable[int] = (),
+    repeat: int = 3,
+    jobs: int = 1,
+    noise: float = 20.0,
+    **kw,
+) -> dict:
+    """One result covering every requested corpus, as ``compare`` reads it.
+
+    ``log_paths`` is timed as one corpus named after the paths' last parts
+    (skipped when it holds no logs), each ``synthetic`` count in memory and
+    each ``logs`` count written out as log files; ``kw`` (``shops``,
+    ``resources``, ...) goes to :func:`synth.synthetic_records`.
+    """
+    log_paths = [str(p) for p in log_paths]
+    out = {"environment": environment(), "repeat": repeat, "corpora": {}}
+    if log_paths:
+        result, _ = bench_files(log_paths, repeat, jobs)
+        if result["files"]:
+            name = ",".join(Path(p).name for p in log_paths)
+            out["corpora"][name] = result
+    for n in synthetic:
+        out["corpora"][f"synthetic-{n}"] = bench_synthetic(n, repeat, **kw)
+    for n in logs:
+        out["corpora"][f"logs-{n}"] = bench_synthetic_logs(
+            n, repeat, noise=noise, jobs=jobs, **kw
+        )
+    return out
+
+
+def environment() -> dict:
+    """Where and on what the numbers were taken."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def compare(
+    old: dict, new: dict, threshold: float = 1.2, min_delta: float = 0.005
+) -> List[dict]:
+    """Stage-by-stage ``best_s`` ratios of two results (new / old).
+
+    Rows with ``regressed`` set are at least ``threshold`` times and
+    ``min_delta`` seconds slower; sub-millisecond stages are mostly noise.
+    """
+    rows = []
+    for corpus, result in new.get("corpora", {}).items():
+        before = old.get("corpora", {}).get(corpus)
+        if before is None:
+            continue
+        for stage, timing in result["stages"].items():
+            prev: Optional[dict] = before["stages"].get(stage)
+            if not prev or not prev["best_s"]:
+                continue
+            ratio = timing["best_s"] / prev["best_s"]
+            rows.append({
+                "corpus": corpus,
+                "stage": stage,
+                "old_s": prev["best_s"],
+                "new_s": timing["best_s"],
+                "ratio": round(ratio, 3),
+                "regressed": ratio >= threshold
+                and timing["best_s"] - prev["best_s"] >= min_delta,
+            })
+    return rows
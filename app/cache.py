@@ -0,0 +1,152 @@
+"""On-disk cache of parsed records for log files that have not changed."""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .log_parser import read_records
+
+__all__ = ["RecordCache", "cached_records", "fingerprint"]
+
+# Lives next to ``names.db`` by default; an empty value disables the cache.
+CACHE_PATH = os.environ.get("RECORD_CACHE", "records_cache.db")
+
+_SAMPLE = 64 * 1024
+# mixed into every fingerprint; bump it when the parser's output for an
+# unchanged file changes, so stale entries miss (2: UTF-16 logs are read)
+_PARSER_TAG = b"2"
+_DECIMALS = ("quantity", "shopPricePerCentiSCU", "price", "amount")
+_COLUMNS = (
+    "timestamp",
+    "operation",
+    "shopId",
+    "shopName",
+    "resourceGUID",
+) + _DECIMALS
+_SELECT = (
+    f"SELECT {', '.join(_COLUMNS)} FROM records WHERE path = ? ORDER BY seq"
+)
+_INSERT = f"INSERT INTO records VALUES ({', '.join('?' * (len(_COLUMNS) + 2))})"
+
+
+def fingerprint(path: Path, st: Optional[os.stat_result] = None) -> tuple:
+    """Return ``(size, mtime_ns, digest)`` for ``path``.
+
+    The digest covers the first and last 64 KiB only, so fingerprinting a
+    large log costs two small reads rather than a full pass.
+    """
+    st = st or path.stat()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_PARSER_TAG)
+    with path.open("rb") as fh:
+        h.update(fh.read(_SAMPLE))
+        if st.st_size > _SAMPLE:
+            fh.seek(max(_SAMPLE, st.st_size - _SAMPLE))
+            h.update(fh.read(_SAMPLE))
+    return st.st_size, st.st_mtime_ns, h.hexdigest()
+
+
+def _encode(rec: dict) -> tuple:
+    return (rec["timestamp"].isoformat(),) + tuple(
+        str(rec[col]) for col in _COLUMNS[1:]
+    )
+
+
+def _decode(row: tuple) -> dict:
+    rec = dict(zip(_COLUMNS, row))
+    rec["timestamp"] = datetime.fromisoformat(rec["timestamp"])
+    for col in _DECIMALS:
+        rec[col] = Decimal(rec[col])
+    return rec
+
+
+class RecordCache:
+    """SQLite store of ``_parse_line`` output keyed by file fingerprint."""
+
+    def __init__(self, path: str | Path = CACHE_PATH) -> None:
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                path TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                timestamp TEXT, operation TEXT, shopId TEXT, shopName TEXT,
+                resourceGUID TEXT, quantity TEXT, shopPricePerCentiSCU TEXT,
+                price TEXT, amount TEXT,
+                PRIMARY KEY (path, seq)
+            );
+            """
+        )
+
+    def get(
+        self, path: Path, st: Optional[os.stat_result] = None
+    ) -> Optional[List[dict]]:
+        """Return cached records for ``path`` or ``None`` if stale/missing."""
+        key = str(path.resolve())
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, digest FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        st = st or path.stat()
+        if row[:2] != (st.st_size, st.st_mtime_ns):
+            return None
+        if row != fingerprint(path, st):
+            return None
+        rows = self.conn.execute(_SELECT, (key,))
+        return [_decode(r) for r in rows]
+
+    def put(
+        self, path: Path, records: List[dict], st: Optional[os.stat_result] = None
+    ) -> None:
+        """Store the complete record list parsed from ``path``."""
+        key = str(path.resolve())
+        fp = fingerprint(path, st)
+        with self.conn:
+            self.conn.execute("DELETE FROM records WHERE path = ?", (key,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (key,) + fp
+            )
+            self.conn.executemany(
+                _INSERT, ((key, i) + _encode(rec) for i, rec in enumerate(records))
+            )
+
+    def clear(self) -> None:
+        """Drop every cached file so the next run reparses everything."""
+        with self.conn:
+            self.conn.execute("DELETE FROM records")
+            self.conn.execute("DELETE FROM files")
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def cached_records(
+    paths: list[Path], cache: RecordCache, jobs: int = 1
+) -> Iterator[dict]:
+    """Like ``iter_records`` but only parses files missing from ``cache``."""
+    hits = {p: cache.get(p) for p in paths}
+    misses = [p for p, recs in hits.items() if recs is None]
+    if jobs > 1 and len(misses) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parsed = list(pool.map(read_records, misses))
+    else:
+        parsed = [read_records(p) for p in misses]
+    for path, (records, _) in zip(misses, parsed):
+        cache.put(path, records)
+        hits[path] = records
+    for path in paths:
+        yield from hits[path]
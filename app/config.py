@@ -14,3 +14,8 @@ LINE_RE = (
 FIELD_RE = r"(\w+)\[([^]]+)]"
 
 PRICE_FACTOR = Decimal("1000")  # centi‑SCU → micro‑SCU
+
+# Fixed-point scales used by ``numeric="fixed"``: quantities in centi-SCU and
+# prices/amounts in micro-aUEC (the logs carry six decimals).
+QTY_SCALE = 100
+MONEY_SCALE = 1_000_000
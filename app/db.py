@@ -1,10 +1,63 @@
 import os
-from sqlalchemy import create_engine, Column, String
+import threading
+from collections import deque
+from datetime import datetime
+from decimal import Decimal
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import (
+    create_engine,
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+    select,
+)
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from .config import MONEY_SCALE, QTY_SCALE
+
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./names.db")
 
-engine = create_engine(DATABASE_URL)
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _engine_options(url: str) -> dict:
+    """Connection pool settings from ``DB_POOL_*`` environment variables.
+
+    Server databases keep a pool of open connections, recycled before the
+    server's idle timeout and pinged before reuse; SQLite files are local
+    and keep SQLAlchemy's defaults unless told otherwise.
+    """
+    env = os.environ.get
+    options = {}
+    if not url.startswith("sqlite"):
+        options = {
+            "pool_size": 5,
+            "max_overflow": 10,
+            "pool_recycle": 3600,
+            "pool_pre_ping": True,
+        }
+    for key, name, cast in (
+        ("pool_size", "DB_POOL_SIZE", int),
+        ("max_overflow", "DB_MAX_OVERFLOW", int),
+        ("pool_recycle", "DB_POOL_RECYCLE", int),
+        ("pool_timeout", "DB_POOL_TIMEOUT", float),
+        ("pool_pre_ping", "DB_POOL_PRE_PING", _flag),
+    ):
+        if env(name):
+            options[key] = cast(env(name))
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
@@ -21,32 +74,361 @@ class ShopName(Base):
     name = Column(String(255), nullable=False)
 
 
+class PriceBar(Base):
+    """One OHLC bar of unit prices (see ``app.prices.PriceRollups``)."""
+
+    __tablename__ = "price_bars"
+    resource = Column(String(64), primary_key=True)
+    shop_id = Column(String(64), primary_key=True)  # "" = every shop
+    side = Column(String(4), primary_key=True)
+    resolution = Column(String(8), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)
+    trades = Column(Integer, nullable=False)
+
+
+class TradeEvent(Base):
+    """One parsed commodity request, amounts in fixed point (see ``config``).
+
+    The natural key makes re-ingesting the same log a no-op; it starts with
+    ``timestamp`` and so doubles as the index for time-range reads.
+    """
+
+    __tablename__ = "trade_events"
+    __table_args__ = (
+        UniqueConstraint(
+            "timestamp", "operation", "shop_id", "resource", "quantity",
+            name="uq_trade_events_natural",
+        ),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # MySQL's DATETIME drops fractions unless asked; the unique key below
+    # would then merge repeat trades within the same second
+    timestamp = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql", "mariadb"),
+        nullable=False,
+    )
+    operation = Column(String(8), nullable=False)
+    shop_id = Column(String(64), nullable=False, index=True)
+    shop_name = Column(String(255), nullable=False)
+    resource = Column(String(64), nullable=False, index=True)
+    quantity = Column(BigInteger, nullable=False)  # centi-SCU
+    shop_price = Column(BigInteger, nullable=False)  # micro-aUEC
+    price = Column(BigInteger, nullable=False)
+    amount = Column(BigInteger, nullable=False)
+
+
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
 
 
+# Bumped by every name write; the cached mapping is valid for one version.
+names_version = 0
+_names_cache: Optional[Tuple[int, dict]] = None
+_names_lock = threading.Lock()
+# (version, names written) of recent writes, for incremental relabelling
+_name_log: Deque[Tuple[int, dict]] = deque(maxlen=256)
+
+
+def names_snapshot() -> Tuple[int, dict]:
+    """``(names_version, names)``, read from the database once per version.
+
+    The mapping is shared between callers and must not be modified.
+    Writes through this module invalidate it; writes by other processes
+    sharing the database are not seen until this process writes or restarts.
+    """
+    global _names_cache
+    cached = _names_cache
+    if cached is not None and cached[0] == names_version:
+        return cached
+    with _names_lock:
+        version = names_version
+        with engine.connect() as conn:
+            resources = dict(
+                conn.execute(select(ResourceName.guid, ResourceName.name)).all()
+            )
+            shops = dict(conn.execute(select(ShopName.shop_id, ShopName.name)).all())
+        # a write that raced the read has bumped the version already
+        _names_cache = (version, {"resourceNames": resources, "shopNames": shops})
+        return _names_cache
+
+
 def get_all_names() -> dict:
-    with SessionLocal() as session:
-        resources = {r.guid: r.name for r in session.query(ResourceName).all()}
-        shops = {s.shop_id: s.name for s in session.query(ShopName).all()}
-        return {"resourceNames": resources, "shopNames": shops}
+    """Every stored name as ``{"resourceNames": ..., "shopNames": ...}``."""
+    return names_snapshot()[1]
+
+
+def name_changes(since: int) -> Optional[dict]:
+    """Names written after version ``since``, shaped like ``get_all_names``.
+
+    Returns None when the recent-write log no longer reaches back that far.
+    """
+    with _names_lock:
+        if since < names_version - len(_name_log):
+            return None
+        out: dict = {"resourceNames": {}, "shopNames": {}}
+        for version, written in _name_log:
+            if version > since:
+                for section, mapping in written.items():
+                    out[section].update(mapping)
+        return out
+
+
+def save_names(
+    resources: Optional[Dict[str, str]] = None,
+    shops: Optional[Dict[str, str]] = None,
+) -> int:
+    """Insert or rename many resources and shops in one transaction.
+
+    Returns the new ``names_version``.
+    """
+    global names_version
+    with engine.begin() as conn:
+        for table, key, mapping in (
+            (ResourceName.__table__, "guid", resources),
+            (ShopName.__table__, "shop_id", shops),
+        ):
+            if not mapping:
+                continue
+            rows = [{key: k, "name": v} for k, v in mapping.items()]
+            stmt = _upsert(table, ["name"])
+            if stmt is not None:
+                conn.execute(stmt, rows)
+            else:
+                for row in rows:
+                    if conn.execute(
+                        table.update().where(table.c[key] == row[key]),
+                        {"name": row["name"]},
+                    ).rowcount == 0:
+                        conn.execute(table.insert(), row)
+    with _names_lock:
+        names_version += 1
+        written = {
+            "resourceNames": dict(resources or {}),
+            "shopNames": dict(shops or {}),
+        }
+        _name_log.append((names_version, written))
+        return names_version
 
 
 def save_resource_name(guid: str, name: str) -> None:
-    with SessionLocal() as session:
-        rec = session.get(ResourceName, guid)
-        if rec:
-            rec.name = name
-        else:
-            session.add(ResourceName(guid=guid, name=name))
-        session.commit()
+    save_names(resources={guid: name})
 
 
 def save_shop_name(shop_id: str, name: str) -> None:
-    with SessionLocal() as session:
-        rec = session.get(ShopName, shop_id)
-        if rec:
-            rec.name = name
+    save_names(shops={shop_id: name})
+
+
+def _upsert(table, update: Iterable[str]):
+    """``INSERT`` that overwrites ``update`` columns on a key clash."""
+    dialect = engine.dialect.name
+    update = list(update)
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
         else:
-            session.add(ShopName(shop_id=shop_id, name=name))
-        session.commit()
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key],
+            set_={c: stmt.excluded[c] for c in update},
+        )
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table)
+        return stmt.on_duplicate_key_update(
+            {c: stmt.inserted[c] for c in update}
+        )
+    return None
+
+
+def _insert_ignore(table):
+    """``INSERT`` that skips rows clashing with a unique key."""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        return insert(table).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        return insert(table).on_conflict_do_nothing()
+    if dialect in ("mysql", "mariadb"):
+        return table.insert().prefix_with("IGNORE")
+    return None
+
+
+def save_price_bars(rows: List[dict], chunk: int = 20_000) -> None:
+    """Insert or overwrite price bars in one transaction."""
+    if not rows:
+        return
+    table = PriceBar.__table__
+    values = ("open", "high", "low", "close", "volume", "trades")
+    stmt = _upsert(table, values)
+    if stmt is None:
+        # no native upsert: let the ORM look each row up
+        with SessionLocal() as session:
+            for row in rows:
+                session.merge(PriceBar(**row))
+            session.commit()
+        return
+    with engine.begin() as conn:
+        for i in range(0, len(rows), chunk):
+            conn.execute(stmt, rows[i:i + chunk])
+
+
+def last_price_buckets() -> Dict[str, datetime]:
+    """Newest stored bucket per resolution."""
+    t = PriceBar.__table__
+    query = select(t.c.resolution, func.max(t.c.bucket)).group_by(t.c.resolution)
+    with engine.connect() as conn:
+        return {resolution: bucket for resolution, bucket in conn.execute(query)}
+
+
+def _time_filter(query, column, since, until):
+    if since is not None:
+        query = query.where(column >= since)
+    if until is not None:
+        query = query.where(column <= until)
+    return query
+
+
+def get_price_bars(
+    resource: str,
+    side: str,
+    resolution: str,
+    shop_id: str = "",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[dict]:
+    """Bars of one series in time order."""
+    t = PriceBar.__table__
+    query = select(t).where(
+        t.c.resource == resource,
+        t.c.shop_id == shop_id,
+        t.c.side == side,
+        t.c.resolution == resolution,
+    )
+    query = _time_filter(query, t.c.bucket, since, until)
+    with engine.connect() as conn:
+        return [dict(r._mapping) for r in conn.execute(query.order_by(t.c.bucket))]
+
+
+def price_bounds(resource: str, side: str, shop_id: str = "", resolution: str = "day"):
+    """First and last bucket of a series, ``(None, None)`` if empty."""
+    t = PriceBar.__table__
+    query = select(func.min(t.c.bucket), func.max(t.c.bucket)).where(
+        t.c.resource == resource,
+        t.c.shop_id == shop_id,
+        t.c.side == side,
+        t.c.resolution == resolution,
+    )
+    with engine.connect() as conn:
+        return tuple(conn.execute(query).one())
+
+
+# parser record key -> trade_events column, with the fixed-point scale
+_TRADE_FIELDS = (
+    ("timestamp", "timestamp", None),
+    ("operation", "operation", None),
+    ("shopId", "shop_id", None),
+    ("shopName", "shop_name", None),
+    ("resourceGUID", "resource", None),
+    ("quantity", "quantity", QTY_SCALE),
+    ("shopPricePerCentiSCU", "shop_price", MONEY_SCALE),
+    ("price", "price", MONEY_SCALE),
+    ("amount", "amount", MONEY_SCALE),
+)
+
+
+def _trade_row(rec: dict) -> dict:
+    ts = rec["timestamp"]
+    if ts.tzinfo is not None:
+        ts = ts.replace(tzinfo=None) - ts.utcoffset()
+    row = {
+        column: round(rec[key] * scale) if scale else rec[key]
+        for key, column, scale in _TRADE_FIELDS
+    }
+    row["timestamp"] = ts
+    return row
+
+
+def save_trade_events(records: Iterable[dict], chunk: int = 5_000) -> None:
+    """Bulk insert parser records, skipping ones already stored."""
+    table = TradeEvent.__table__
+    stmt = _insert_ignore(table)
+    with engine.begin() as conn:
+        batch: List[dict] = []
+        for rec in records:
+            batch.append(_trade_row(rec))
+            if len(batch) >= chunk:
+                _insert_batch(conn, table, stmt, batch)
+                batch = []
+        if batch:
+            _insert_batch(conn, table, stmt, batch)
+
+
+def _insert_batch(conn, table, stmt, rows: List[dict]) -> None:
+    if stmt is not None:
+        conn.execute(stmt, rows)
+        return
+    # no native insert-ignore: drop rows whose key is already stored
+    t = table.c
+    for row in rows:
+        exists = conn.execute(
+            select(t.id).where(
+                t.timestamp == row["timestamp"],
+                t.operation == row["operation"],
+                t.shop_id == row["shop_id"],
+                t.resource == row["resource"],
+                t.quantity == row["quantity"],
+            )
+        ).first()
+        if exists is None:
+            conn.execute(table.insert(), row)
+
+
+def load_trade_events(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fixed: bool = False,
+) -> Iterator[dict]:
+    """Stored events in time order as parser records.
+
+    ``fixed=True`` keeps quantities and money as the stored integers, the
+    shape :func:`app.log_parser.to_fixed` produces.
+    """
+    t = TradeEvent.__table__
+    query = _time_filter(select(t), t.c.timestamp, since, until)
+    query = query.order_by(t.c.timestamp, t.c.id)
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=10_000).execute(query)
+        for row in result:
+            m = row._mapping
+            yield {
+                key: m[column] if fixed or not scale else Decimal(m[column]) / scale
+                for key, column, scale in _TRADE_FIELDS
+            }
+
+
+def trade_events_stored(rows: Iterable[tuple]) -> List[bool]:
+    """Whether each :meth:`RecordStore.row` tuple is stored, by natural key."""
+    t = TradeEvent.__table__.c
+    with engine.connect() as conn:
+        return [
+            conn.execute(
+                select(t.id).where(
+                    t.timestamp == ts,
+                    t.operation == op,
+                    t.shop_id == shop,
+                    t.resource == resource,
+                    t.quantity == qty,
+                ).limit(1)
+            ).first() is not None
+            for ts, op, shop, resource, qty, *_ in rows
+        ]
@@ -1,58 +1,83 @@
 """Track buy/sell moves and compute haul profits."""
 from __future__ import annotations
 
-from collections import defaultdict
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from datetime import datetime
 from decimal import Decimal
-from typing import Iterable, Dict, List
+from operator import itemgetter
+from typing import Deque, Dict, Iterable, List, Optional, Sequence
 
-__all__ = ["HaulTracker", "track_hauls"]
+from .config import MONEY_SCALE, QTY_SCALE
+from .records import RecordStore
+
+__all__ = ["HaulTracker", "HaulView", "track_hauls"]
 
 
-@dataclass
 class _Item:
-    qty: Decimal
-    unit_cost: Decimal
-    buy_shop: str
-    location: str
-    buy_ts: object  # datetime
+    __slots__ = ("qty", "unit_cost", "buy_shop", "location", "buy_ts")
+
+    def __init__(self, qty, unit_cost, buy_shop, location, buy_ts) -> None:
+        self.qty: Decimal = qty
+        self.unit_cost: Decimal = unit_cost
+        self.buy_shop: str = buy_shop
+        self.location: str = location
+        self.buy_ts = buy_ts  # datetime
+
+
+class _Lots:
+    """FIFO lots of one resource plus the quantity held at each location."""
+
+    __slots__ = ("queue", "at")
+
+    def __init__(self) -> None:
+        self.queue: Deque[_Item] = deque()
+        self.at: Dict[str, Decimal] = {}
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def shift(self, location: str, qty) -> None:
+        left = self.at.get(location, 0) + qty
+        if left:
+            self.at[location] = left
+        else:
+            self.at.pop(location, None)
 
 
 class HaulTracker:
-    """Maintain per-resource inventories and build haul records."""
+    """Maintain per-resource inventories and build haul records.
+
+    Lots are consumed oldest first.  Sells pop them off the front of a deque
+    and moves only touch the lots they relocate, so each event costs time in
+    the number of lots it uses rather than in the size of the inventory.
+    """
 
     def __init__(self) -> None:
-        self.inventory: Dict[str, List[_Item]] = defaultdict(list)
+        self.inventory: Dict[str, _Lots] = defaultdict(_Lots)
         self.hauls: List[dict] = []
+        self.profit = Decimal("0")
+        self.last_ts = None  # timestamp of the latest processed record
 
     # ────────── inventory management ──────────
-    def _add_buy(self, rec: dict) -> None:
-        qty = rec["quantity"]
+    def _add_buy(self, resource, shop, qty, price, ts) -> None:
         if qty <= 0:
             return
-        unit_cost = rec["price"] / qty if qty else Decimal("0")
-        item = _Item(
-            qty=qty,
-            unit_cost=unit_cost,
-            buy_shop=rec["shopId"],
-            location=rec["shopId"],
-            buy_ts=rec["timestamp"],
-        )
-        self.inventory[rec["resourceGUID"]].append(item)
-
-    def _sell(self, rec: dict) -> None:
-        resource = rec["resourceGUID"]
-        qty = rec["quantity"]
+        unit_cost = price / qty if qty else Decimal("0")
+        lots = self.inventory[resource]
+        lots.queue.append(_Item(qty, unit_cost, shop, shop, ts))
+        lots.shift(shop, qty)
+
+    def _sell(self, resource, shop, qty, revenue_total, ts) -> None:
         if qty <= 0:
             return
-        revenue_total = rec["amount"]
         unit_sell = revenue_total / qty if qty else Decimal("0")
-        items = self.inventory[resource]
-        i = 0
-        while qty > 0 and i < len(items):
-            item = items[i]
+        lots = self.inventory[resource]
+        queue = lots.queue
+        while qty > 0 and queue:
+            item = queue[0]
             if item.qty <= 0:
-                items.pop(i)
+                queue.popleft()
                 continue
             take = item.qty if item.qty <= qty else qty
             cost = take * item.unit_cost
@@ -61,68 +86,168 @@ class HaulTracker:
                 {
                     "resourceGUID": resource,
                     "buy_shop": item.buy_shop,
-                    "sell_shop": rec["shopId"],
+                    "sell_shop": shop,
                     "quantity": take,
                     "buy_price": cost,
                     "sell_price": revenue,
                     "profit": revenue - cost,
+                    "timestamp": ts,
                 }
             )
+            self.profit += revenue - cost
+            lots.shift(item.location, -take)
             item.qty -= take
             qty -= take
             if item.qty == 0:
-                items.pop(i)
-            else:
-                i += 1
+                queue.popleft()
         # ignore unmatched quantity
 
-    def _move(self, rec: dict) -> None:
-        resource = rec["resourceGUID"]
-        qty = rec["quantity"]
-        dest = rec["shopId"]
+    def _move(self, resource, dest, qty) -> None:
         if qty <= 0:
             return
-        items = self.inventory[resource]
-        i = 0
-        while qty > 0 and i < len(items):
-            item = items[i]
+        lots = self.inventory[resource]
+        queue = lots.queue
+        # the oldest lots move first; a partly moved lot is split and the
+        # moved part queued right behind the part that stays
+        front: List[_Item] = []
+        while qty > 0 and queue:
+            item = queue.popleft()
             if item.qty <= 0:
-                items.pop(i)
                 continue
             take = item.qty if item.qty <= qty else qty
+            lots.shift(item.location, -take)
+            lots.shift(dest, take)
+            front.append(item)
             if take == item.qty:
                 item.location = dest
             else:
                 item.qty -= take
-                new_item = _Item(
-                    qty=take,
-                    unit_cost=item.unit_cost,
-                    buy_shop=item.buy_shop,
-                    location=dest,
-                    buy_ts=item.buy_ts,
+                front.append(
+                    _Item(take, item.unit_cost, item.buy_shop, dest, item.buy_ts)
                 )
-                items.insert(i + 1, new_item)
             qty -= take
-            i += 1
+        queue.extendleft(reversed(front))
         # ignore leftover qty if move exceeds inventory
 
+    def stock(self, resource: str) -> Dict[str, Decimal]:
+        """Quantity of ``resource`` currently held per location."""
+        lots = self.inventory.get(resource)
+        return dict(lots.at) if lots else {}
+
     # ────────── public API ──────────
     def process(self, rec: dict) -> None:
+        self.last_ts = rec["timestamp"]
         op = rec.get("operation")
         if op == "Buy":
-            self._add_buy(rec)
+            self._add_buy(
+                rec["resourceGUID"],
+                rec["shopId"],
+                rec["quantity"],
+                rec["price"],
+                rec["timestamp"],
+            )
         elif op == "Sell":
-            self._sell(rec)
+            self._sell(
+                rec["resourceGUID"],
+                rec["shopId"],
+                rec["quantity"],
+                rec["amount"],
+                rec["timestamp"],
+            )
         elif op == "Move":
-            self._move(rec)
+            self._move(rec["resourceGUID"], rec["shopId"], rec["quantity"])
+
+    def process_store(self, store: RecordStore) -> None:
+        """Replay a :class:`RecordStore` in time order, without per-row dicts."""
+        for ts, op, shop, res, qty, price, amount in store.rows(by_time=True):
+            self.last_ts = ts
+            if op == "Buy":
+                self._add_buy(
+                    res,
+                    shop,
+                    Decimal(qty) / QTY_SCALE,
+                    Decimal(price) / MONEY_SCALE,
+                    ts,
+                )
+            elif op == "Sell":
+                self._sell(
+                    res,
+                    shop,
+                    Decimal(qty) / QTY_SCALE,
+                    Decimal(amount) / MONEY_SCALE,
+                    ts,
+                )
+            elif op == "Move":
+                self._move(res, shop, Decimal(qty) / QTY_SCALE)
+
+    def consume(self, records: Iterable[dict]) -> None:
+        """Process an already time-ordered stream one record at a time."""
+        for rec in records:
+            self.process(rec)
 
     def completed_hauls(self) -> List[dict]:
         return self.hauls
 
+    def window(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> range:
+        """Index range of hauls sold in ``[since, until]``.
+
+        Hauls are appended in processing order, so this assumes the records
+        were fed in time order.
+        """
+        return _window(self.hauls, since, until)
+
+    def view(self) -> "HaulView":
+        """Frozen copy of the hauls so far, for readers on other threads."""
+        return HaulView(self.hauls, self.profit)
+
+
+class HaulView:
+    """Hauls and total profit of a tracker at one point in time.
+
+    The tracker keeps appending as records arrive; a view holds its own
+    tuple, so it can be read while the tracker is being fed.  Haul dicts are
+    never changed once appended and are shared, not copied.
+    """
+
+    __slots__ = ("hauls", "profit")
+
+    def __init__(self, hauls: Sequence[dict] = (), profit=Decimal("0")) -> None:
+        self.hauls = tuple(hauls)
+        self.profit = profit
+
+    def __len__(self) -> int:
+        return len(self.hauls)
+
+    def window(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> range:
+        """Index range of hauls sold in ``[since, until]``."""
+        return _window(self.hauls, since, until)
+
+
+def _window(hauls: Sequence[dict], since, until) -> range:
+    key = itemgetter("timestamp")
+    lo = bisect_left(hauls, since, key=key) if since else 0
+    hi = bisect_right(hauls, until, key=key) if until else len(hauls)
+    return range(lo, max(lo, hi))
+
+
+def track_hauls(
+    records: Iterable[dict] | RecordStore, ordered: bool = False
+) -> List[dict]:
+    """Process records chronologically and return haul list.
 
-def track_hauls(records: Iterable[dict]) -> List[dict]:
-    """Process records chronologically and return haul list."""
+    With ``ordered=True`` the records are trusted to be in time order (e.g.
+    ``log_parser.merge_by_time`` over per-file streams) and are consumed
+    lazily instead of being sorted in memory first.
+    """
     tracker = HaulTracker()
-    for rec in sorted(records, key=lambda r: r["timestamp"]):
-        tracker.process(rec)
+    if isinstance(records, RecordStore):
+        tracker.process_store(records)
+    elif ordered:
+        tracker.consume(records)
+    else:
+        tracker.consume(sorted(records, key=lambda r: r["timestamp"]))
     return tracker.completed_hauls()
@@ -0,0 +1,77 @@
+"""Human-readable names next to the resource and shop ids of analysis rows."""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+__all__ = ["LABELS", "SECTIONS", "label_context", "label_rows", "relabel_rows"]
+
+# id column -> (label column, ``db.get_all_names`` section)
+LABELS: Dict[str, Tuple[str, str]] = {
+    "resourceGUID": ("resourceName", "resourceNames"),
+    "shopId": ("shopLabel", "shopNames"),
+    "buyShopId": ("buyShopLabel", "shopNames"),
+    "sellShopId": ("sellShopLabel", "shopNames"),
+    "suggested shopId": ("suggested shopLabel", "shopNames"),
+    "buy_shop": ("buy_shop_label", "shopNames"),
+    "sell_shop": ("sell_shop_label", "shopNames"),
+}
+
+# the ``analyse`` sections made of rows; the server pages through them
+SECTIONS = (
+    "buy_summary",
+    "sell_summary",
+    "best_routes",
+    "pending_goods",
+    "last_transactions",
+)
+
+
+def _columns(row: dict) -> List[Tuple[str, str, str]]:
+    return [(col, *LABELS[col]) for col in row if col in LABELS]
+
+
+def label_rows(rows: List[dict], names: dict) -> List[dict]:
+    """Add a label column (None when unnamed) for each id column, in place.
+
+    ``names`` is shaped like ``db.get_all_names()``; the rows are expected
+    to share their columns, as ``analyse`` output does.
+    """
+    if not rows:
+        return rows
+    columns = _columns(rows[0])
+    for row in rows:
+        for col, label, section in columns:
+            row[label] = names[section].get(row[col])
+    return rows
+
+
+def relabel_rows(rows: List[dict], changes: dict) -> Optional[List[dict]]:
+    """Copy of ``rows`` with the names in ``changes`` applied.
+
+    Only rows whose label actually changes are copied; the others are
+    shared with ``rows``.  Returns None when no row is affected, so callers
+    can keep the original list and everything derived from it.
+    """
+    if not rows:
+        return None
+    columns = [c for c in _columns(rows[0]) if changes.get(c[2])]
+    if not columns:
+        return None
+    out = None
+    for i, row in enumerate(rows):
+        for col, label, section in columns:
+            name = changes[section].get(row[col], row[label])
+            if name != row[label]:
+                if out is None:
+                    out = list(rows)
+                if out[i] is row:
+                    out[i] = row = dict(row)
+                row[label] = name
+    return out
+
+
+def label_context(ctx: dict, names: dict) -> dict:
+    """Label every table of an ``analyse`` result in place."""
+    for section in SECTIONS:
+        label_rows(ctx.get(section) or [], names)
+    return ctx
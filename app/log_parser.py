@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import codecs
+import heapq
 import re
 from pathlib import Path
 import glob
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from decimal import Decimal
+from operator import itemgetter
+from typing import Optional
 
+from . import metrics
 from .config import (
     BUY_MARK,
     SELL_MARK,
@@ -14,21 +20,72 @@ from .config import (
     LINE_RE,
     FIELD_RE,
     PRICE_FACTOR,
+    QTY_SCALE,
+    MONEY_SCALE,
 )
 
-__all__ = ["collect_files", "iter_records"]
+__all__ = [
+    "collect_files",
+    "iter_file",
+    "iter_records",
+    "merge_by_time",
+    "read_records",
+    "sniff_encoding",
+    "to_fixed",
+]
 
 
-# ───────────────── helper: robust bytes→str ──────────────────
+LOG_BYTES = metrics.counter("log_bytes", "Log bytes scanned.")
+LOG_LINES = metrics.counter("log_lines", "Log lines scanned.")
+RECORDS = metrics.counter("records_parsed", "Trade records parsed from logs.")
 
+# ───────────────── encodings ──────────────────
 
-def decode_bytes(raw: bytes) -> str:
-    for enc in ("utf-8", "latin-1", "utf-16-le", "utf-16-be"):
-        try:
-            return raw.decode(enc)
-        except UnicodeDecodeError:
-            continue
-    return raw.decode("ascii", errors="ignore")
+# enough to spot UTF-16; a UTF-8 guess that turns out wrong on a later line
+# costs nothing, as lines that do not decode fall back to latin-1
+_SNIFF_SIZE = 4096
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+def _sniff(head: bytes) -> str:
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            return name
+    # mostly-ASCII UTF-16 has a NUL in every other byte
+    even, odd = head[0::2].count(0), head[1::2].count(0)
+    if odd > len(head) // 8 and even * 4 < odd:
+        return "utf-16-le"
+    if even > len(head) // 8 and odd * 4 < even:
+        return "utf-16-be"
+    try:
+        # final=False: the sample may end inside a character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def sniff_encoding(path: Path) -> str:
+    """Encoding of ``path`` from its BOM or, failing that, its first 4 KiB.
+
+    One of ``utf-8``, ``latin-1``, ``utf-16-le`` and ``utf-16-be``.
+    """
+    with path.open("rb") as fh:
+        return _sniff(fh.read(_SNIFF_SIZE))
+
+
+def _decode(raw: bytes, encoding: str) -> str:
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        # a stray line in another 8-bit encoding; latin-1 never fails
+        if encoding == "utf-8":
+            return raw.decode("latin-1")
+        return raw.decode(encoding, errors="replace")
 
 # ───────────────── core parser ──────────────────
 
@@ -75,16 +132,188 @@ def _parse_line(line: str) -> dict | None:
     except Exception:
         return None
 
+def to_fixed(rec: dict) -> dict:
+    """Convert a record's Decimal fields to fixed-point integers in place.
+
+    ``quantity`` becomes centi-SCU and the money fields micro-aUEC, so a
+    DataFrame built from such records has int64 columns only.
+    """
+    rec["quantity"] = round(rec["quantity"] * QTY_SCALE)
+    for key in ("shopPricePerCentiSCU", "price", "amount"):
+        rec[key] = round(rec[key] * MONEY_SCALE)
+    return rec
+
+# ───────────────── byte-level scanner ──────────────────
+
+# Shared by all four markers: lines without it cannot produce a record, so
+# they are skipped without being decoded.
+_SCAN_MARK = "CommodityUIProvider::SendCommodity"
+_SCAN_BYTES = _SCAN_MARK.encode()
+_CHUNK_SIZE = 4 << 20
+# UTF-16 newlines; the 8-bit encodings the scanner reads as bytes use b"\n"
+_WIDE_NEWLINES = {"utf-16-le": b"\n\x00", "utf-16-be": b"\x00\n"}
+
+
+def _scan_block(buf, stop: int, records, encoding: Optional[str]) -> None:
+    """Parse the lines of ``buf[:stop]`` that contain the scan marker.
+
+    ``buf`` is either bytes in an ASCII-compatible ``encoding``, of which
+    only matching lines are decoded, or text already decoded (``encoding``
+    None).
+    """
+    if encoding is None:
+        mark, nl = _SCAN_MARK, "\n"
+    else:
+        mark, nl = _SCAN_BYTES, b"\n"
+    pos = buf.find(mark, 0, stop)
+    while pos != -1:
+        start = buf.rfind(nl, 0, pos) + 1
+        end = buf.find(nl, pos, stop) + 1 or stop
+        line = buf[start:end]
+        rec = _parse_line(line if encoding is None else _decode(line, encoding))
+        if rec:
+            records.append(rec)
+        pos = buf.find(mark, end, stop)
+
+
+def _cut(buf: bytes, nl: bytes) -> int:
+    """Offset just past the last whole line of ``buf``.
+
+    ``buf`` starts on a code unit boundary, so a UTF-16 newline only counts
+    at an even position.
+    """
+    pos = buf.rfind(nl)
+    while pos != -1 and pos % len(nl):
+        pos = buf.rfind(nl, 0, pos + len(nl) - 1)
+    return pos + len(nl) if pos != -1 else 0
+
+
+def _scan_chunks(
+    path: Path, start: int, partial: bool, records, encoding: Optional[str] = None
+):
+    """Append records of ``path`` chunk by chunk, yielding the offset reached.
+
+    ``encoding`` is sniffed from the file when not given and a byte order
+    mark at the start is skipped.  UTF-16 chunks are decoded whole before
+    scanning: ``bytes.find`` skips poorly through text padded with NULs.
+    """
+    with path.open("rb") as fh:
+        if encoding is None or start == 0:
+            head = fh.read(_SNIFF_SIZE)
+            encoding = encoding or _sniff(head)
+            if start == 0:
+                for bom, name in _BOMS:
+                    if name == encoding and head.startswith(bom):
+                        start = len(bom)
+        wide = encoding in _WIDE_NEWLINES
+        nl = _WIDE_NEWLINES.get(encoding, b"\n")
+        offset = start
+        carry = b""
+        fh.seek(start)
+        while chunk := fh.read(_CHUNK_SIZE):
+            buf = carry + chunk if carry else chunk
+            cut = _cut(buf, nl) if wide else buf.rfind(b"\n") + 1
+            carry = buf[cut:]
+            if cut:
+                if wide:
+                    _scan_text(buf[:cut].decode(encoding, errors="replace"), records)
+                else:
+                    if metrics.is_enabled():
+                        LOG_LINES.inc(buf.count(b"\n", 0, cut))
+                    _scan_block(buf, cut, records, encoding)
+                offset += cut
+                yield offset
+    if carry and partial:
+        if wide:
+            _scan_text(carry.decode(encoding, errors="replace"), records)
+        else:
+            LOG_LINES.inc()
+            _scan_block(carry, len(carry), records, encoding)
+        yield offset + len(carry)
+
+
+def _scan_text(text: str, records) -> None:
+    if metrics.is_enabled():
+        LOG_LINES.inc(text.count("\n") or 1)
+    _scan_block(text, len(text), records, None)
+
 # ───────────────── public generators ──────────────────
 
 
-def iter_records(paths: list[Path]):
+def iter_records(
+    paths: list[Path], scan: bool = True, jobs: int = 1, numeric: str = "decimal"
+):
+    """Yield records from ``paths`` in file order.
+
+    ``scan`` selects the byte-level scanner; ``scan=False`` decodes and
+    inspects every line and is kept as the reference implementation.
+    ``jobs > 1`` parses files in a process pool; results are still yielded
+    file by file in input order, so the output equals the serial path.
+    ``numeric="fixed"`` yields fixed-point integers (see :func:`to_fixed`)
+    instead of Decimals.
+    """
+    if numeric == "fixed":
+        yield from map(to_fixed, iter_records(paths, scan, jobs))
+        return
+    if scan and jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for records, end in pool.map(read_records, paths):
+                # counted here: the workers' registries are their own
+                LOG_BYTES.inc(end)
+                RECORDS.inc(len(records))
+                yield from records
+        return
     for path in paths:
-        with path.open("rb") as fh:
-            for raw in fh:
-                rec = _parse_line(decode_bytes(raw))
-                if rec:
-                    yield rec
+        if scan:
+            yield from read_records(path)[0]
+            continue
+        encoding = sniff_encoding(path)
+        if encoding not in _WIDE_NEWLINES:
+            with path.open("rb") as fh:
+                lines = (_decode(raw, encoding) for raw in fh)
+                yield from filter(None, map(_parse_line, lines))
+        else:
+            with path.open(encoding=encoding, errors="replace", newline="") as fh:
+                yield from filter(None, map(_parse_line, fh))
+
+
+def read_records(
+    path: Path,
+    start: int = 0,
+    partial: bool = True,
+    into=None,
+    encoding: Optional[str] = None,
+) -> tuple[list[dict], int]:
+    """Parse ``path`` from byte offset ``start``.
+
+    Returns the records found and the offset just past the last consumed
+    byte.  With ``partial=False`` a trailing line without its newline is left
+    unread so a writer can finish it before the next call.  ``into`` may be
+    any container with ``append`` (e.g. a ``RecordStore``) that receives the
+    records instead of a new list.  ``encoding`` (see :func:`sniff_encoding`)
+    saves sniffing the file again when reading on from ``start``.
+    """
+    records = [] if into is None else into
+    before = len(records)
+    offset = start
+    for offset in _scan_chunks(path, start, partial, records, encoding):
+        pass
+    LOG_BYTES.inc(offset - start)
+    RECORDS.inc(len(records) - before)
+    return records, offset
+
+
+def iter_file(path: Path):
+    """Yield the records of one file chunk by chunk, without a full list."""
+    records: list[dict] = []
+    for _ in _scan_chunks(path, 0, True, records):
+        yield from records
+        records.clear()
+
+
+def merge_by_time(streams):
+    """Merge per-file record streams, each already in time order, lazily."""
+    return heapq.merge(*streams, key=itemgetter("timestamp"))
 
 
 def collect_files(inputs: list[str]) -> list[Path]:
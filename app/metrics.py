@@ -0,0 +1,268 @@
+"""In-process counters and stage timings, for ``/metrics`` and debugging.
+
+The parser, the analysis and the live ingestion loop report into the module
+registry: counters of bytes, lines and records processed and a histogram of
+seconds per pipeline stage.  ``cycle()`` brackets one ingestion pass so the
+latest per-stage breakdown can be shown on its own.
+
+``METRICS=0`` in the environment (or ``set_enabled(False)``) turns every
+call into a flag check; ``timed`` then hands out a shared no-op context.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional, Tuple
+
+__all__ = [
+    "BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "counter",
+    "cycle",
+    "gauge",
+    "is_enabled",
+    "render_prometheus",
+    "reset",
+    "set_enabled",
+    "stage_seconds",
+    "timed",
+    "timings",
+]
+
+PREFIX = "sctrade_"
+# seconds; a cold rescan of a large log folder lands in the last buckets
+BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+_enabled = os.environ.get("METRICS", "1").lower() not in ("0", "false", "no", "off")
+_lock = threading.Lock()
+_NULL = nullcontext()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+# ───────────────── metric types ──────────────────
+
+
+class Counter:
+    """Monotonic total, e.g. bytes read."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name, self.help = name, help
+        self.value = 0
+
+    def inc(self, n: float = 1) -> None:
+        if _enabled:
+            self.value += n
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        yield self.name + "_total", "", self.value
+
+    def reset(self) -> None:
+        self.value = 0
+
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. records currently held."""
+
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        if _enabled:
+            self.value = value
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        yield self.name, "", self.value
+
+
+class _Series:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self, n: int) -> None:
+        self.counts = [0] * n
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per ``label`` value."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, label: str, buckets: Tuple[float, ...] = BUCKETS
+    ) -> None:
+        self.name, self.help, self.label = name, help, label
+        self.buckets = buckets
+        self.series: Dict[str, _Series] = {}
+
+    def observe(self, key: str, value: float) -> None:
+        if not _enabled:
+            return
+        with _lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = _Series(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    s.counts[i] += 1
+                    break
+            s.sum += value
+            s.count += 1
+            if value > s.max:
+                s.max = value
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for key in sorted(self.series):
+            s = self.series[key]
+            lab = f'{self.label}="{_escape(key)}"'
+            running = 0
+            for bound, n in zip(self.buckets, s.counts):
+                running += n
+                yield self.name + "_bucket", f'{lab},le="{bound:g}"', running
+            yield self.name + "_bucket", f'{lab},le="+Inf"', s.count
+            yield self.name + "_sum", lab, s.sum
+            yield self.name + "_count", lab, s.count
+
+    def reset(self) -> None:
+        self.series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ───────────────── registry ──────────────────
+
+_metrics: Dict[str, Counter | Histogram] = {}
+
+
+def counter(name: str, help: str) -> Counter:
+    """The registered counter ``name``, created on first use."""
+    return _metrics.setdefault(name, Counter(PREFIX + name, help))
+
+
+def gauge(name: str, help: str) -> Gauge:
+    return _metrics.setdefault(name, Gauge(PREFIX + name, help))
+
+
+stage_seconds = Histogram(
+    PREFIX + "stage_seconds", "Seconds spent per pipeline stage.", "stage"
+)
+_metrics["stage_seconds"] = stage_seconds
+
+# the breakdown being filled by the current ``cycle`` and the last finished one
+_current: Optional[Dict[str, float]] = None
+_last: Optional[dict] = None
+
+
+@contextmanager
+def _timer(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        stage_seconds.observe(stage, elapsed)
+        current = _current
+        if current is not None:
+            current[stage] = current.get(stage, 0.0) + elapsed
+
+
+def timed(stage: str):
+    """Context manager adding its duration to ``stage``."""
+    return _timer(stage) if _enabled else _NULL
+
+
+@contextmanager
+def _cycle(name: str):
+    global _current, _last
+    before = {k: m.value for k, m in _metrics.items() if isinstance(m, Counter)}
+    _current = stages = {}
+    started = time.time()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - t0
+        _current = None
+        stage_seconds.observe(name, total)
+        _last = {
+            "started": started,
+            "total_ms": round(total * 1000, 3),
+            "stages_ms": {k: round(v * 1000, 3) for k, v in stages.items()},
+            "counts": {
+                k: m.value - before.get(k, 0)
+                for k, m in _metrics.items()
+                if isinstance(m, Counter) and not isinstance(m, Gauge)
+            },
+        }
+
+
+def cycle(name: str = "cycle"):
+    """Bracket one ingestion pass; its stages become the last-cycle breakdown.
+
+    Cycles are not nested and belong to one pass at a time, as the single
+    ingestion worker runs them.
+    """
+    return _cycle(name) if _enabled else _NULL
+
+
+# ───────────────── export ──────────────────
+
+
+def render_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for key in sorted(_metrics):
+        m = _metrics[key]
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        for name, labels, value in m.samples():
+            lab = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}{lab} {value:g}" if isinstance(value, float)
+                         else f"{name}{lab} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def timings() -> dict:
+    """Stage statistics and the last cycle's breakdown, as plain JSON."""
+    stages = {}
+    for key, s in sorted(stage_seconds.series.items()):
+        stages[key] = {
+            "count": s.count,
+            "total_ms": round(s.sum * 1000, 3),
+            "mean_ms": round(s.sum / s.count * 1000, 3) if s.count else 0.0,
+            "max_ms": round(s.max * 1000, 3),
+        }
+    return {
+        "enabled": _enabled,
+        "last_cycle": _last,
+        "stages": stages,
+        "counters": {
+            k: m.value for k, m in sorted(_metrics.items()) if isinstance(m, Counter)
+        },
+    }
+
+
+def reset() -> None:
+    """Zero every metric and forget the last cycle (for tests)."""
+    global _last
+    for m in _metrics.values():
+        m.reset()
+    _last = None
@@ -0,0 +1,152 @@
+"""Per-commodity unit price history rolled up into OHLC bars."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = ["RESOLUTIONS", "PriceRollups", "floor_time", "pick_resolution"]
+
+# name -> bucket width in seconds, finest first
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+# ``shop_id`` of the bars that combine every shop
+ALL_SHOPS = ""
+# finest resolution kept per shop
+SHOP_RESOLUTIONS = ("hour", "day")
+
+_SIDES = {"Buy": ("buy", "price"), "Sell": ("sell", "amount")}
+
+
+def floor_time(ts: datetime, resolution: str) -> datetime:
+    """Start of the ``resolution`` bucket holding ``ts``."""
+    if resolution == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def pick_resolution(since: datetime, until: datetime, points: int = 300) -> str:
+    """Finest resolution that covers ``since``–``until`` in ``points`` bars."""
+    span = max((until - since).total_seconds(), 0)
+    for name, width in RESOLUTIONS.items():
+        if span / width <= points:
+            return name
+    return "day"
+
+
+class _Bar:
+    __slots__ = ("open", "high", "low", "close", "open_ts", "close_ts",
+                 "volume", "trades")
+
+    def __init__(self, unit: float, qty: float, ts: datetime) -> None:
+        self.open = self.high = self.low = self.close = unit
+        self.open_ts = self.close_ts = ts
+        self.volume = qty
+        self.trades = 1
+
+    def add(self, unit: float, qty: float, ts: datetime) -> None:
+        if unit > self.high:
+            self.high = unit
+        if unit < self.low:
+            self.low = unit
+        # open/close follow timestamps, so late records land correctly
+        if ts < self.open_ts:
+            self.open, self.open_ts = unit, ts
+        if ts >= self.close_ts:
+            self.close, self.close_ts = unit, ts
+        self.volume += qty
+        self.trades += 1
+
+
+class PriceRollups:
+    """Minute, hour and day OHLC bars of unit prices, kept incrementally.
+
+    Bars are keyed by ``(resource, shop_id, side, resolution, bucket)``;
+    ``shop_id == ALL_SHOPS`` combines every shop.  A single shop rarely
+    trades a commodity more than once a minute, so per-shop series start at
+    hourly bars.  ``flush`` returns the bars touched since the previous
+    flush so only those are persisted.
+    """
+
+    def __init__(self) -> None:
+        self.bars: Dict[Tuple, _Bar] = {}
+        self.dirty: set = set()
+
+    def add(self, rec: dict) -> None:
+        side = _SIDES.get(rec["operation"])
+        qty = rec["quantity"]
+        if side is None or qty <= 0:
+            return
+        name, column = side
+        unit = float(rec[column] / qty)
+        qty = float(qty)
+        ts = rec["timestamp"]
+        resource, shop = rec["resourceGUID"], rec["shopId"]
+        minute = ts.replace(second=0, microsecond=0)
+        hour = minute.replace(minute=0)
+        day = hour.replace(hour=0)
+        bars, dirty = self.bars, self.dirty
+        for key in (
+            (resource, ALL_SHOPS, name, "minute", minute),
+            (resource, ALL_SHOPS, name, "hour", hour),
+            (resource, ALL_SHOPS, name, "day", day),
+            (resource, shop, name, "hour", hour),
+            (resource, shop, name, "day", day),
+        ):
+            bar = bars.get(key)
+            if bar is None:
+                bars[key] = _Bar(unit, qty, ts)
+            else:
+                bar.add(unit, qty, ts)
+            dirty.add(key)
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for rec in records:
+            self.add(rec)
+
+    def update(self, other: "PriceRollups") -> None:
+        """Take over ``other``'s bars, replacing ours of the same buckets."""
+        self.bars.update(other.bars)
+        self.dirty.update(other.bars)
+
+    @staticmethod
+    def _row(key: Tuple, bar: _Bar) -> dict:
+        resource, shop, side, resolution, bucket = key
+        return {
+            "resource": resource,
+            "shop_id": shop,
+            "side": side,
+            "resolution": resolution,
+            "bucket": bucket,
+            "open": bar.open,
+            "high": bar.high,
+            "low": bar.low,
+            "close": bar.close,
+            "volume": bar.volume,
+            "trades": bar.trades,
+        }
+
+    def flush(self) -> List[dict]:
+        """Rows for the bars changed since the last call."""
+        rows = [self._row(key, self.bars[key]) for key in self.dirty]
+        self.dirty = set()
+        return rows
+
+    def series(
+        self,
+        resource: str,
+        side: str,
+        resolution: str,
+        shop_id: str = ALL_SHOPS,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Bars of one series in time order (a scan; the server reads the db)."""
+        rows = [
+            self._row(key, bar)
+            for key, bar in self.bars.items()
+            if key[:4] == (resource, shop_id, side, resolution)
+            and (since is None or key[4] >= floor_time(since, resolution))
+            and (until is None or key[4] <= until)
+        ]
+        return sorted(rows, key=lambda r: r["bucket"])
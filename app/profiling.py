@@ -0,0 +1,285 @@
+"""Profile the next few ingestion cycles or HTTP requests on demand.
+
+``profiler.arm(cycles=N)`` (or ``PROFILE_CYCLES=N`` at start-up) runs the
+next N ``watch_logs`` passes under :mod:`cProfile`; ``requests=N`` does the
+same for HTTP requests through :class:`ProfileMiddleware`.  With ``memory``
+set, :mod:`tracemalloc` runs while anything is armed and each capture also
+records the allocations made during it.
+
+Every capture is written to ``PROFILE_DIR``: a ``.prof`` file for
+``pstats``/snakeviz and, with ``memory``, a ``.tracemalloc`` snapshot
+(``tracemalloc.Snapshot.load``).  :meth:`Profiler.summary` merges the recent
+captures into the top functions and allocation sites.
+
+Only one capture runs at a time, whatever its kind.  From Python 3.12
+:mod:`cProfile` hooks the whole interpreter: enabling a second profiler
+raises ``ValueError``, and an enabled one records every thread, not only
+the one that enabled it.  A capture therefore also shows whatever else ran
+meanwhile, e.g. request handlers during a cycle.
+
+:meth:`Profiler.start` and :meth:`Profiler.finish` take tracemalloc
+snapshots and write files; call them off the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List
+
+__all__ = ["Capture", "ProfileMiddleware", "Profiler", "profiler"]
+
+# allocation sites kept per capture; summaries show at most this many
+MAX_SITES = 50
+# frames kept per allocation; 1 is cheapest and enough to name the line
+TRACE_FRAMES = int(os.environ.get("PROFILE_TRACE_FRAMES", "1"))
+
+
+class Capture:
+    """One profiled cycle or request."""
+
+    def __init__(self, kind: str, label: str, memory: bool) -> None:
+        self.kind, self.label = kind, label
+        self.profile = cProfile.Profile()
+        self.started = time.time()
+        self.elapsed = 0.0
+        self.before = tracemalloc.take_snapshot() if memory else None
+        self.files: List[str] = []
+        self.allocations: List[dict] = []
+
+    def call(self, fn: Callable, *args):
+        """Run ``fn`` under the profiler."""
+        t0 = time.perf_counter()
+        try:
+            self.profile.enable()
+            return fn(*args)
+        finally:
+            self.profile.disable()
+            self.elapsed += time.perf_counter() - t0
+
+    def describe(self) -> dict:
+        return {
+            "kind": self.kind,
+            "label": self.label,
+            "started": self.started,
+            "profiled_ms": round(self.elapsed * 1000, 3),
+            "files": self.files,
+        }
+
+
+class _NoCapture:
+    """Stand-in while nothing is armed: calls straight through."""
+
+    @staticmethod
+    def call(fn: Callable, *args):
+        return fn(*args)
+
+
+NO_CAPTURE = _NoCapture()
+
+
+class Profiler:
+    """Hands out :class:`Capture` objects while armed and keeps the results."""
+
+    def __init__(self, directory: Path, keep: int = 20) -> None:
+        self.directory = Path(directory)
+        self.armed: Dict[str, int] = {"cycle": 0, "request": 0}
+        self.memory = False
+        self.active: Dict[str, Capture] = {}
+        self.captures: Deque[Capture] = deque(maxlen=keep)
+        self.seq = 0
+        self._tracing = False  # whether tracemalloc was started here
+        self._lock = threading.Lock()
+
+    def arm(self, cycles: int = 0, requests: int = 0, memory: bool = False) -> dict:
+        """Profile the next ``cycles`` passes and ``requests`` requests.
+
+        Replaces any previous arming; zeros disarm.
+        """
+        with self._lock:
+            self.armed = {"cycle": max(cycles, 0), "request": max(requests, 0)}
+            self.memory = memory and any(self.armed.values())
+            if self.memory and not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self._tracing = True
+            elif not self.memory:
+                self._stop_tracing()
+        return self.state()
+
+    def _stop_tracing(self) -> None:
+        if self._tracing and not self.active:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def start(self, kind: str, label: str = ""):
+        """A new :class:`Capture` if ``kind`` is armed, else ``NO_CAPTURE``.
+
+        Only one capture runs at a time, across kinds: Python 3.12 allows a
+        single active profiler per interpreter.  A kind that finds another
+        capture running stays armed for a later cycle or request.
+        """
+        if not self.armed[kind]:
+            return NO_CAPTURE
+        with self._lock:
+            if not self.armed[kind] or self.active:
+                return NO_CAPTURE
+            self.armed[kind] -= 1
+            capture = Capture(kind, label, self.memory and tracemalloc.is_tracing())
+            self.active[kind] = capture
+            return capture
+
+    def finish(self, capture) -> None:
+        """Write ``capture``'s dumps and keep it for :meth:`summary`."""
+        if capture is NO_CAPTURE:
+            return
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(capture.started))
+        slug = re.sub(r"[^\w.-]+", "_", capture.label).strip("_")
+        stem = self.directory / "-".join(
+            part for part in (capture.kind, stamp, f"{seq:04d}", slug) if part
+        )
+        path = stem.with_name(stem.name + ".prof")
+        capture.profile.dump_stats(path)
+        capture.files.append(str(path))
+        if capture.before is not None and tracemalloc.is_tracing():
+            after = tracemalloc.take_snapshot()
+            path = stem.with_name(stem.name + ".tracemalloc")
+            after.dump(str(path))
+            capture.files.append(str(path))
+            capture.allocations = _sites(after.compare_to(capture.before, "lineno"))
+            capture.before = None
+        with self._lock:
+            self.active.pop(capture.kind, None)
+            self.captures.append(capture)
+            if not any(self.armed.values()):
+                self._stop_tracing()
+
+    def discard(self, capture) -> None:
+        """Drop ``capture`` unwritten and give its slot back (an idle cycle)."""
+        if capture is NO_CAPTURE:
+            return
+        with self._lock:
+            if self.active.get(capture.kind) is capture:
+                del self.active[capture.kind]
+                self.armed[capture.kind] += 1
+
+    # ────────── results ──────────
+    def state(self) -> dict:
+        return {
+            "armed": {f"{k}s": n for k, n in self.armed.items()},
+            "memory": self.memory,
+            "directory": str(self.directory),
+            "captures": len(self.captures),
+        }
+
+    def summary(self, top: int = 20, sort: str = "tottime", kind: str = "") -> dict:
+        """Top functions and allocation sites over the kept captures."""
+        captures = [c for c in self.captures if not kind or c.kind == kind]
+        stats = None
+        sites: Dict[str, dict] = {}
+        for c in captures:
+            if stats is None:
+                stats = pstats.Stats(c.profile)
+            else:
+                stats.add(c.profile)
+            for site in c.allocations:
+                acc = sites.setdefault(
+                    site["site"], {"site": site["site"], "size_kb": 0.0, "count": 0}
+                )
+                acc["size_kb"] += site["size_kb"]
+                acc["count"] += site["count"]
+        allocations = sorted(sites.values(), key=lambda s: -abs(s["size_kb"]))
+        for site in allocations:
+            site["size_kb"] = round(site["size_kb"], 1)
+        return {
+            **self.state(),
+            "recent": [c.describe() for c in captures],
+            "top_functions": _functions(stats, top, sort) if stats else [],
+            "top_allocations": allocations[:top],
+        }
+
+
+def _functions(stats: pstats.Stats, top: int, sort: str) -> List[dict]:
+    key = {"tottime": 2, "cumtime": 3, "calls": 1}.get(sort, 2)
+    rows = sorted(stats.stats.items(), key=lambda kv: -kv[1][key])[:top]
+    return [
+        {
+            "function": f"{Path(file).name}:{line}({name})" if line else name,
+            "calls": nc,
+            "primitive_calls": cc,
+            "tottime_ms": round(tt * 1000, 3),
+            "cumtime_ms": round(ct * 1000, 3),
+        }
+        for (file, line, name), (cc, nc, tt, ct, _) in rows
+    ]
+
+
+def _sites(diffs) -> List[dict]:
+    rows = []
+    for diff in diffs[:MAX_SITES]:
+        frame = diff.traceback[0]
+        rows.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_kb": diff.size_diff / 1024,
+            "count": diff.count_diff,
+        })
+    return rows
+
+
+class ProfileMiddleware:
+    """ASGI middleware running armed HTTP requests under the profiler.
+
+    Work other requests do while this one awaits shows up too; so does
+    handlers' ``to_thread`` work from Python 3.12, which profiles every
+    thread.  Paths under ``skip`` (the profiling endpoints) are never
+    captured.  Snapshots and dumps are taken in a worker thread.
+    """
+
+    def __init__(self, app, profiler: "Profiler", skip: str = "/api/debug/") -> None:
+        self.app = app
+        self.profiler = profiler
+        self.skip = skip
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.profiler.armed["request"]
+            or scope["path"].startswith(self.skip)
+        ):
+            return await self.app(scope, receive, send)
+        capture = await asyncio.to_thread(
+            self.profiler.start, "request", f"{scope['method']} {scope['path']}"
+        )
+        if capture is NO_CAPTURE:
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        try:
+            capture.profile.enable()
+            await self.app(scope, receive, send)
+        finally:
+            capture.profile.disable()
+            capture.elapsed = time.perf_counter() - t0
+            await asyncio.to_thread(self.profiler.finish, capture)
+
+
+def _env_int(name: str) -> int:
+    return int(os.environ.get(name, "0") or 0)
+
+
+profiler = Profiler(Path(os.environ.get("PROFILE_DIR", "profiles")))
+if _env_int("PROFILE_CYCLES") or _env_int("PROFILE_REQUESTS"):
+    profiler.arm(
+        cycles=_env_int("PROFILE_CYCLES"),
+        requests=_env_int("PROFILE_REQUESTS"),
+        memory=os.environ.get("PROFILE_MEMORY", "").lower() in ("1", "true", "yes", "on"),
+    )
@@ -0,0 +1,194 @@
+"""On-demand analytics over a time range, shop subset or resource subset."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .analysis import (
+    _best_routes,
+    _daily_profit_series,
+    _kpi,
+    _last_transactions,
+    _pending_inventory,
+    _records,
+    _summary_table_buy,
+    _summary_table_sell,
+)
+from .records import _EPOCH, _MICRO, RecordStore
+
+__all__ = ["QueryEngine", "VIEWS"]
+
+_View = Callable[[pd.DataFrame, pd.DataFrame, pd.DataFrame, int], object]
+
+# name -> fn(df, buys, sells, route_pairs); the names match ``analyse`` keys
+VIEWS: Dict[str, _View] = {
+    "kpi": lambda df, buys, sells, pairs: _kpi(buys, sells),
+    "daily_profit": lambda df, buys, sells, pairs: _daily_profit_series(buys, sells),
+    "buy_summary": lambda df, buys, sells, pairs: _records(_summary_table_buy(buys)),
+    "sell_summary": lambda df, buys, sells, pairs: _records(
+        _summary_table_sell(sells)
+    ),
+    "best_routes": lambda df, buys, sells, pairs: _records(
+        _best_routes(buys, sells, pairs=pairs)
+    ),
+    "pending_goods": lambda df, buys, sells, pairs: _records(
+        _pending_inventory(buys, sells)
+    ),
+    "last_transactions": lambda df, buys, sells, pairs: _records(
+        _last_transactions(df)
+    ),
+}
+
+_EMPTY = pd.DataFrame(
+    {
+        "timestamp": pd.Series(dtype="datetime64[us]"),
+        "operation": pd.Series(dtype=object),
+        "shopId": pd.Series(dtype=object),
+        "shopName": pd.Series(dtype=object),
+        "resourceGUID": pd.Series(dtype=object),
+        "quantity": pd.Series(dtype="int64"),
+        "shopPricePerCentiSCU": pd.Series(dtype="int64"),
+        "price": pd.Series(dtype="int64"),
+        "amount": pd.Series(dtype="int64"),
+    }
+)
+
+
+def _micros(ts: datetime) -> int:
+    return (ts - _EPOCH) // _MICRO
+
+
+class QueryEngine:
+    """Time-sorted record store answering filtered ``analyse`` sections.
+
+    Records are kept in timestamp order, so a ``since``/``until`` window is
+    two binary searches over the timestamp column; shop and resource
+    filters compare interned integer codes inside that window only.
+    Results are kept in a small LRU cache that is emptied whenever records
+    are added.  ``extend`` may run on another thread than ``query``.
+    """
+
+    def __init__(self, records: Iterable[dict] = (), cache_size: int = 128) -> None:
+        self.store = RecordStore()
+        self.last_ts: Optional[datetime] = None
+        self.generation = 0
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.extend(records)
+
+    def extend(self, records: Iterable[dict]) -> None:
+        """Add records; a batch older than the newest one forces a re-sort."""
+        batch = sorted(records, key=itemgetter("timestamp"))
+        if not batch:
+            return
+        with self._lock:
+            if self.last_ts is not None and batch[0]["timestamp"] < self.last_ts:
+                # rare (a backup log showing up late): rebuild in order
+                merged = sorted(
+                    chain(self.store, batch), key=itemgetter("timestamp")
+                )
+                self.store = RecordStore(merged)
+            else:
+                self.store.extend(batch)
+            newest = batch[-1]["timestamp"]
+            if self.last_ts is None or newest > self.last_ts:
+                self.last_ts = newest
+            self.generation += 1
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _rows(
+        self,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        shops: Sequence[str],
+        resources: Sequence[str],
+    ):
+        """Row positions in the window that pass the filters (lock held)."""
+        store = self.store
+        ts = np.frombuffer(store.timestamp, dtype=np.int64)
+        lo = int(np.searchsorted(ts, _micros(since), "left")) if since else 0
+        hi = int(np.searchsorted(ts, _micros(until), "right")) if until else len(ts)
+        del ts  # release the buffer so the array can grow again
+        hi = max(lo, hi)
+        positions = None  # None: every row of lo:hi
+        for values, column, pool in (
+            (shops, store.shop_id, store.shops),
+            (resources, store.resource, store.resources),
+        ):
+            if not values:
+                continue
+            codes = [pool.codes[v] for v in values if v in pool.codes]
+            col = np.frombuffer(column, dtype=np.int32)
+            picked = col[lo:hi] if positions is None else col[positions]
+            del col
+            mask = np.isin(picked, codes)
+            if positions is None:
+                positions = lo + np.flatnonzero(mask)
+            else:
+                positions = positions[mask]
+        return slice(lo, hi) if positions is None else positions
+
+    def frame(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        shops: Sequence[str] = (),
+        resources: Sequence[str] = (),
+    ) -> pd.DataFrame:
+        """Fixed-point DataFrame of the matching records."""
+        with self._lock:
+            if not len(self.store):
+                return _EMPTY.copy()
+            return self.store.to_frame(self._rows(since, until, shops, resources))
+
+    def query(
+        self,
+        view: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        shops: Sequence[str] = (),
+        resources: Sequence[str] = (),
+        route_pairs: int = 1,
+    ) -> dict:
+        """Return ``{"count": rows, "result": ...}`` for one ``VIEWS`` entry."""
+        fn = VIEWS[view]
+        key = (
+            view,
+            since,
+            until,
+            tuple(sorted(shops)),
+            tuple(sorted(resources)),
+            route_pairs,
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            generation = self.generation
+        df = self.frame(since, until, shops, resources)
+        df = df[df.quantity > 0]
+        buys = df[df.operation == "Buy"]
+        sells = df[df.operation == "Sell"]
+        out = {"count": int(len(df)), "result": fn(df, buys, sells, route_pairs)}
+        with self._lock:
+            # records added meanwhile make this result stale; don't keep it
+            if generation == self.generation:
+                self._cache[key] = out
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return out
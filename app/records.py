@@ -0,0 +1,191 @@
+"""Compact columnar storage for parsed trade events."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from .config import MONEY_SCALE, QTY_SCALE
+
+__all__ = ["RecordStore"]
+
+OPERATIONS = ("Buy", "Sell", "Move", "Stock")
+_OP_CODES = {op: i for i, op in enumerate(OPERATIONS)}
+_EPOCH = datetime(1970, 1, 1)
+_MICRO = timedelta(microseconds=1)
+
+
+def _np(col: array, dtype, index=slice(None)) -> np.ndarray:
+    # copy: a live view would stop the array from growing
+    return np.frombuffer(col, dtype=dtype)[index].copy()
+
+
+class _Interned:
+    """String pool handing out small integer codes."""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def take(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(self.values, dtype=object)[codes]
+
+
+class RecordStore:
+    """Append-only columns of trade events with interned strings.
+
+    Timestamps are epoch microseconds, quantities centi-SCU and money
+    micro-aUEC (see ``config``), all in typed arrays; ``shopId``,
+    ``shopName`` and ``resourceGUID`` are stored as codes into per-column
+    string pools.  A record costs about 50 bytes instead of a dict of
+    Decimals and a datetime.
+    """
+
+    def __init__(self, records: Iterable[dict] = ()) -> None:
+        self.timestamp = array("q")
+        self.operation = array("b")
+        self.shop_id = array("i")
+        self.shop_name = array("i")
+        self.resource = array("i")
+        self.quantity = array("q")
+        self.shop_price = array("q")
+        self.price = array("q")
+        self.amount = array("q")
+        self.shops = _Interned()
+        self.shop_names = _Interned()
+        self.resources = _Interned()
+        self.extend(records)
+
+    # ────────── writing ──────────
+    def append(self, rec: dict) -> None:
+        """Add one parser record (Decimal/datetime values)."""
+        ts = rec["timestamp"]
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        self.timestamp.append((ts - _EPOCH) // _MICRO)
+        self.operation.append(_OP_CODES[rec["operation"]])
+        self.shop_id.append(self.shops.code(rec["shopId"]))
+        self.shop_name.append(self.shop_names.code(rec["shopName"]))
+        self.resource.append(self.resources.code(rec["resourceGUID"]))
+        self.quantity.append(round(rec["quantity"] * QTY_SCALE))
+        self.shop_price.append(round(rec["shopPricePerCentiSCU"] * MONEY_SCALE))
+        self.price.append(round(rec["price"] * MONEY_SCALE))
+        self.amount.append(round(rec["amount"] * MONEY_SCALE))
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for rec in records:
+            self.append(rec)
+
+    # ────────── reading ──────────
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays (string pools excluded)."""
+        return sum(
+            col.itemsize * len(col)
+            for col in (
+                self.timestamp,
+                self.operation,
+                self.shop_id,
+                self.shop_name,
+                self.resource,
+                self.quantity,
+                self.shop_price,
+                self.price,
+                self.amount,
+            )
+        )
+
+    def row(self, i: int) -> tuple:
+        """Record ``i`` as one of the tuples :meth:`rows` yields."""
+        return (
+            _EPOCH + self.timestamp[i] * _MICRO,
+            OPERATIONS[self.operation[i]],
+            self.shops.values[self.shop_id[i]],
+            self.resources.values[self.resource[i]],
+            self.quantity[i],
+            self.price[i],
+            self.amount[i],
+        )
+
+    def rows(self, by_time: bool = False) -> Iterator[tuple]:
+        """Yield plain tuples with fixed-point integers instead of dicts.
+
+        Fields: timestamp, operation, shopId, resourceGUID, quantity, price,
+        amount.  ``by_time`` yields them in stable timestamp order.
+        """
+        shops = self.shops.values
+        resources = self.resources.values
+        index = range(len(self))
+        if by_time:
+            ts = _np(self.timestamp, np.int64)
+            index = np.argsort(ts, kind="stable").tolist()
+        for i in index:
+            yield (
+                _EPOCH + self.timestamp[i] * _MICRO,
+                OPERATIONS[self.operation[i]],
+                shops[self.shop_id[i]],
+                resources[self.resource[i]],
+                self.quantity[i],
+                self.price[i],
+                self.amount[i],
+            )
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield parser-shaped dicts, rebuilt lazily for compatibility."""
+        names = self.shop_names.values
+        for (ts, op, shop, res, qty, price, amount), name, shop_price in zip(
+            self.rows(), self.shop_name, self.shop_price
+        ):
+            yield {
+                "timestamp": ts,
+                "operation": op,
+                "shopId": shop,
+                "shopName": names[name],
+                "resourceGUID": res,
+                "quantity": Decimal(qty) / QTY_SCALE,
+                "shopPricePerCentiSCU": Decimal(shop_price) / MONEY_SCALE,
+                "price": Decimal(price) / MONEY_SCALE,
+                "amount": Decimal(amount) / MONEY_SCALE,
+            }
+
+    def to_frame(self, index=slice(None)) -> pd.DataFrame:
+        """Return a fixed-point DataFrame for ``analyse(..., numeric="fixed")``.
+
+        ``index`` (a slice or integer positions) selects rows without
+        copying the other ones.
+        """
+        if not len(self):
+            return pd.DataFrame()
+
+        def col(values, dtype):
+            return _np(values, dtype, index)
+
+        return pd.DataFrame(
+            {
+                "timestamp": pd.to_datetime(col(self.timestamp, np.int64), unit="us"),
+                "operation": np.asarray(OPERATIONS, dtype=object)[
+                    col(self.operation, np.int8)
+                ],
+                "shopId": self.shops.take(col(self.shop_id, np.int32)),
+                "shopName": self.shop_names.take(col(self.shop_name, np.int32)),
+                "resourceGUID": self.resources.take(col(self.resource, np.int32)),
+                "quantity": col(self.quantity, np.int64),
+                "shopPricePerCentiSCU": col(self.shop_price, np.int64),
+                "price": col(self.price, np.int64),
+                "amount": col(self.amount, np.int64),
+            }
+        )
@@ -0,0 +1,248 @@
+"""Synthetic trade records shaped like ``log_parser`` output, for scale tests.
+
+``format_line`` and ``write_logs`` turn them back into ``Game.log`` lines in
+the exact formats ``config.LINE_RE``/``FIELD_RE`` parse, mixed with the kind
+of unrelated lines a real log is mostly made of.
+"""
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional
+
+from .config import PRICE_FACTOR
+
+__all__ = [
+    "append_live",
+    "format_line",
+    "log_lines",
+    "synthetic_records",
+    "write_logs",
+]
+
+
+# operations whose request carries ``price`` rather than ``amount``
+_PRICED = ("Buy", "Stock")
+
+
+def _guid(rng: random.Random) -> str:
+    h = f"{rng.getrandbits(128):032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def synthetic_records(
+    n: int,
+    shops: int = 50,
+    resources: int = 20,
+    seed: int = 0,
+    start: datetime = datetime(2025, 1, 1),
+    mix: tuple = (0.45, 0.45, 0.1),
+) -> Iterator[dict]:
+    """Yield ``n`` time-ordered Buy/Sell/Move(/Stock) records.
+
+    Each commodity has a base price and each shop a markup, so averages,
+    routes and hauls have realistic spread.  ``mix`` gives the Buy, Sell,
+    Move and optionally Stock shares.
+    """
+    rng = random.Random(seed)
+    shop_ids = [str(3_657_000_000_000 + i * 7919) for i in range(shops)]
+    res_ids = [_guid(rng) for _ in range(resources)]
+    base = {r: rng.uniform(200, 20_000) for r in res_ids}
+    markup = {s: rng.uniform(0.85, 1.15) for s in shop_ids}
+    ops = ("Buy", "Sell", "Move", "Stock")[: len(mix)]
+
+    ts = start
+    for _ in range(n):
+        ts += timedelta(milliseconds=rng.randint(500, 120_000))
+        op = rng.choices(ops, weights=mix)[0]
+        shop = rng.choice(shop_ids)
+        res = rng.choice(res_ids)
+        qty = rng.randint(1, 400)
+        unit = round(base[res] * markup[shop], 2)
+        total = Decimal(f"{unit * qty:.6f}")
+        yield {
+            "timestamp": ts,
+            "operation": op,
+            "shopId": shop,
+            "shopName": f"SCShop_synthetic_{shop[-4:]}",
+            "resourceGUID": res,
+            "quantity": Decimal(qty),
+            "shopPricePerCentiSCU": (
+                Decimal(f"{unit / 100:.6f}") * PRICE_FACTOR
+                if op in _PRICED
+                else Decimal("0")
+            ),
+            "price": total if op in _PRICED else Decimal("0"),
+            "amount": total if op not in _PRICED else Decimal("0"),
+        }
+
+
+# ───────────────── log lines ──────────────────
+
+PLAYER_ID = "3563068139983"
+_TAIL = "[Team_CoreGameplayFeatures][Shops][UI]"
+
+# unrelated lines seen in real logs; a few mention the commodity kiosk so the
+# byte-level prefilter has near misses to reject as well
+_NOISE = (
+    "[Notice] <CreateCommodityInfo> Shopping Kiosk Context Component "
+    "CreateCommodityInfo " + _TAIL,
+    "[Notice] <CEntityComponentCommodityUIProvider::LoadShopInventoryData::"
+    "<lambda_1>::operator ()> AddingCommodityBox - playerId[{player}] "
+    "shopId[{shop}] shopName[{shop_name}] commodityName[ResourceType.{n}] "
+    "Cargo Box Data:  [boxSize[{box}] | unitAmount[{n}]] " + _TAIL,
+    "[Notice] <CEntityComponentCommodityUIProvider::LoadSelectedShipBindings> "
+    "Sending VehicleCargoDataRequest for vehicleEntityId[{entity}] " + _TAIL,
+    "[Notice] <CEntityComponentCommodityUIProvider::ClSetSelectedPlayerLocationInfo> "
+    "Selecting location with item(s) for LocationId[{entity}] "
+    "[Team_CoreGameplayFeatures][Shops]",
+    "[VK] Available Vulkan Layer - Layer: VK_LAYER_RTSS (RTSS overlay hook "
+    "bootstrap) Version: 1.3.224",
+    "GPU benchmark: {ms}.{n:02d} ms (Adapter index: 0, Num GPUs: 1)",
+    "[Notice] <ContextEstablisherTaskFinished> establisher=\"CReplicationModel\" "
+    "message=\"CET completed\" taskname=\"StreamingSync\" state=eCVS_InGame "
+    "status=Finished runningTime={ms}.{n:02d} [Team_Network][Network][Replication]",
+    "[Notice] <Actor Death> CActor::Kill: 'PU_Pilots-Human-Criminal-Gunner_{n}' "
+    "[{entity}] in zone 'OOC_Stanton_2b_Daymar' killed by '{player}' "
+    "[Team_ActorTech][Actor]",
+    "<Jump Drive State Changed> Now Idle [Team_VehicleFeatures][Vehicle]",
+)
+
+
+def _stamp(ts: datetime) -> str:
+    return f"<{ts:%Y-%m-%dT%H:%M:%S}.{ts.microsecond // 1000:03d}Z>"
+
+
+def format_line(rec: dict, player: str = PLAYER_ID) -> str:
+    """The ``Game.log`` line ``log_parser`` turns back into ``rec``.
+
+    Buy quantities are written in centi-SCU, the others in SCU, as the game
+    does; timestamps keep millisecond precision only.
+    """
+    op, shop = rec["operation"], rec["shopId"]
+    kiosk = int(shop) - 1 if shop.isdigit() else shop
+    head = (
+        f"{_stamp(rec['timestamp'])} [Notice] "
+        f"<CEntityComponentCommodityUIProvider::SendCommodity{op}Request> "
+        f"Sending SShopCommodity{op}Request - playerId[{player}] shopId[{shop}] "
+        f"shopName[{rec['shopName']}] kioskId[{kiosk}] "
+    )
+    res = f"resourceGUID[{rec['resourceGUID']}] autoLoading[0] "
+    qty = rec["quantity"]
+    if op in _PRICED:
+        # the parser multiplies shopPricePerCentiSCU by PRICE_FACTOR
+        unit = rec["shopPricePerCentiSCU"] / PRICE_FACTOR
+        qty_field = f"{qty * 100:.6f} cSCU" if op == "Buy" else f"{qty}"
+        return (
+            f"{head}price[{rec['price']:.6f}] shopPricePerCentiSCU[{unit:.6f}] "
+            f"{res}quantity[{qty_field}] Cargo Box Data: boxSize[8.000000] | "
+            f"unitAmount[{max(int(qty) // 8, 1)}] {_TAIL}"
+        )
+    return (
+        f"{head}amount[{rec['amount']:.6f}] {res}quantity[{qty}] "
+        f"transactionMode[Location] Cargo Box Data:  [boxSize[8] | "
+        f"unitAmount[{max(int(qty) // 8, 1)}]] {_TAIL}"
+    )
+
+
+def _noise_line(rng: random.Random, ts: datetime) -> str:
+    template = rng.choice(_NOISE)
+    shop = str(4_500_000_000_000 + rng.randrange(10**9))
+    return f"{_stamp(ts)} " + template.format(
+        player=PLAYER_ID,
+        shop=shop,
+        shop_name=f"SCShop_noise_{shop[-4:]}",
+        entity=4_300_000_000_000 + rng.randrange(10**11),
+        box=rng.choice((1, 2, 4, 8, 16, 24, 32)),
+        ms=rng.randrange(1, 500),
+        n=rng.randrange(100),
+    )
+
+
+def log_lines(
+    records: Iterable[dict], noise: float = 20.0, seed: int = 0
+) -> Iterator[str]:
+    """Lines of a log holding ``records``, about ``noise`` other lines apart.
+
+    Noise lines take timestamps between the surrounding events, so the log
+    stays in time order.
+    """
+    rng = random.Random(seed)
+    prev: Optional[datetime] = None
+    for rec in records:
+        ts = rec["timestamp"]
+        count = int(rng.expovariate(1 / noise)) if noise > 0 else 0
+        if count:
+            start = prev or ts - timedelta(seconds=count)
+            step = (ts - start) / (count + 1)
+            for i in range(count):
+                yield _noise_line(rng, start + step * (i + 1))
+        yield format_line(rec)
+        prev = ts
+
+
+def _log_name(ts: datetime) -> str:
+    return f"Game Build(9768350) {ts:%d %b %y (%H %M %S)}.log"
+
+
+def write_logs(
+    directory: Path,
+    records: Iterable[dict],
+    files: int = 1,
+    noise: float = 20.0,
+    seed: int = 0,
+    newline: str = "\n",
+    encoding: str = "utf-8",
+) -> List[Path]:
+    """Write ``records`` into ``files`` ``Game Build(...)``-style logs.
+
+    Each log starts with a short header, as the game's do, and is named after
+    its first event.  ``encoding="utf-16"`` writes a byte order mark first.
+    Returns the paths written, in time order.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    records = list(records)
+    per_file = -(-len(records) // max(files, 1)) or 1
+    paths = []
+    for part in range(0, len(records), per_file):
+        chunk = records[part:part + per_file]
+        first = chunk[0]["timestamp"]
+        path = directory / _log_name(first)
+        with path.open("w", encoding=encoding, newline="") as fh:
+            fh.write(f"{_stamp(first)} Log started on {first:%a %b %d %H:%M:%S %Y}"
+                     f"{newline}")
+            for line in log_lines(chunk, noise, seed + part):
+                fh.write(line + newline)
+        paths.append(path)
+    return paths
+
+
+def append_live(
+    fh: IO[str],
+    records: Iterable[dict],
+    rate: float = 1.0,
+    noise: float = 20.0,
+    seed: int = 0,
+    sleep=time.sleep,
+) -> int:
+    """Append ``records`` to an open log at ``rate`` events per second.
+
+    Timestamps are replaced with the current UTC time so a watching server
+    sees a session in progress; each line is flushed as it is written.
+    Returns the number of events written.
+    """
+    written = 0
+    for rec in records:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        rec = dict(rec, timestamp=now)
+        for line in log_lines([rec], noise, seed + written):
+            fh.write(line + "\n")
+        fh.flush()
+        written += 1
+        if rate > 0:
+            sleep(1 / rate)
+    return written
@@ -0,0 +1,186 @@
+"""Follow log files incrementally, parsing only bytes appended since last poll."""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import metrics
+from .cache import RecordCache
+from .log_parser import (
+    LOG_BYTES,
+    RECORDS,
+    collect_files,
+    read_records,
+    sniff_encoding,
+)
+from .records import RecordStore
+
+__all__ = ["FileCursor", "LogTailer"]
+
+
+@dataclass
+class FileCursor:
+    path: Path
+    inode: int
+    size: int
+    mtime_ns: int
+    offset: int = 0
+    records: RecordStore = field(default_factory=RecordStore)
+    encoding: Optional[str] = None  # sniffed on the first read
+
+
+def _read_or_none(
+    path: Path, start: int, encoding: Optional[str] = None
+) -> Optional[Tuple[List[dict], int]]:
+    try:
+        return read_records(path, start, partial=False, encoding=encoding)
+    except OSError:
+        return None
+
+
+class LogTailer:
+    """Keep one cursor per log so each poll only reads what was appended.
+
+    Files whose size and mtime did not change are never reopened.  A file
+    that shrank or was replaced (new inode) is re-read from the start; a file
+    that was merely renamed (same inode, e.g. ``Game.log`` moved into
+    ``logbackups``) keeps its cursor, also when a new file already took its
+    old path.  With ``jobs > 1`` the files that need
+    reading (typically all of them on the first poll) are parsed in a process
+    pool.  An optional :class:`RecordCache` serves unchanged files on the
+    first poll and receives every file that was parsed in full.  Parsed
+    records are retained per file in a compact :class:`RecordStore`.
+    """
+
+    def __init__(
+        self,
+        inputs: list[str],
+        jobs: int = 1,
+        cache: Optional[RecordCache] = None,
+    ) -> None:
+        self.inputs = inputs
+        self.jobs = jobs
+        self.cache = cache
+        self.cursors: Dict[Path, FileCursor] = {}
+        # set by poll(): ``reset`` means previously returned records were
+        # dropped, ``changed`` that anything at all differs from last poll
+        self.reset = False
+        self.changed = False
+
+    # ────────── helpers ──────────
+    def _stat_files(self) -> Dict[Path, os.stat_result]:
+        stats = {}
+        for path in collect_files(self.inputs):
+            try:
+                stats[path] = path.stat()
+            except OSError:
+                continue
+        return stats
+
+    def _adopt_renamed(self, stats: Dict[Path, os.stat_result]) -> None:
+        # cursors whose path is gone or now holds another file, e.g. after a
+        # game restart moved ``Game.log`` away and started a new one
+        moved: Dict[int, FileCursor] = {}
+        for path, cur in list(self.cursors.items()):
+            st = stats.get(path)
+            if st is None or st.st_ino != cur.inode:
+                moved[cur.inode] = self.cursors.pop(path)
+        for path, st in stats.items():
+            cur = moved.get(st.st_ino)
+            if path in self.cursors or cur is None or st.st_size < cur.offset:
+                continue
+            del moved[st.st_ino]
+            cur.path = path
+            self.cursors[path] = cur
+            self.changed = True
+        for cur in moved.values():
+            self.changed = True
+            if cur.records:
+                self.reset = True
+
+    # ────────── public API ──────────
+    def poll(self) -> List[dict]:
+        """Return records appended since the previous call."""
+        self.reset = False
+        self.changed = False
+        with metrics.timed("discover"):
+            stats = self._stat_files()
+            self._adopt_renamed(stats)
+
+        new: List[dict] = []
+        todo: List[Tuple[FileCursor, os.stat_result]] = []
+        for path, st in stats.items():
+            cur = self.cursors.get(path)
+            if cur is not None and (
+                st.st_ino != cur.inode or st.st_size < cur.offset
+            ):
+                self.reset = self.reset or bool(cur.records)
+                cur = None
+            if cur is None:
+                cur = FileCursor(path, st.st_ino, -1, 0)
+                self.cursors[path] = cur
+                self.changed = True
+                cached = self._from_cache(path, st)
+                if cached is not None:
+                    cur.size, cur.mtime_ns = st.st_size, st.st_mtime_ns
+                    cur.offset = st.st_size
+                    cur.records = RecordStore(cached)
+                    new.extend(cached)
+                    continue
+            if st.st_size == cur.size and st.st_mtime_ns == cur.mtime_ns:
+                continue
+            cur.size, cur.mtime_ns = st.st_size, st.st_mtime_ns
+            if st.st_size > cur.offset:
+                if cur.encoding is None:
+                    with suppress(OSError):
+                        cur.encoding = sniff_encoding(cur.path)
+                todo.append((cur, st))
+
+        with metrics.timed("parse"):
+            for (cur, st), result in zip(todo, self._read(todo)):
+                if result is None:
+                    continue
+                whole = cur.offset == 0
+                records, cur.offset = result
+                if whole and self.cache is not None and cur.offset == cur.size:
+                    with suppress(OSError):
+                        self.cache.put(cur.path, records, st)
+                if records:
+                    cur.records.extend(records)
+                    new.extend(records)
+                    self.changed = True
+        return new
+
+    def _from_cache(
+        self, path: Path, st: os.stat_result
+    ) -> Optional[List[dict]]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(path, st)
+        except OSError:
+            return None
+
+    def _read(self, todo: List[Tuple[FileCursor, os.stat_result]]):
+        paths = [cur.path for cur, _ in todo]
+        offsets = [cur.offset for cur, _ in todo]
+        encodings = [cur.encoding for cur, _ in todo]
+        if self.jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                results = list(pool.map(_read_or_none, paths, offsets, encodings))
+            # the workers count into their own registries; lines go uncounted
+            for start, result in zip(offsets, results):
+                if result is not None:
+                    LOG_BYTES.inc(result[1] - start)
+                    RECORDS.inc(len(result[0]))
+            return results
+        return map(_read_or_none, paths, offsets, encodings)
+
+    def records(self) -> Iterator[dict]:
+        """Yield every record currently known, file by file."""
+        for cur in self.cursors.values():
+            yield from cur.records
@@ -0,0 +1,186 @@
+"""Wake the ingestion loop when log files change.
+
+On Linux an inotify watch reports writes within milliseconds; elsewhere, or
+when inotify is unavailable, a plain timer is used and the tailer's stat
+checks find the changes.
+"""
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+__all__ = ["PollingWatcher", "InotifyWatcher", "make_watcher"]
+
+log = logging.getLogger(__name__)
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+)
+_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """Fallback backend: wake up every ``interval`` seconds."""
+
+    def __init__(self, root: Path, interval: float = 10.0) -> None:
+        self.root = Path(root)
+        self.interval = interval
+
+    async def wait(self) -> bool:
+        await asyncio.sleep(self.interval)
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux backend: wake up as soon as anything under ``root`` is written.
+
+    Bursts of events (the game flushes many lines per second) are coalesced
+    for ``debounce`` seconds; ``interval`` still bounds the wait so missed
+    events on unusual filesystems are caught by the next poll.
+    """
+
+    def __init__(
+        self, root: Path, interval: float = 10.0, debounce: float = 0.2
+    ) -> None:
+        self.root = Path(root)
+        self.interval = interval
+        self.debounce = debounce
+        name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        self._event: Optional[asyncio.Event] = None
+        # the loop the fd is registered with while a wait() is listening
+        self._reader: Optional[asyncio.AbstractEventLoop] = None
+        self._add_tree(self.root)
+        if not self._dirs:
+            os.close(self._fd)
+            raise OSError(f"cannot watch {self.root}")
+
+    def _add_tree(self, top: Path) -> None:
+        for dirpath, _, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dirpath), _MASK
+            )
+            if wd >= 0:
+                self._dirs[wd] = Path(dirpath)
+
+    def _drain(self) -> bool:
+        """Consume pending events; return True if any arrived."""
+        seen = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return seen
+            if not buf:
+                return seen
+            seen = True
+            pos = 0
+            while pos < len(buf):
+                wd, mask, _, length = _EVENT.unpack_from(buf, pos)
+                name = buf[pos + _EVENT.size:pos + _EVENT.size + length]
+                pos += _EVENT.size + length
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                elif mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    parent = self._dirs.get(wd)
+                    if parent is not None:
+                        self._add_tree(parent / os.fsdecode(name.rstrip(b"\0")))
+
+    def _listen(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._reader is None:
+            loop.add_reader(self._fd, self._on_readable)
+            self._reader = loop
+
+    def _unlisten(self) -> None:
+        if self._reader is not None:
+            if not self._reader.is_closed():
+                self._reader.remove_reader(self._fd)
+            self._reader = None
+
+    def _on_readable(self) -> None:
+        # the fd is level-triggered: stay registered only until the first
+        # wake-up, or events piling up during a rescan would spin the loop
+        self._unlisten()
+        if self._event is not None:
+            self._event.set()
+
+    async def wait(self) -> bool:
+        """Return True after a (debounced) change, False on timeout."""
+        loop = asyncio.get_running_loop()
+        if self._event is None:
+            self._event = asyncio.Event()
+        self._event.clear()
+        deadline = loop.time() + self.interval
+        while True:
+            self._listen(loop)
+            try:
+                await asyncio.wait_for(
+                    self._event.wait(), max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                self._unlisten()
+                return self._drain()
+            self._event.clear()
+            # a wake-up may be for events an earlier wait() already drained
+            if self._drain():
+                await asyncio.sleep(self.debounce)
+                self._drain()
+                return True
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        self._unlisten()
+        os.close(self._fd)
+        self._fd = -1
+
+
+def make_watcher(
+    root: Path, backend: str = "auto", interval: float = 10.0, debounce: float = 0.2
+):
+    """Return a watcher for ``root``.
+
+    ``backend`` is ``"inotify"``, ``"poll"`` or ``"auto"`` (inotify on Linux
+    when the directory can be watched, polling otherwise).
+    """
+    if backend not in ("auto", "inotify", "poll"):
+        raise ValueError(f"unknown watch backend {backend!r}")
+    if backend == "inotify" or (backend == "auto" and sys.platform == "linux"):
+        try:
+            return InotifyWatcher(root, interval, debounce)
+        except (OSError, AttributeError):
+            if backend == "inotify":
+                raise
+            log.info("inotify unavailable for %s, polling instead", root)
+    return PollingWatcher(root, interval)
@@ -0,0 +1,75 @@
+"""Event loop responsiveness and ingestion timings for ``/api/health``."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque
+
+__all__ = ["IngestStats", "LoopLag"]
+
+
+class LoopLag:
+    """Measure how late the event loop wakes up from short sleeps.
+
+    A loop blocked by synchronous work overshoots every ``interval`` sleep
+    by the length of the block, so the overshoot is the delay any request or
+    WebSocket send would have seen at that moment.
+    """
+
+    def __init__(self, interval: float = 0.05, window: int = 1200) -> None:
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.worst = 0.0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.samples.append(lag)
+            self.worst = max(self.worst, lag)
+
+    def snapshot(self) -> dict:
+        """Lag statistics in milliseconds over the recent window."""
+        if not self.samples:
+            return {"samples": 0}
+        ordered = sorted(self.samples)
+        return {
+            "samples": len(ordered),
+            "last_ms": round(self.samples[-1] * 1000, 3),
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+            "p99_ms": round(ordered[int(len(ordered) * 0.99)] * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+            "max_ever_ms": round(self.worst * 1000, 3),
+        }
+
+
+class IngestStats:
+    """Durations of the rescans run by the ingestion worker."""
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.running = False
+        self.last = 0.0
+        self.worst = 0.0
+        self._start = 0.0
+
+    def begin(self) -> None:
+        self.running = True
+        self._start = time.perf_counter()
+
+    def end(self) -> None:
+        self.last = time.perf_counter() - self._start
+        self.worst = max(self.worst, self.last)
+        self.runs += 1
+        self.running = False
+
+    def snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "running": self.running,
+            "last_ms": round(self.last * 1000, 3),
+            "max_ms": round(self.worst * 1000, 3),
+        }
@@ -0,0 +1,281 @@
+"""Fan out dashboard contexts to WebSocket and HTTP clients.
+
+Each new context is serialised once and only pushed when its JSON differs
+from the previous one.  Clients that asked for patches and saw the previous
+version receive an RFC 6902 style list of operations instead of the whole
+document.  HTTP polling gets the same bytes with an ETag, compressed at most
+once per version.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+try:  # optional: several times faster than the stdlib encoder
+    import orjson
+except ImportError:
+    orjson = None
+try:  # optional: smaller than gzip for browsers that accept it
+    import brotli
+except ImportError:
+    brotli = None
+
+__all__ = [
+    "Broadcaster",
+    "Snapshot",
+    "apply_patch",
+    "dumps",
+    "is_fresh",
+    "json_diff",
+    "pick_encoding",
+]
+
+# bodies smaller than this are sent uncompressed
+MIN_COMPRESS = 512
+
+_COMPRESSORS = {"gzip": lambda body: gzip.compress(body, mtime=0)}
+if brotli is not None:
+    _COMPRESSORS["br"] = brotli.compress
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialise ``obj`` to JSON bytes, with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def pick_encoding(accept: str, size: int) -> Optional[str]:
+    """Return ``"br"``, ``"gzip"`` or ``None`` for an Accept-Encoding value."""
+    if size < MIN_COMPRESS:
+        return None
+    offered = {}
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    for name in ("br", "gzip"):
+        if name in _COMPRESSORS and offered.get(name, 0) > 0:
+            return name
+    return None
+
+
+def is_fresh(
+    headers: Mapping[str, str], etag: str, modified: Optional[float]
+) -> bool:
+    """True if a conditional request already holds this version.
+
+    ``If-Modified-Since`` is only used without ``If-None-Match`` and when
+    ``modified`` is given; pass None for a version whose second it shares
+    with another.
+    """
+    match = headers.get("if-none-match")
+    if match is not None:
+        tags = [t.strip().removeprefix("W/") for t in match.split(",")]
+        return "*" in tags or etag in tags
+    since = headers.get("if-modified-since")
+    if since and modified is not None:
+        try:
+            return int(modified) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _pointer(path: str, key: Any) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[dict]:
+    """Return ``add``/``remove``/``replace`` operations turning old into new.
+
+    Dicts are compared key by key and lists of equal length item by item;
+    a list that only grew gets ``add`` operations for the new tail.  Any
+    other change replaces the value at ``path``.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [
+            {"op": "remove", "path": _pointer(path, k)} for k in old if k not in new
+        ]
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, _pointer(path, key)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        n = len(old)
+        if len(new) == n:
+            ops = []
+            for i, (a, b) in enumerate(zip(old, new)):
+                ops.extend(json_diff(a, b, _pointer(path, i)))
+            return ops
+        if len(new) > n and new[:n] == old:
+            return [
+                {"op": "add", "path": f"{path}/-", "value": value}
+                for value in new[n:]
+            ]
+    if type(old) is not type(new) or old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def _parent(doc: Any, path: str) -> Tuple[Any, str]:
+    parts = [p.replace("~1", "/").replace("~0", "~") for p in path.split("/")[1:]]
+    for part in parts[:-1]:
+        doc = doc[int(part)] if isinstance(doc, list) else doc[part]
+    return doc, parts[-1]
+
+
+def apply_patch(doc: Any, ops: List[dict]) -> Any:
+    """Apply ``json_diff`` output to ``doc`` in place and return it."""
+    for op in ops:
+        if op["path"] == "":
+            doc = op["value"]
+            continue
+        parent, key = _parent(doc, op["path"])
+        if isinstance(parent, list):
+            if key == "-":
+                parent.append(op["value"])
+            elif op["op"] == "remove":
+                del parent[int(key)]
+            else:
+                parent[int(key)] = op["value"]
+        elif op["op"] == "remove":
+            del parent[key]
+        else:
+            parent[key] = op["value"]
+    return doc
+
+
+class Snapshot:
+    """One published version: the context and everything derived from it.
+
+    Snapshots are never modified after ``Broadcaster.prepare`` except for
+    the lazily filled compression cache, so a reader holding one sees a
+    consistent body, ETag and patch even while a newer version is swapped
+    in.
+    """
+
+    __slots__ = ("version", "ctx", "doc", "body", "text", "etag", "modified",
+                 "dated", "patch", "_encoded")
+
+    def __init__(self, version, ctx, doc, body, patch, after: float = 0.0) -> None:
+        self.version: int = version
+        self.ctx: Optional[dict] = ctx
+        self.doc: Any = doc  # ``body`` parsed back, used to diff the next one
+        self.body: bytes = body
+        self.text: str = body.decode()
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        self.modified = time.time()
+        # Last-Modified has whole seconds: it only identifies this version if
+        # the previous one (modified at ``after``) was from an earlier second
+        self.dated = int(self.modified) > int(after)
+        self.patch: Optional[str] = patch
+        self._encoded: Dict[str, bytes] = {}
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag of the body as sent with ``encoding``, e.g. ``"…-br"``.
+
+        Each representation needs its own strong validator, so a cache
+        never answers a gzip request with a stored brotli body.
+        """
+        return f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+
+    def cached(self, encoding: str) -> Optional[bytes]:
+        return self._encoded.get(encoding)
+
+    def encoded(self, encoding: str) -> bytes:
+        """The body compressed with ``encoding``, built once."""
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = self._encoded[encoding] = _COMPRESSORS[encoding](self.body)
+        return data
+
+
+class Broadcaster:
+    """Latest dashboard context plus a change signal for subscribers.
+
+    ``publish`` is cheap to call with an unchanged context: the JSON text is
+    compared and nothing is pushed.  Subscribers ``wait`` for a version newer
+    than the one they hold and then pick ``message(version)``.
+
+    The expensive half, ``prepare``, may run in a worker thread; ``commit``
+    swaps the result in on the event loop with a single assignment.
+    """
+
+    def __init__(self) -> None:
+        self.current = Snapshot(0, None, {}, b"{}", None)
+        self._changed = asyncio.Event()
+
+    # the fields of the current snapshot, for readers that need just one
+    version = property(lambda self: self.current.version)
+    latest = property(lambda self: self.current.ctx)
+    body = property(lambda self: self.current.body)
+    text = property(lambda self: self.current.text)
+    etag = property(lambda self: self.current.etag)
+    modified = property(lambda self: self.current.modified)
+
+    def prepare(self, ctx: dict) -> Optional[Snapshot]:
+        """Serialise and diff ``ctx``; return None if it is unchanged."""
+        cur = self.current
+        body = dumps(ctx)
+        if cur.ctx is not None and body == cur.body:
+            return None
+        # diff the JSON forms so tuples, ints vs floats etc. match the wire
+        doc = json.loads(body)
+        patch = None
+        if cur.ctx is not None:
+            patch = dumps(json_diff(cur.doc, doc)).decode()
+            # a patch bigger than the document helps nobody
+            if len(patch) >= len(body):
+                patch = None
+        after = cur.modified if cur.ctx is not None else 0.0
+        return Snapshot(cur.version + 1, ctx, doc, body, patch, after)
+
+    def commit(self, snap: Optional[Snapshot]) -> bool:
+        """Make ``snap`` current and wake subscribers."""
+        if snap is None:
+            return False
+        self.current = snap
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return True
+
+    def publish(self, ctx: dict) -> bool:
+        """Store ``ctx`` and wake subscribers; return False if unchanged."""
+        return self.commit(self.prepare(ctx))
+
+    def encoded(self, encoding: str) -> bytes:
+        """The current body compressed with ``encoding``, built once."""
+        return self.current.encoded(encoding)
+
+    async def wait(self, version: int) -> int:
+        """Return once a version newer than ``version`` is available."""
+        while self.version <= version:
+            await self._changed.wait()
+        return self.version
+
+    def message(self, have: int, patches: bool = False) -> str:
+        """Text to send a client holding version ``have``.
+
+        Plain clients get the bare context as before.  Patch clients get
+        ``{"type": "snapshot"|"patch", "version": n, ...}`` envelopes; a
+        patch is only sent when ``have`` is exactly the previous version.
+        """
+        snap = self.current
+        if not patches:
+            return snap.text
+        if have == snap.version - 1 and have > 0 and snap.patch is not None:
+            return f'{{"type": "patch", "version": {snap.version}, "ops": {snap.patch}}}'
+        return f'{{"type": "snapshot", "version": {snap.version}, "data": {snap.text}}}'
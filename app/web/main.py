@@ -1,20 +1,51 @@
 from pathlib import Path
 import os
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from fastapi import Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
+from fastapi import HTTPException, Query, Request
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
+from itertools import chain
+from operator import itemgetter
 import asyncio
-import pandas as pd
-import json
 from pydantic import BaseModel
-from ..log_parser import collect_files, iter_records
-from ..analysis import analyse
+from ..metrics import cycle, gauge, is_enabled, render_prometheus, timed, timings
+from ..profiling import NO_CAPTURE, ProfileMiddleware, profiler
+from ..cache import CACHE_PATH, RecordCache
+from ..tail import LogTailer
+from ..watcher import make_watcher
+from .health import IngestStats, LoopLag
+from .hub import Broadcaster, is_fresh, pick_encoding
+from .tables import TABLES, TableSet
+from ..analysis import TradeAggregator
+from ..hauls import HaulTracker, HaulView
+from ..labels import label_rows
+from ..log_parser import merge_by_time
+from ..prices import (
+    RESOLUTIONS,
+    SHOP_RESOLUTIONS,
+    PriceRollups,
+    floor_time,
+    pick_resolution,
+)
+from ..query import VIEWS, QueryEngine
 from ..db import (
     init_db,
     get_all_names,
+    get_price_bars,
+    last_price_buckets,
+    load_trade_events,
+    name_changes,
+    names_snapshot,
+    price_bounds,
+    save_price_bars,
+    save_trade_events,
+    trade_events_stored,
+    save_names,
     save_resource_name,
     save_shop_name,
 )
@@ -26,19 +57,33 @@ DEFAULT_LOG_ROOT = Path.home() / "StarCitizen" / "LIVE"
 # directory. ``Path`` accepts a ``Path`` instance so the default can remain a
 # ``Path`` object without string conversion.
 LOG_ROOT = Path(os.environ.get("LOG_ROOT", DEFAULT_LOG_ROOT))
+# Worker processes used to parse logs; >1 speeds up the cold start on folders
+# with many historical logs.
+PARSE_JOBS = int(os.environ.get("PARSE_JOBS", "1"))
+# "auto" reacts to writes through inotify on Linux and falls back to polling
+# every WATCH_INTERVAL seconds; "poll" forces the fallback.
+WATCH_BACKEND = os.environ.get("WATCH_BACKEND", "auto")
+WATCH_INTERVAL = float(os.environ.get("WATCH_INTERVAL", "10"))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global hub, names_changed
     init_db()
-    task = asyncio.create_task(watch_logs())
+    # both signals belong to this event loop
+    hub = Broadcaster()
+    names_changed = asyncio.Event()
+    tasks = [asyncio.create_task(watch_logs()), asyncio.create_task(loop_lag.run())]
     try:
         yield
     finally:
-        task.cancel()
-        with suppress(asyncio.CancelledError):
-            await task
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
 
 app = FastAPI(title="SC Trade Dashboard API", lifespan=lifespan)
+app.add_middleware(ProfileMiddleware, profiler=profiler)
 app.mount(
     "/static",
     StaticFiles(directory=Path(__file__).parent / "static"),
@@ -50,29 +95,456 @@ app.mount(
 async def root(request: Request):
     return templates.TemplateResponse("dashboard.html", {"request": request})
 
-_latest_ctx: dict | None = None
+hub = Broadcaster()
+names_changed = asyncio.Event()  # set after a name is saved
+haul_view = HaulView()  # replaced, never changed, by the ingestion loop
+query_engine = QueryEngine()
+# every table is served, empty, until the first version is published
+table_set = TableSet({name: [] for name in TABLES})
+loop_lag = LoopLag()
+ingest_stats = IngestStats()
+log_files = gauge("log_files", "Log files followed.")
+records_held = gauge("records_held", "Trade records held in memory.")
+
+
+def _haul_json(haul: dict) -> dict:
+    row = dict(haul)
+    for key in ("quantity", "buy_price", "sell_price", "profit"):
+        row[key] = float(row[key])
+    row["timestamp"] = haul["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
+    return row
+
+
+def _haul_feed(view: HaulView, names_version: int = 0) -> dict:
+    return {
+        "count": len(view.hauls),
+        "profit_sc": float(view.profit),
+        "names": names_version,  # lets clients refetch labels after a rename
+    }
+
+
+def _feed_hauls(tracker: HaulTracker, tailer: LogTailer, new: list) -> HaulTracker:
+    """Fold ``new`` records into ``tracker`` or replay when out of order.
+
+    Lots are matched in time order, so a reset, or records older than the
+    last processed one (e.g. a backup log showing up late), rebuild the
+    tracker from a time-ordered merge of every file.
+    """
+    new = sorted(new, key=itemgetter("timestamp"))
+    if tailer.reset or (
+        new and tracker.last_ts is not None and new[0]["timestamp"] < tracker.last_ts
+    ):
+        tracker = HaulTracker()
+        tracker.consume(merge_by_time(c.records for c in tailer.cursors.values()))
+    else:
+        tracker.consume(new)
+    return tracker
+
+
+class _Ingest:
+    """Tailer and running aggregates, owned by the ingestion thread."""
+
+    def __init__(self, tailer: LogTailer) -> None:
+        self.tailer = tailer
+        self.aggregator = TradeAggregator()
+        self.hauls = HaulTracker()
+        self.haul_view = HaulView()  # what /api/hauls serves
+        self.query = QueryEngine()
+        self.prices = PriceRollups()
+        self.unsaved: list = []
+        self.resave = True  # offer every file, not just new lines
+        # newest stored bar bucket per resolution; read on the first persist
+        self.bars_until: dict[str, datetime] | None = None
+        self.rebuilt = True  # rollups built from the logs alone
+        self.ctx: dict | None = None  # last pushed context
+        self.tables = TableSet()
+
+    def step(self, hub: Broadcaster, force: bool = False):
+        """Fold in new log lines and apply renamed resources/shops.
+
+        Returns ``None`` when nothing changed, else the prepared hub snapshot
+        and the :class:`TableSet` to serve alongside it.
+        """
+        tailer = self.tailer
+        new = tailer.poll()
+        with timed("aggregate"):
+            if tailer.reset:
+                self.aggregator = TradeAggregator()
+                self.aggregator.extend(tailer.records())
+                self.query = QueryEngine(tailer.records())
+                self.prices = PriceRollups()
+                self.prices.extend(tailer.records())
+                self.unsaved, self.resave, self.rebuilt = [], True, True
+            else:
+                self.aggregator.extend(new)
+                self.query.extend(new)
+                self.prices.extend(new)
+                if not self.resave:
+                    self.unsaved.extend(new)
+        with timed("hauls"):
+            hauls = _feed_hauls(self.hauls, tailer, new)
+            # a fresh copy only when hauls were added or replayed
+            if hauls is not self.hauls or len(hauls.hauls) != len(self.haul_view):
+                self.haul_view = hauls.view()
+            self.hauls = hauls
+        if is_enabled():
+            log_files.set(len(tailer.cursors))
+            records_held.set(sum(len(c.records) for c in tailer.cursors.values()))
+        version, names = names_snapshot()
+        if tailer.changed or force or self.ctx is None:
+            ctx = self.aggregator.result()
+            # tables are paged through /api/tables; only their digests are pushed
+            with timed("tables"):
+                tables = TableSet(
+                    {name: label_rows(ctx.pop(name, []), names) for name in TABLES},
+                    names_version=version,
+                )
+        elif self.tables.names_version != version:
+            # only names changed: relabel the affected rows, keep the rest
+            changes = name_changes(self.tables.names_version) or names
+            ctx = dict(self.ctx)
+            with timed("tables"):
+                tables = self.tables.relabel(changes, version)
+        else:
+            return None
+        ctx["tables"] = tables.meta
+        ctx["log_info"] = {
+            "path": str(LOG_ROOT),
+            "count": len(tailer.cursors),
+        }
+        ctx["hauls"] = _haul_feed(self.haul_view, version)
+        self.ctx, self.tables = ctx, tables
+        with timed("serialise"):
+            return hub.prepare(ctx), tables
+
+    def persist(self) -> None:
+        """Store new trade events and the price bars touched since last time.
+
+        Events are stored in file order, one transaction per pass, so a log
+        whose last event is stored is stored whole.  After a restart or a
+        reset only the other logs are offered, in full; the events' natural
+        key turns the ones already stored into no-ops.  A backup log that
+        shows up late is stored like any new file.
+
+        Bars are kept per resolution from the newest stored bucket on.  Rollups rebuilt from the
+        logs still on disk lack the trades of rotated logs, so buckets older
+        than the newest stored one are never written, and the buckets from
+        there on are rolled up again from the stored events, which hold
+        every trade.
+        """
+        with timed("persist"):
+            records = self.unsaved
+            if self.resave:
+                logs = [
+                    c.records for c in self.tailer.cursors.values() if len(c.records)
+                ]
+                stored = trade_events_stored(s.row(len(s) - 1) for s in logs)
+                records = chain.from_iterable(
+                    s for s, done in zip(logs, stored) if not done
+                )
+            save_trade_events(records)
+            self.unsaved, self.resave = [], False
+            if self.bars_until is None:
+                self.bars_until = last_price_buckets()
+            until = self.bars_until
+            if self.rebuilt and until:
+                stored = PriceRollups()
+                stored.extend(load_trade_events(since=min(until.values())))
+                self.prices.update(stored)
+            self.rebuilt = False
+            bars = [
+                b for b in self.prices.flush()
+                if b["resolution"] not in until or b["bucket"] >= until[b["resolution"]]
+            ]
+            save_price_bars(bars)
+            for b in bars:
+                res = b["resolution"]
+                if res not in until or b["bucket"] > until[res]:
+                    until[res] = b["bucket"]
+
+
+async def _next_change(watcher) -> None:
+    """Return after a log write (or the watcher's timeout) or a rename."""
+    waits = [
+        asyncio.ensure_future(watcher.wait()),
+        asyncio.ensure_future(names_changed.wait()),
+    ]
+    try:
+        await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in waits:
+            task.cancel()
+    names_changed.clear()
 
 
 async def watch_logs():
-    """Background coroutine – rescans every 10 s and recalculates KPIs."""
-    global _latest_ctx
-    while True:
-        try:
-            files = collect_files([str(LOG_ROOT)])
-            df = pd.DataFrame(iter_records(files))
-            ctx = analyse(df)
-            ctx["log_info"] = {"path": str(LOG_ROOT), "count": len(files)}
-            _latest_ctx = ctx
-        except Exception:
-            import logging
-            logging.exception("Analyse failed:")
-        await asyncio.sleep(10)
+    """Background coroutine – recalculates KPIs whenever the logs change.
+
+    The watcher wakes the loop on writes under ``LOG_ROOT`` (or every
+    ``WATCH_INTERVAL`` seconds when polling).  Only bytes appended since the
+    previous poll are parsed and only the new records are folded into the
+    running aggregates; everything is rebuilt when a log was truncated or
+    replaced.  Saving a name wakes it too, to relabel the affected rows.
+
+    Parsing, aggregation and serialisation run on a dedicated worker
+    thread; the event loop only swaps the finished snapshot in, so requests
+    and WebSocket pushes keep flowing during a long rescan.
+    """
+    global haul_view, query_engine, table_set
+    cache = RecordCache(CACHE_PATH) if CACHE_PATH else None
+    ingest = _Ingest(LogTailer([str(LOG_ROOT)], jobs=PARSE_JOBS, cache=cache))
+    watcher = make_watcher(LOG_ROOT, WATCH_BACKEND, WATCH_INTERVAL)
+    worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            ingest_stats.begin()
+            capture = NO_CAPTURE
+            if profiler.armed["cycle"]:
+                # may take a tracemalloc snapshot: not on the loop
+                capture = await loop.run_in_executor(worker, profiler.start, "cycle")
+            update = None
+            try:
+                with cycle():
+                    update = await loop.run_in_executor(
+                        worker, capture.call, ingest.step, hub, hub.latest is None
+                    )
+                    if update is not None:
+                        snap, tables = update
+                        if snap is not None:
+                            table_set = tables
+                        with timed("publish"):
+                            hub.commit(snap)
+                    haul_view = ingest.haul_view
+                    query_engine = ingest.query
+                    # after the publish, so storage never delays the dashboard
+                    await loop.run_in_executor(worker, capture.call, ingest.persist)
+            except Exception:
+                import logging
+                logging.exception("Analyse failed:")
+            finally:
+                ingest_stats.end()
+                if update is None:
+                    # nothing changed: keep the slot for a cycle that does work
+                    profiler.discard(capture)
+                elif capture is not NO_CAPTURE:
+                    await loop.run_in_executor(worker, profiler.finish, capture)
+            await _next_change(watcher)
+    finally:
+        watcher.close()
+        # a cancelled rescan keeps running; don't wait for it on shutdown
+        worker.shutdown(wait=False, cancel_futures=True)
+
+
+def _naive_utc(ts: datetime | None) -> datetime | None:
+    if ts is not None and ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
 
 
 @app.get("/api/metrics")
-async def metrics():
+async def metrics(request: Request):
+    """Latest context as pre-serialised JSON.
+
+    Answers ``If-None-Match``/``If-Modified-Since`` with 304 and serves the
+    gzip/brotli body cached for the current version.  Each encoding gets its
+    own ETag, suffixed ``-gzip`` or ``-br``.
+    """
+    snap = hub.current
+    if snap.ctx is None:
+        return {"status": "bootstrapping"}
+    body = snap.body
+    encoding = pick_encoding(request.headers.get("accept-encoding", ""), len(body))
+    etag = snap.etag_for(encoding)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(snap.modified, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if is_fresh(request.headers, etag, snap.modified if snap.dated else None):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        # compressing a large context takes a while; keep it off the loop
+        body = snap.cached(encoding) or await asyncio.to_thread(
+            snap.encoded, encoding
+        )
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/health")
+async def health():
+    """Event loop lag and rescan durations, to spot a blocked loop."""
+    return {
+        "status": "ok" if hub.latest is not None else "bootstrapping",
+        "version": hub.version,
+        "loop_lag": loop_lag.snapshot(),
+        "ingest": ingest_stats.snapshot(),
+    }
 
-    return _latest_ctx or {"status": "bootstrapping"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Counters and stage timings in the Prometheus text format."""
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/api/debug/timings")
+async def debug_timings():
+    """Per-stage timing statistics and the last ingestion cycle's breakdown."""
+    return timings()
+
+
+@app.post("/api/debug/profile")
+async def arm_profiler(cycles: int = 0, requests: int = 0, memory: bool = False):
+    """Profile the next ``cycles`` log rescans and ``requests`` HTTP requests.
+
+    Dumps go to ``PROFILE_DIR``; ``memory=true`` adds tracemalloc snapshots.
+    Posting zeros disarms.
+    """
+    return profiler.arm(min(cycles, 100), min(requests, 1000), memory)
+
+
+@app.get("/api/debug/profile")
+async def profile_summary(top: int = 20, sort: str = "tottime", kind: str = ""):
+    """Top functions and allocation sites over the recent captures.
+
+    ``sort`` is ``tottime``, ``cumtime`` or ``calls``; ``kind`` narrows the
+    captures to ``cycle`` or ``request``.
+    """
+    if sort not in ("tottime", "cumtime", "calls"):
+        raise HTTPException(422, "sort must be 'tottime', 'cumtime' or 'calls'")
+    return await asyncio.to_thread(
+        profiler.summary, min(max(top, 1), 200), sort, kind
+    )
+
+
+@app.get("/api/hauls")
+async def hauls(
+    offset: int = 0,
+    limit: int = 100,
+    since: datetime | None = None,
+    until: datetime | None = None,
+):
+    """Completed hauls, newest first, optionally limited to a sell window."""
+    offset, limit = max(offset, 0), min(max(limit, 0), 1000)
+    view = haul_view
+    span = view.window(_naive_utc(since), _naive_utc(until))
+    page = span[::-1][offset:offset + limit]
+    # the first read after a rename goes to the database
+    names = await asyncio.to_thread(get_all_names)
+    return {
+        "total": len(span),
+        "offset": offset,
+        "limit": limit,
+        "hauls": label_rows([_haul_json(view.hauls[i]) for i in page], names),
+    }
+
+
+@app.get("/api/tables/{name}")
+async def table_page(
+    name: str,
+    offset: int = 0,
+    limit: int = 10,
+    sort: str | None = None,
+    order: str = "asc",
+):
+    """One page of a dashboard table from the latest version.
+
+    ``sort`` names a column; without it tables with a ``timestamp`` come
+    newest first.  The ``etag`` matches ``tables[name].etag`` in the pushed
+    context.
+    """
+    tables = table_set
+    if name not in TABLES:
+        raise HTTPException(404, f"unknown table {name!r}; try one of {list(TABLES)}")
+    offset, limit = max(offset, 0), min(max(limit, 0), 1000)
+    desc = order == "desc"
+    if len(tables.tables[name]) > 1000:
+        # sorting a long table the first time takes a moment; not on the loop
+        return await asyncio.to_thread(tables.page, name, offset, limit, sort, desc)
+    return tables.page(name, offset, limit, sort, desc)
+
+
+@app.get("/api/query/{view}")
+async def query(
+    view: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    shop: list[str] = Query(default=[]),
+    resource: list[str] = Query(default=[]),
+    pairs: int = 1,
+):
+    """One ``analyse`` section for a time window and shop/resource subset.
+
+    ``shop`` and ``resource`` may be repeated; e.g.
+    ``/api/query/buy_summary?since=2025-06-21T00:00:00&resource=<guid>``.
+    """
+    if view not in VIEWS:
+        raise HTTPException(404, f"unknown view {view!r}; try one of {sorted(VIEWS)}")
+    out = await asyncio.to_thread(
+        query_engine.query,
+        view,
+        _naive_utc(since),
+        _naive_utc(until),
+        shop,
+        resource,
+        max(pairs, 1),
+    )
+    return {"view": view, **out}
+
+
+@app.get("/api/prices")
+async def prices(
+    resource: str,
+    side: str = "buy",
+    shop: str = "",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    points: int = 300,
+):
+    """OHLC unit price series of one commodity, buy or sell side.
+
+    The resolution (minute, hour or day) is the finest that fits the range
+    in about ``points`` bars; a ``shop`` series starts at hourly bars.  The
+    range defaults to the whole stored history.
+    """
+    if side not in ("buy", "sell"):
+        raise HTTPException(422, "side must be 'buy' or 'sell'")
+    since, until = _naive_utc(since), _naive_utc(until)
+    if since is None or until is None:
+        # the finest bars bound the stored history most tightly
+        finest = SHOP_RESOLUTIONS[0] if shop else next(iter(RESOLUTIONS))
+        first, last = await asyncio.to_thread(
+            price_bounds, resource, side, shop, finest
+        )
+        if first is None:
+            # the bars are naive UTC
+            first = last = datetime.now(timezone.utc).replace(tzinfo=None)
+        since = since or first
+        until = until or last + timedelta(seconds=RESOLUTIONS[finest])
+    resolution = pick_resolution(since, until, max(points, 1))
+    if shop and resolution not in SHOP_RESOLUTIONS:
+        resolution = SHOP_RESOLUTIONS[0]
+    bars = await asyncio.to_thread(
+        get_price_bars, resource, side, resolution, shop,
+        floor_time(since, resolution), until,
+    )
+    for bar in bars:
+        del bar["resource"], bar["shop_id"], bar["side"], bar["resolution"]
+        bar["bucket"] = bar["bucket"].isoformat()
+    return {
+        "resource": resource,
+        "shop": shop,
+        "side": side,
+        "resolution": resolution,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "points": bars,
+    }
 
 
 class ResourceItem(BaseModel):
@@ -85,29 +557,71 @@ class ShopItem(BaseModel):
     name: str
 
 
+class NamesBulk(BaseModel):
+    resourceNames: dict[str, str] = {}
+    shopNames: dict[str, str] = {}
+
+
 @app.get("/api/names")
 async def all_names():
-    return get_all_names()
+    # cached in-process, but the first read after a write goes to the database
+    return await asyncio.to_thread(get_all_names)
 
 
 @app.post("/api/names/resource")
 async def add_resource_name(item: ResourceItem):
-    save_resource_name(item.guid, item.name)
+    await asyncio.to_thread(save_resource_name, item.guid, item.name)
+    names_changed.set()
     return {"status": "ok"}
 
 
 @app.post("/api/names/shop")
 async def add_shop_name(item: ShopItem):
-    save_shop_name(item.shop_id, item.name)
+    await asyncio.to_thread(save_shop_name, item.shop_id, item.name)
+    names_changed.set()
     return {"status": "ok"}
 
 
+@app.post("/api/names/bulk")
+async def add_names(names: NamesBulk):
+    """Store many names at once; the body has the shape ``/api/names`` returns."""
+    version = await asyncio.to_thread(save_names, names.resourceNames, names.shopNames)
+    names_changed.set()
+    return {
+        "status": "ok",
+        "resources": len(names.resourceNames),
+        "shops": len(names.shopNames),
+        "version": version,
+    }
+
+
 @app.websocket("/ws")
-async def ws_dashboard(ws: WebSocket):
+async def ws_dashboard(ws: WebSocket, patch: bool = False):
+    """Push the dashboard context whenever it changes.
+
+    ``/ws?patch=1`` switches to versioned envelopes carrying JSON-patch
+    operations between consecutive versions (see ``hub.Broadcaster``).
+    """
     await ws.accept()
+
+    async def push():
+        have = 0
+        if hub.version == 0:
+            await ws.send_text(hub.message(0, patch))
+        while True:
+            await hub.wait(have)
+            text = hub.message(have, patch)
+            have = hub.version
+            await ws.send_text(text)
+
+    sender = asyncio.create_task(push())
     try:
         while True:
-            await ws.send_text(json.dumps(_latest_ctx or {}))
-            await asyncio.sleep(5)
+            # nothing is expected from clients; this notices disconnects
+            await ws.receive_text()
     except WebSocketDisconnect:
         pass
+    finally:
+        sender.cancel()
+        with suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+            await sender
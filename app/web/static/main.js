@@ -1,52 +1,48 @@
 let chart;
 let lastData;
 
-const resourceNames = {
-  // Predefined mappings for common resources
-  "res1": "Test Resource"
+// Live dashboards page these tables from /api/tables (hauls from
+// /api/hauls); static reports embed them whole and page in the browser.
+const TABLES = {
+  buyTable: "buy_summary",
+  sellTable: "sell_summary",
+  routeTable: "best_routes",
+  pendingTable: "pending_goods",
+  lastTransTable: "last_transactions",
 };
+const PER_PAGE = 10;
+const tableState = {}; // id -> {page, sort, desc, etag, data}
 
-const shopNames = {
-  // Predefined mappings for common shops
-  "ID1": "Test Shop"
+// id column -> label column the server adds (see app/labels.py)
+const LABELS = {
+  resourceGUID: "resourceName",
+  shopId: "shopLabel",
+  buyShopId: "buyShopLabel",
+  sellShopId: "sellShopLabel",
+  "suggested shopId": "suggested shopLabel",
+  buy_shop: "buy_shop_label",
+  sell_shop: "sell_shop_label",
 };
+const LABEL_COLUMNS = new Set(Object.values(LABELS));
 
-Object.assign(resourceNames, JSON.parse(localStorage.getItem("resourceNames") || "{}"));
-Object.assign(shopNames, JSON.parse(localStorage.getItem("shopNames") || "{}"));
-
-fetch("/api/names")
-  .then(r => (r.ok ? r.json() : Promise.reject()))
-  .then(data => {
-    Object.assign(resourceNames, data.resourceNames);
-    Object.assign(shopNames, data.shopNames);
-    localStorage.setItem("resourceNames", JSON.stringify(resourceNames));
-    localStorage.setItem("shopNames", JSON.stringify(shopNames));
-    if (lastData) updateDashboard(lastData);
-  })
-  .catch(() => {});
-
-function saveResourceName(guid, name) {
-  if (!name) return;
-  resourceNames[guid] = name;
-  localStorage.setItem("resourceNames", JSON.stringify(resourceNames));
-  fetch("/api/names/resource", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ guid, name }),
-  });
-  if (lastData) updateDashboard(lastData);
+// The server relabels its tables and pushes new digests, so the visible
+// pages are refetched with the new name; show it right away meanwhile.
+function saveResourceName(guid, name, cell) {
+  saveName("/api/names/resource", { guid, name }, cell);
 }
 
-function saveShopName(id, name) {
-  if (!name) return;
-  shopNames[id] = name;
-  localStorage.setItem("shopNames", JSON.stringify(shopNames));
-  fetch("/api/names/shop", {
+function saveShopName(id, name, cell) {
+  saveName("/api/names/shop", { shop_id: id, name }, cell);
+}
+
+function saveName(url, body, cell) {
+  if (!body.name) return;
+  cell.textContent = body.name;
+  fetch(url, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ shop_id: id, name }),
+    body: JSON.stringify(body),
   });
-  if (lastData) updateDashboard(lastData);
 }
 
 function enableEdit(cell, idValue, currentName, saveFn) {
@@ -68,7 +64,8 @@ function enableEdit(cell, idValue, currentName, saveFn) {
     btn.onclick = () => {
       const val = input.value.trim();
       if (val && val !== currentName && val !== idValue) {
-        saveFn(idValue, val);
+        saveFn(idValue, val, cell);
+        enableEdit(cell, idValue, val, saveFn);
       } else {
         cell.textContent = currentName || idValue;
         enableEdit(cell, idValue, currentName, saveFn);
@@ -123,26 +120,111 @@ function updateDashboard(data) {
     chart.update();
   }
 
-  // Tables helper
-  populateTable("buyTable",    data.buy_summary);
-  populateTable("sellTable",   data.sell_summary);
-  populateTable("routeTable",  data.best_routes);
-  populateTable("pendingTable", data.pending_goods);
-  populateTable("lastTransTable", data.last_transactions);
+  if (data.tables) {
+    // live: refetch the visible page of tables whose digest changed
+    Object.entries(TABLES).forEach(([id, name]) => {
+      if (data.tables[name]) syncTable(id, data.tables[name].etag);
+    });
+    if (data.hauls) syncTable("haulTable", `${data.hauls.count}/${data.hauls.names}`);
+  } else {
+    Object.entries(TABLES).forEach(([id, name]) => populateTable(id, data[name] || []));
+  }
+}
+
+function syncTable(id, etag) {
+  const st = tableState[id] || (tableState[id] = { page: 1, sort: null, desc: false });
+  // a rename changes the digest of every table showing that name
+  if (st.etag !== etag) {
+    st.etag = etag;
+    loadTable(id);
+  }
+}
+
+function loadTable(id) {
+  const st = tableState[id];
+  const params = new URLSearchParams({ offset: (st.page - 1) * PER_PAGE, limit: PER_PAGE });
+  if (st.sort) {
+    params.set("sort", st.sort);
+    params.set("order", st.desc ? "desc" : "asc");
+  }
+  const url = id === "haulTable" ? `/api/hauls?${params}` : `/api/tables/${TABLES[id]}?${params}`;
+  fetch(url)
+    .then(r => (r.ok ? r.json() : Promise.reject()))
+    .then(page => {
+      st.data = page;
+      drawPage(id);
+    })
+    .catch(() => {});
+}
+
+function drawPage(id) {
+  const st = tableState[id];
+  const onSort = id === "haulTable" ? null : col => {
+    st.desc = st.sort === col ? !st.desc : false;
+    st.sort = col;
+    st.page = 1;
+    loadTable(id);
+  };
+  renderTable(
+    id,
+    st.data.rows || st.data.hauls,
+    st.page,
+    Math.ceil(st.data.total / PER_PAGE),
+    page => { st.page = page; loadTable(id); },
+    onSort
+  );
 }
 
 const initEl = document.getElementById('init-data');
 if (initEl) {
   updateDashboard(JSON.parse(initEl.textContent));
 } else {
-  const wsUrl = `${location.protocol === 'https:' ? 'wss' : 'ws'}://${location.host}/ws`;
+  const wsUrl = `${location.protocol === 'https:' ? 'wss' : 'ws'}://${location.host}/ws?patch=1`;
   const ws = new WebSocket(wsUrl);
-  ws.onmessage = evt => updateDashboard(JSON.parse(evt.data));
+  ws.onmessage = evt => {
+    const msg = JSON.parse(evt.data);
+    if (msg.type === "patch" && lastData) {
+      updateDashboard(applyPatch(lastData, msg.ops));
+    } else if (msg.type === "snapshot") {
+      updateDashboard(msg.data);
+    }
+  };
+}
+
+// Apply the JSON-patch operations produced by app/web/hub.py in place.
+function applyPatch(doc, ops) {
+  for (const op of ops) {
+    if (op.path === "") { doc = op.value; continue; }
+    const parts = op.path.slice(1).split("/")
+      .map(p => p.replace(/~1/g, "/").replace(/~0/g, "~"));
+    const key = parts.pop();
+    let parent = doc;
+    parts.forEach(p => { parent = parent[p]; });
+    if (Array.isArray(parent) && key === "-") parent.push(op.value);
+    else if (op.op === "remove") {
+      if (Array.isArray(parent)) parent.splice(Number(key), 1);
+      else delete parent[key];
+    } else parent[key] = op.value;
+  }
+  return doc;
 }
 
 function set(id, txt) { document.getElementById(id).textContent = txt; }
 
-function populateTable(id, rows, perPage = 10) {
+// Static reports: every row is embedded, so sort and page locally.
+function populateTable(id, rows, perPage = PER_PAGE) {
+  const sortRows = rows.slice();
+  if (rows.length && rows[0].timestamp) {
+    sortRows.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+  }
+  const totalPages = Math.ceil(sortRows.length / perPage);
+  const render = page => renderTable(
+    id, sortRows.slice((page - 1) * perPage, page * perPage), page, totalPages, render, null
+  );
+  render(1);
+}
+
+function renderTable(id, rows, page, totalPages, onPage, onSort) {
   const tbl = document.getElementById(id);
   const container = tbl.parentNode;
   tbl.innerHTML = "";
@@ -150,99 +232,87 @@ function populateTable(id, rows, perPage = 10) {
   if (oldNav) oldNav.remove();
   if (!rows.length) return;
 
-  const sortRows = rows.slice();
-  if (rows[0].timestamp) {
-    sortRows.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-  }
+  const thead = tbl.createTHead();
+  const hdrRow = thead.insertRow();
+  const columns = Object.keys(rows[0]).filter(col => !LABEL_COLUMNS.has(col));
+  columns.forEach(col => {
+    const cell = hdrRow.insertCell();
+    cell.textContent = col;
+    if (onSort) {
+      // named columns sort by the name shown
+      const key = LABELS[col] || col;
+      const st = tableState[id];
+      if (st && st.sort === key) cell.textContent += st.desc ? " ▼" : " ▲";
+      cell.style.cursor = "pointer";
+      cell.onclick = () => onSort(key);
+    }
+  });
+  const tbody = tbl.createTBody();
+  rows.forEach(r => {
+    const tr = tbody.insertRow();
+    columns.forEach(key => renderCell(id, tr.insertCell(), key, r[key], r[LABELS[key]]));
+  });
 
-  const totalPages = Math.ceil(sortRows.length / perPage);
+  if (totalPages <= 1) return;
+  const nav = document.createElement('div');
+  nav.className = 'pagination-controls';
+  // first, last and the pages around the current one
+  const pages = [...new Set([1, page - 2, page - 1, page, page + 1, page + 2, totalPages])]
+    .filter(i => i >= 1 && i <= totalPages)
+    .sort((a, b) => a - b);
+  pages.forEach(i => {
+    const btn = document.createElement('button');
+    btn.textContent = i;
+    btn.className = `btn btn-sm ${i === page ? 'btn-primary' : 'btn-secondary'} mx-1`;
+    btn.onclick = () => onPage(i);
+    nav.appendChild(btn);
+  });
+  container.appendChild(nav);
+}
 
-  function render(page) {
-    tbl.innerHTML = "";
-    const thead = tbl.createTHead();
-    const hdrRow = thead.insertRow();
-    Object.keys(sortRows[0]).forEach(col => hdrRow.insertCell().textContent = col);
-    const tbody = tbl.createTBody();
-    sortRows.slice((page - 1) * perPage, page * perPage).forEach(r => {
-      const tr = tbody.insertRow();
-      Object.entries(r).forEach(([key, v]) => {
-        const cell = tr.insertCell();
-      if (key === "resourceGUID") {
-        const mapped = resourceNames[v];
-        if (mapped) {
-          cell.textContent = mapped;
-          enableEdit(cell, v, mapped, saveResourceName);
-        } else if (id === "pendingTable") {
-          const group = document.createElement("div");
-          group.className = "input-group input-group-sm";
-
-          const input = document.createElement("input");
-          input.type = "text";
-          input.placeholder = v;
-          input.className = "form-control";
-
-          const btn = document.createElement("button");
-          btn.textContent = "Apply";
-          btn.className = "btn btn-success";
-          btn.onclick = () => saveResourceName(v, input.value || v);
-
-          group.appendChild(input);
-          group.appendChild(btn);
-          cell.appendChild(group);
-        } else {
-          cell.textContent = v;
-          enableEdit(cell, v, "", saveResourceName);
-        }
-      } else if (key === "shopId") {
-        const mapped = shopNames[v];
-        if (mapped) {
-          cell.textContent = mapped;
-          enableEdit(cell, v, mapped, saveShopName);
-        } else if (id === "lastTransTable") {
-          const group = document.createElement("div");
-          group.className = "input-group input-group-sm";
-
-          const input = document.createElement("input");
-          input.type = "text";
-          input.placeholder = v;
-          input.className = "form-control";
-
-          const btn = document.createElement("button");
-          btn.textContent = "Apply";
-          btn.className = "btn btn-success";
-          btn.onclick = () => saveShopName(v, input.value || v);
-
-          group.appendChild(input);
-          group.appendChild(btn);
-          cell.appendChild(group);
-        } else {
-          cell.textContent = v;
-          enableEdit(cell, v, "", saveShopName);
-        }
-      } else {
-        cell.textContent =
-          typeof v === "number"
-            ? v.toLocaleString(undefined, { maximumFractionDigits: 2 })
-            : v;
-      }
-      });
-    });
-  }
+function nameInput(cell, idValue, saveFn) {
+  const group = document.createElement("div");
+  group.className = "input-group input-group-sm";
+
+  const input = document.createElement("input");
+  input.type = "text";
+  input.placeholder = idValue;
+  input.className = "form-control";
 
-  function addPagination() {
-    if (totalPages <= 1) return;
-    const nav = document.createElement('div');
-    nav.className = 'pagination-controls';
-    for (let i = 1; i <= totalPages; i++) {
-      const btn = document.createElement('button');
-      btn.textContent = i;
-      btn.className = 'btn btn-sm btn-secondary mx-1';
-      btn.onclick = () => render(i);
-      nav.appendChild(btn);
+  const btn = document.createElement("button");
+  btn.textContent = "Apply";
+  btn.className = "btn btn-success";
+  btn.onclick = () => {
+    const name = input.value.trim();
+    if (!name) return;
+    saveFn(idValue, name, cell);
+    enableEdit(cell, idValue, name, saveFn);
+  };
+
+  group.appendChild(input);
+  group.appendChild(btn);
+  cell.appendChild(group);
+}
+
+function renderCell(id, cell, key, v, label) {
+  if (LABELS[key]) {
+    const saveFn = key === "resourceGUID" ? saveResourceName : saveShopName;
+    if (label) {
+      cell.textContent = label;
+      enableEdit(cell, v, label, saveFn);
+    } else if (
+      (id === "pendingTable" && key === "resourceGUID") ||
+      (id === "lastTransTable" && key === "shopId")
+    ) {
+      nameInput(cell, v, saveFn);
+    } else {
+      cell.textContent = v;
+      enableEdit(cell, v, "", saveFn);
     }
-    container.appendChild(nav);
+  } else {
+    cell.textContent =
+      typeof v === "number"
+        ? v.toLocaleString(undefined, { maximumFractionDigits: 2 })
+        : v;
   }
-
-  render(1);
-  addPagination();
 }
@@ -0,0 +1,112 @@
+"""Server-side paging and sorting of the dashboard tables."""
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, List, Optional
+
+from ..labels import SECTIONS, relabel_rows
+from .hub import dumps
+
+__all__ = ["TABLES", "TableSet"]
+
+# the ``analyse`` sections served page by page instead of over the socket
+TABLES = SECTIONS
+
+
+def _meta(rows: List[dict]) -> dict:
+    return {
+        "total": len(rows),
+        "etag": hashlib.blake2b(dumps(rows), digest_size=8).hexdigest(),
+    }
+
+
+def _sort_key(column: str):
+    # rows missing the column, or holding None, sort after every value
+    def key(row: dict):
+        value = row.get(column)
+        return (value is None, value if value is not None else 0)
+
+    return key
+
+
+class TableSet:
+    """The tables of one published version, with cached sort orders.
+
+    ``meta`` holds each table's row count and a content digest; it travels
+    with the pushed context so clients only refetch tables that changed.
+    """
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, List[dict]]] = None,
+        names_version: int = 0,
+    ) -> None:
+        self.tables = tables or {}
+        # the ``db.names_version`` the label columns reflect
+        self.names_version = names_version
+        self.meta = {name: _meta(rows) for name, rows in self.tables.items()}
+        self._orders: Dict[tuple, List[dict]] = {}
+
+    def relabel(self, changes: dict, names_version: int) -> "TableSet":
+        """A copy with renamed resources/shops applied to the label columns.
+
+        Tables without an affected row are shared, along with their digest
+        and cached sort orders, so their clients don't refetch anything.
+        """
+        new = TableSet(names_version=names_version)
+        new.tables = dict(self.tables)
+        new.meta = dict(self.meta)
+        for name, rows in self.tables.items():
+            rows = relabel_rows(rows, changes)
+            if rows is not None:
+                new.tables[name] = rows
+                new.meta[name] = _meta(rows)
+        new._orders = {
+            key: rows
+            for key, rows in self._orders.items()
+            if new.tables[key[0]] is self.tables[key[0]]
+        }
+        return new
+
+    def ordered(self, name: str, sort: Optional[str], desc: bool) -> List[dict]:
+        """Rows of ``name`` sorted by ``sort``; built once per order.
+
+        Without ``sort`` tables with a ``timestamp`` column come newest
+        first and the others in the order ``analyse`` produced.
+        """
+        rows = self.tables[name]
+        if sort is None:
+            if not rows or "timestamp" not in rows[0]:
+                return rows
+            sort, desc = "timestamp", True
+        key = (name, sort, desc)
+        ordered = self._orders.get(key)
+        if ordered is None:
+            ordered = sorted(rows, key=_sort_key(sort), reverse=desc)
+            if desc:
+                # keep missing values last in both directions
+                missing = [r for r in ordered if r.get(sort) is None]
+                if missing:
+                    ordered = ordered[len(missing):] + missing
+            self._orders[key] = ordered
+        return ordered
+
+    def page(
+        self,
+        name: str,
+        offset: int = 0,
+        limit: int = 10,
+        sort: Optional[str] = None,
+        desc: bool = False,
+    ) -> dict:
+        rows = self.ordered(name, sort, desc)
+        columns = list(rows[0]) if rows else []
+        return {
+            "table": name,
+            "etag": self.meta[name]["etag"],
+            "total": len(rows),
+            "offset": offset,
+            "limit": limit,
+            "columns": columns,
+            "rows": rows[offset:offset + limit],
+        }
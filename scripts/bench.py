@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Time each stage of the pipeline and write the results as JSON.
+
+    PYTHONPATH=. python scripts/bench.py -o bench.json
+    PYTHONPATH=. python scripts/bench.py --compare bench.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from app.bench import bench_corpora, compare
+
+
+def main():
+    p = argparse.ArgumentParser("Benchmark the parse → analyse → serve pipeline")
+    p.add_argument(
+        "log_paths", nargs="*", default=["sample-data"],
+        help="folders / *.log patterns (default: sample-data)",
+    )
+    p.add_argument(
+        "--synthetic", type=int, action="append", metavar="N",
+        help="also time N synthetic events (repeatable; default 100000)",
+    )
+    p.add_argument(
+        "--logs", type=int, action="append", metavar="N",
+        help="also time N synthetic events written out as log files (repeatable)",
+    )
+    p.add_argument(
+        "--noise", type=float, default=20.0,
+        help="--logs: mean unrelated lines between two trades",
+    )
+    p.add_argument("--shops", type=int, default=200)
+    p.add_argument("--resources", type=int, default=100)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("-o", "--output", type=Path, help="write JSON here, not stdout")
+    p.add_argument(
+        "--compare", type=Path, metavar="OLD.json",
+        help="print best-time ratios against an earlier result",
+    )
+    p.add_argument(
+        "--threshold", type=float, default=1.2,
+        help="ratio reported as a regression (exit status 1)",
+    )
+    p.add_argument(
+        "--min-delta", type=float, default=0.005, metavar="SECONDS",
+        help="ignore slowdowns smaller than this",
+    )
+    args = p.parse_args()
+
+    out = bench_corpora(
+        args.log_paths,
+        synthetic=args.synthetic or [100_000],
+        logs=args.logs or [],
+        repeat=args.repeat,
+        jobs=args.jobs,
+        noise=args.noise,
+        shops=args.shops,
+        resources=args.resources,
+    )
+
+    text = json.dumps(out, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        rows = compare(
+            json.loads(args.compare.read_text()), out, args.threshold, args.min_delta
+        )
+        print(f"{'corpus':<24} {'stage':<34} {'old s':>9} {'new s':>9} {'ratio':>6}")
+        for r in rows:
+            flag = "  <-- slower" if r["regressed"] else ""
+            print(
+                f"{r['corpus'][:24]:<24} {r['stage']:<34} {r['old_s']:>9.4f} "
+                f"{r['new_s']:>9.4f} {r['ratio']:>6.2f}{flag}"
+            )
+        if any(r["regressed"] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Time haul tracking over synthetic buy/move/sell streams."""
+import argparse
+import time
+
+from app.hauls import HaulTracker
+from app.synth import synthetic_records
+
+
+def main():
+    p = argparse.ArgumentParser("Benchmark hauls.HaulTracker")
+    p.add_argument("-n", "--events", type=int, default=1_000_000)
+    p.add_argument("--resources", type=int, default=20)
+    p.add_argument(
+        "--mix",
+        default="0.45,0.45,0.1",
+        help="Buy,Sell,Move shares; buy-heavy mixes grow long inventories",
+    )
+    args = p.parse_args()
+    mix = tuple(float(x) for x in args.mix.split(","))
+
+    records = list(
+        synthetic_records(args.events, resources=args.resources, mix=mix)
+    )
+    tracker = HaulTracker()
+    t0 = time.perf_counter()
+    for rec in records:
+        tracker.process(rec)
+    elapsed = time.perf_counter() - t0
+    lots = sum(len(v) for v in tracker.inventory.values())
+    print(
+        f"{args.events} events, {len(tracker.hauls)} hauls, {lots} open lots: "
+        f"{elapsed:.2f}s ({args.events / elapsed:,.0f} events/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Time best-route discovery on synthetic data of growing cardinality."""
+import argparse
+import time
+
+import pandas as pd
+
+from app.analysis import _best_routes
+from app.synth import synthetic_records
+
+SCALES = [
+    (20_000, 100, 100),
+    (100_000, 1_000, 1_000),
+    (200_000, 2_000, 3_000),
+    (500_000, 5_000, 5_000),
+]
+
+
+def main():
+    p = argparse.ArgumentParser("Benchmark analysis._best_routes")
+    p.add_argument("--pairs", type=int, default=3, help="routes per commodity")
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    print(f"{'events':>8} {'shops':>6} {'goods':>6} {'routes':>7} {'best s':>8}")
+    for n, shops, goods in SCALES:
+        df = pd.DataFrame(synthetic_records(n, shops, goods))
+        buys = df[df.operation == "Buy"]
+        sells = df[df.operation == "Sell"]
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            routes = _best_routes(buys, sells, top_n=goods, pairs=args.pairs)
+            times.append(time.perf_counter() - t0)
+        print(f"{n:>8} {shops:>6} {goods:>6} {len(routes):>7} {min(times):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
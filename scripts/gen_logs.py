@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Write synthetic ``Game Build(...).log`` files, or feed one live.
+
+    PYTHONPATH=. python scripts/gen_logs.py synth-logs --events 200000 --files 20
+    PYTHONPATH=. python scripts/gen_logs.py synth-logs --size-mb 500
+    PYTHONPATH=. python scripts/gen_logs.py --live logs/Game.log --rate 5
+"""
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from app.synth import append_live, log_lines, synthetic_records, write_logs
+
+
+def _events_for_size(size_mb: float, noise: float, **kw) -> int:
+    """Events whose log, noise included, comes to about ``size_mb``."""
+    sample = list(synthetic_records(2000, **kw))
+    size = sum(len(line) + 1 for line in log_lines(sample, noise))
+    return max(int(size_mb * 1e6 * len(sample) / size), 1)
+
+
+def main():
+    p = argparse.ArgumentParser("Generate Star Citizen-style trade logs")
+    p.add_argument("directory", nargs="?", type=Path, help="where to write the logs")
+    p.add_argument("-n", "--events", type=int, default=100_000)
+    p.add_argument(
+        "--size-mb", type=float,
+        help="write about this many MB in total instead of --events",
+    )
+    p.add_argument("--files", type=int, default=10)
+    p.add_argument(
+        "--noise", type=float, default=20.0,
+        help="mean number of unrelated lines between two trades",
+    )
+    p.add_argument("--shops", type=int, default=200)
+    p.add_argument("--resources", type=int, default=100)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument(
+        "--mix", default="0.45,0.45,0.1",
+        help="Buy,Sell,Move[,Stock] shares",
+    )
+    p.add_argument("--start", help="first timestamp, ISO 8601 (default 2025-01-01)")
+    p.add_argument("--crlf", action="store_true", help="Windows line endings")
+    p.add_argument(
+        "--encoding", default="utf-8",
+        help="e.g. utf-16 (with BOM), utf-16-le (without) or latin-1",
+    )
+    p.add_argument(
+        "--live", type=Path, metavar="LOG",
+        help="append to LOG in real time instead of writing a corpus",
+    )
+    p.add_argument("--rate", type=float, default=1.0, help="--live trades per second")
+    p.add_argument(
+        "--duration", type=float,
+        help="--live: stop after this many seconds (default: --events trades)",
+    )
+    args = p.parse_args()
+    if (args.directory is None) == (args.live is None):
+        p.error("give either a directory or --live LOG")
+
+    kw = dict(
+        shops=args.shops,
+        resources=args.resources,
+        seed=args.seed,
+        mix=tuple(float(x) for x in args.mix.split(",")),
+    )
+    if args.start:
+        kw["start"] = datetime.fromisoformat(args.start.rstrip("Z"))
+
+    if args.live:
+        events = args.events
+        if args.duration is not None:
+            events = max(int(args.duration * args.rate), 1)
+        args.live.parent.mkdir(parents=True, exist_ok=True)
+        with args.live.open("a", encoding="utf-8") as fh:
+            try:
+                n = append_live(
+                    fh, synthetic_records(events, **kw), args.rate, args.noise, args.seed
+                )
+            except KeyboardInterrupt:
+                return
+        print(f"appended {n} trades to {args.live}", file=sys.stderr)
+        return
+
+    events = args.events
+    if args.size_mb:
+        events = _events_for_size(args.size_mb, args.noise, **kw)
+    paths = write_logs(
+        args.directory,
+        synthetic_records(events, **kw),
+        files=args.files,
+        noise=args.noise,
+        seed=args.seed,
+        newline="\r\n" if args.crlf else "\n",
+        encoding=args.encoding,
+    )
+    size = sum(path.stat().st_size for path in paths)
+    print(
+        f"wrote {events} trades to {len(paths)} files in {args.directory} "
+        f"({size / 1e6:.1f} MB)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,10 @@ import sys
 from pathlib import Path
 import pandas as pd
 
-from app.log_parser import collect_files, iter_records
+from app.cache import RecordCache, cached_records
+from app.db import get_all_names, init_db, load_trade_events, save_trade_events
+from app.labels import label_context
+from app.log_parser import collect_files, iter_records, to_fixed
 from app.analysis import analyse
 from app.report import render_html
 
@@ -16,28 +19,70 @@ def main():
     p.add_argument("log_paths", nargs="+", help="folders / *.log patterns")
     p.add_argument("output_html", type=Path)
     p.add_argument("--excel", type=Path)
+    p.add_argument(
+        "--jobs", type=int, default=1, help="parse logs with N worker processes"
+    )
+    p.add_argument(
+        "--cache",
+        type=Path,
+        help="reuse parsed records of unchanged logs from this SQLite file",
+    )
+    p.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="discard the --cache contents and reparse every log",
+    )
+    p.add_argument(
+        "--db",
+        action="store_true",
+        help="add the parsed trades to DATABASE_URL and report on every trade "
+        "stored there, including those of logs deleted since, labelled with "
+        "the names stored there",
+    )
     args = p.parse_args()
+    if args.rebuild_cache and not args.cache:
+        p.error("--rebuild-cache needs --cache")
 
     files = collect_files(args.log_paths)
     if not files:
         logging.error("No .log files found")
         sys.exit(1)
 
-    df = pd.DataFrame(iter_records(files))
+    if args.cache:
+        cache = RecordCache(args.cache)
+        if args.rebuild_cache:
+            cache.clear()
+        records = cached_records(files, cache, args.jobs)
+        if args.db:
+            init_db()
+            save_trade_events(records)
+            records = load_trade_events(fixed=True)
+        else:
+            records = map(to_fixed, records)
+        df = pd.DataFrame(records)
+        cache.close()
+    elif args.db:
+        init_db()
+        save_trade_events(iter_records(files, jobs=args.jobs))
+        df = pd.DataFrame(load_trade_events(fixed=True))
+    else:
+        df = pd.DataFrame(iter_records(files, jobs=args.jobs, numeric="fixed"))
     if df.empty:
         logging.error("No BUY/SELL events detected")
         sys.exit(2)
 
-    ctx = analyse(df)
+    ctx = analyse(df, numeric="fixed")
+    if args.db:
+        label_context(ctx, get_all_names())
     render_html(ctx, args.output_html)
     logging.info("HTML report generated → %s", args.output_html)
 
     if args.excel:
         with pd.ExcelWriter(args.excel) as xls:
-            pd.DataFrame(ctx["buy_summary"]).to_excel(xls, "BUY", index=False)
-            pd.DataFrame(ctx["sell_summary"]).to_excel(xls, "SELL", index=False)
-            pd.DataFrame(ctx["best_routes"]).to_excel(xls, "ROUTES", index=False)
-            pd.DataFrame(ctx["pending_goods"]).to_excel(xls, "PENDING", index=False)
+            pd.DataFrame(ctx["buy_summary"]).to_excel(xls, sheet_name="BUY", index=False)
+            pd.DataFrame(ctx["sell_summary"]).to_excel(xls, sheet_name="SELL", index=False)
+            pd.DataFrame(ctx["best_routes"]).to_excel(xls, sheet_name="ROUTES", index=False)
+            pd.DataFrame(ctx["pending_goods"]).to_excel(xls, sheet_name="PENDING", index=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+"""Every test gets its own SQLite database instead of ``./names.db``."""
+from collections import deque
+from pathlib import Path
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import db
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'names.db'}"
+    # scripts run in a subprocess pick the database up from the environment
+    monkeypatch.setenv("DATABASE_URL", url)
+    engine = create_engine(url)
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(db, "_names_cache", None)
+    monkeypatch.setattr(db, "_name_log", deque(maxlen=db._name_log.maxlen))
+    db.init_db()
+    yield engine
+    engine.dispose()
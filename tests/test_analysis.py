@@ -2,10 +2,12 @@ from decimal import Decimal
 from pathlib import Path
 import sys
 import pandas as pd
+import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.analysis import analyse
+from app.analysis import analyse, TradeAggregator
+from app.log_parser import collect_files, iter_records
 
 
 def test_analyse_empty():
@@ -102,3 +104,133 @@ def test_pending_inventory_and_suggested_shop():
     assert rec["pending_qty"] == 4
     assert rec["pending_uec"] == 400
     assert rec["suggested shopId"] == "S2"
+
+
+def _assert_close(actual, expected):
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            _assert_close(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            _assert_close(a, e)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected)
+    else:
+        assert actual == expected
+
+
+def test_aggregator_matches_analyse_on_sample_logs():
+    files = collect_files([str(Path(__file__).parent / "logs")])
+    records = list(iter_records(files))
+
+    agg = TradeAggregator()
+    agg.extend(records[: len(records) // 2])
+    agg.extend(records[len(records) // 2:])
+
+    _assert_close(agg.result(), analyse(pd.DataFrame(records)))
+
+
+def test_aggregator_empty_matches_analyse():
+    assert TradeAggregator().result() == analyse(pd.DataFrame())
+
+
+def test_aggregator_updates_last_transaction_and_pending():
+    agg = TradeAggregator()
+    buy = {
+        "timestamp": pd.Timestamp("2025-02-01T10:00:00Z"),
+        "operation": "Buy",
+        "shopId": "B1",
+        "shopName": "BuyShop",
+        "resourceGUID": "res2",
+        "quantity": Decimal("10"),
+        "shopPricePerCentiSCU": Decimal("100"),
+        "price": Decimal("1000"),
+        "amount": Decimal("0"),
+    }
+    agg.add(buy)
+    assert agg.result()["pending_goods"][0]["pending_qty"] == 10
+
+    sell = dict(
+        buy,
+        timestamp=pd.Timestamp("2025-02-02T10:00:00Z"),
+        operation="Sell",
+        shopId="B1",
+        quantity=Decimal("10"),
+        price=Decimal("0"),
+        amount=Decimal("1500"),
+    )
+    agg.add(sell)
+    ctx = agg.result()
+    assert ctx["pending_goods"] == []
+    assert ctx["kpi"]["total_profit_sc"] == 500
+    assert ctx["last_transactions"][0]["operation"] == "Sell"
+    assert ctx["last_transactions"][0]["profit_sc"] == 500
+
+
+def test_best_routes_top_pairs_per_commodity():
+    from itertools import product
+
+    from app.analysis import _best_routes, to_fixed_frame
+    from app.synth import synthetic_records
+
+    df = pd.DataFrame(synthetic_records(3000, shops=12, resources=6, seed=7))
+    fixed = to_fixed_frame(df)
+    routes = _best_routes(
+        fixed[fixed.operation == "Buy"],
+        fixed[fixed.operation == "Sell"],
+        top_n=6,
+        pairs=3,
+    )
+
+    buys = df[df.operation == "Buy"]
+    sells = df[df.operation == "Sell"]
+    buy_avg = buys.groupby(["resourceGUID", "shopId"]).apply(
+        lambda g: float((g.price / g.quantity).astype(float).mean())
+    )
+    sell_avg = sells.groupby(["resourceGUID", "shopId"]).apply(
+        lambda g: float((g.amount / g.quantity).astype(float).mean())
+    )
+    for res, got in routes.groupby("resourceGUID", sort=False):
+        pairs = sorted(
+            (
+                sell_avg[(res, s)] - buy_avg[(res, b)]
+                for (_, b), (_, s) in product(
+                    buy_avg[[res]].index, sell_avg[[res]].index
+                )
+            ),
+            reverse=True,
+        )
+        expected = [p for p in pairs[:3] if p > 0]
+        assert list(got.profitPerUnit) == pytest.approx(expected)
+
+    best = routes.groupby("resourceGUID", sort=False).profitPerUnit.max()
+    assert list(best) == sorted(best, reverse=True)
+
+
+def test_fixed_point_totals_match_decimal_exactly():
+    files = collect_files([Path(__file__).resolve().parent.parent / "sample-data"])
+    assert files
+    records = list(iter_records(files))
+    traded = [r for r in records if r["quantity"] > 0]
+    spent = sum(r["price"] for r in traded if r["operation"] == "Buy")
+    earned = sum(r["amount"] for r in traded if r["operation"] == "Sell")
+
+    ctx = analyse(pd.DataFrame(records))
+    assert ctx["kpi"]["total_profit_sc"] == float(earned - spent)
+
+    daily = {}
+    for r in traded:
+        day = r["timestamp"].date().isoformat()
+        if r["operation"] == "Buy":
+            daily[day] = daily.get(day, Decimal(0)) - r["price"]
+        elif r["operation"] == "Sell":
+            daily[day] = daily.get(day, Decimal(0)) + r["amount"]
+    assert ctx["daily_profit"]["labels"] == sorted(daily)
+    assert ctx["daily_profit"]["values"] == [float(daily[d]) for d in sorted(daily)]
+
+    fixed = pd.DataFrame(iter_records(files, numeric="fixed"))
+    assert fixed.quantity.dtype == "int64"
+    assert fixed.price.dtype == "int64"
+    assert analyse(fixed, numeric="fixed") == ctx
@@ -0,0 +1,100 @@
+from pathlib import Path
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.web import main
+from app.hauls import HaulTracker
+from app.tail import LogTailer
+from tests.test_log_parser import BUY_LINE, SELL_LINE
+
+SECOND_BUY = BUY_LINE.replace("2025-06-21T22:00:18", "2025-06-22T10:00:00")
+SECOND_SELL = SELL_LINE.replace("2025-06-21T22:36:46", "2025-06-22T11:00:00")
+
+
+def _live_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "LOG_ROOT", tmp_path)
+    monkeypatch.setattr(main, "CACHE_PATH", "")
+    monkeypatch.setattr(main, "WATCH_BACKEND", "poll")
+    monkeypatch.setattr(main, "WATCH_INTERVAL", 0.05)
+    return TestClient(main.app)
+
+
+def _wait_for(client, total):
+    for _ in range(100):
+        data = client.get("/api/hauls").json()
+        if data["total"] == total:
+            return data
+        time.sleep(0.05)
+    raise AssertionError(f"expected {total} hauls, got {data['total']}")
+
+
+def test_hauls_endpoint_pages_and_filters(tmp_path, monkeypatch):
+    log_file = tmp_path / "Game.log"
+    log_file.write_text(BUY_LINE + "\n" + SELL_LINE + "\n")
+
+    with _live_client(tmp_path, monkeypatch) as client:
+        _wait_for(client, 1)
+        with log_file.open("a") as fh:
+            fh.write(SECOND_BUY + "\n" + SECOND_SELL + "\n")
+        # the second sell takes the 24 SCU left from the first buy first
+        data = _wait_for(client, 3)
+        assert [(h["timestamp"], h["quantity"]) for h in data["hauls"]] == [
+            ("2025-06-22 11:00:00", 72.0),
+            ("2025-06-22 11:00:00", 24.0),
+            ("2025-06-21 22:36:46", 96.0),
+        ]
+
+        page = client.get("/api/hauls", params={"offset": 2, "limit": 1}).json()
+        assert page["total"] == 3
+        assert [h["timestamp"] for h in page["hauls"]] == ["2025-06-21 22:36:46"]
+
+        day = client.get(
+            "/api/hauls",
+            params={"since": "2025-06-22T00:00:00Z", "until": "2025-06-22T12:00:00"},
+        ).json()
+        assert day["total"] == 2
+        assert sum(h["quantity"] for h in day["hauls"]) == 96.0
+
+        feed = client.get("/api/metrics").json()["hauls"]
+        assert feed["count"] == 3
+        assert feed["profit_sc"] == pytest.approx(
+            sum(h["profit"] for h in data["hauls"])
+        )
+
+
+def test_late_older_records_replay_hauls(tmp_path):
+    live = tmp_path / "Game.log"
+    live.write_text(SECOND_SELL + "\n")
+    tailer = LogTailer([str(tmp_path)])
+    tracker = main._feed_hauls(HaulTracker(), tailer, tailer.poll())
+    assert tracker.hauls == []
+
+    # an older log with the matching buy shows up afterwards
+    (tmp_path / "old.log").write_text(BUY_LINE + "\n")
+    tracker = main._feed_hauls(tracker, tailer, tailer.poll())
+    assert len(tracker.hauls) == 1
+    assert tracker.hauls[0]["sell_shop"] == "4511623301041"
+
+
+def test_served_hauls_are_a_snapshot(tmp_path):
+    from app.web.hub import Broadcaster
+
+    live = tmp_path / "Game.log"
+    live.write_text(BUY_LINE + "\n" + SELL_LINE + "\n")
+    ingest = main._Ingest(LogTailer([str(tmp_path)]))
+    ingest.step(Broadcaster())
+    served = ingest.haul_view
+    assert len(served) == 1
+
+    with live.open("a") as fh:
+        fh.write(SECOND_BUY + "\n" + SECOND_SELL + "\n")
+    ingest.step(Broadcaster())
+    # the worker moved on; what a request holds stays as it was
+    assert len(served) == 1 and len(ingest.haul_view) == 3
+    assert ingest.haul_view is not served
+    assert ingest.haul_view.profit == ingest.hauls.profit
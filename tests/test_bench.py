@@ -0,0 +1,64 @@
+"""Pipeline benchmarks; the full runs only happen with ``BENCH=1``.
+
+``BENCH_OUTPUT=path.json`` keeps their results for ``scripts/bench.py
+--compare``.
+"""
+import json
+import os
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.bench import bench_corpora, bench_files, compare
+
+LOGS = Path(__file__).parent / "logs"
+SAMPLE = Path(__file__).resolve().parents[1] / "sample-data"
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get("BENCH"), reason="set BENCH=1 to run benchmarks"
+)
+
+
+def test_bench_covers_every_stage():
+    result, records = bench_files([str(LOGS)], repeat=1)
+    assert result["events"] == len(records) > 0
+    assert {
+        "collect_files",
+        "iter_records",
+        "dataframe",
+        "analyse",
+        "track_hauls",
+        "render_html",
+        "json.dumps",
+        "hub.dumps",
+    } <= set(result["stages"])
+    assert len([s for s in result["stages"] if s.startswith("analysis.")]) == 7
+
+
+def test_compare_flags_only_real_slowdowns():
+    def run(**stages):
+        return {"corpora": {"c": {"stages": {
+            k: {"best_s": v} for k, v in stages.items()
+        }}}}
+
+    rows = compare(run(a=0.100, b=0.0001, c=1.0), run(a=0.150, b=0.0005, c=1.1))
+    assert {r["stage"]: r["regressed"] for r in rows} == {
+        "a": True, "b": False, "c": False
+    }
+
+
+@benchmark
+def test_bench_pipeline():
+    out = bench_corpora(
+        [SAMPLE] if SAMPLE.is_dir() else [],
+        synthetic=(10_000, 100_000),
+        shops=200,
+        resources=100,
+    )
+    if os.environ.get("BENCH_OUTPUT"):
+        Path(os.environ["BENCH_OUTPUT"]).write_text(json.dumps(out, indent=2))
+    for corpus in out["corpora"].values():
+        assert all(t["best_s"] >= 0 for t in corpus["stages"].values())
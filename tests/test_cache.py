@@ -0,0 +1,59 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import cache as cache_mod, tail
+from app.cache import RecordCache, cached_records
+from app.log_parser import collect_files, iter_records
+from app.tail import LogTailer
+from tests.test_log_parser import BUY_LINE, SELL_LINE
+
+
+def _forbid_parsing(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("file was reparsed")
+
+    monkeypatch.setattr(cache_mod, "read_records", fail)
+    monkeypatch.setattr(tail, "read_records", fail)
+
+
+def test_cached_records_round_trip(tmp_path, monkeypatch):
+    files = collect_files([str(Path(__file__).parent / "logs")])
+    expected = list(iter_records(files))
+
+    cache = RecordCache(tmp_path / "cache.db")
+    assert list(cached_records(files, cache)) == expected
+
+    _forbid_parsing(monkeypatch)
+    assert list(cached_records(files, cache)) == expected
+
+
+def test_modified_file_is_reparsed(tmp_path):
+    log_file = tmp_path / "a.log"
+    log_file.write_text(BUY_LINE + "\n")
+    cache = RecordCache(tmp_path / "cache.db")
+    assert len(list(cached_records([log_file], cache))) == 1
+
+    with log_file.open("a") as fh:
+        fh.write(SELL_LINE + "\n")
+    assert cache.get(log_file) is None
+    assert len(list(cached_records([log_file], cache))) == 2
+
+    cache.clear()
+    assert cache.get(log_file) is None
+
+
+def test_tailer_cold_start_uses_cache(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "old.log").write_text(BUY_LINE + "\n" + SELL_LINE + "\n")
+    cache = RecordCache(tmp_path / "cache.db")
+
+    first = LogTailer([str(logs)], cache=cache)
+    assert len(first.poll()) == 2
+
+    _forbid_parsing(monkeypatch)
+    second = LogTailer([str(logs)], cache=cache)
+    assert [r["operation"] for r in second.poll()] == ["Buy", "Sell"]
+    assert second.changed
@@ -0,0 +1,130 @@
+from datetime import timezone
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from app import db
+from app.web import main
+from app.log_parser import _parse_line, to_fixed
+from tests.test_log_parser import BUY_LINE, MOVE_LINE, SELL_LINE
+
+RECORDS = [_parse_line(line) for line in (BUY_LINE, SELL_LINE, MOVE_LINE)]
+
+
+def test_trade_events_round_trip(tmp_path, monkeypatch):
+    db.save_trade_events(RECORDS)
+
+    assert list(db.load_trade_events()) == RECORDS
+    assert list(db.load_trade_events(fixed=True)) == [
+        to_fixed(dict(rec)) for rec in RECORDS
+    ]
+
+
+def test_trade_events_ignore_duplicates(tmp_path, monkeypatch):
+    db.save_trade_events(RECORDS[:2])
+    db.save_trade_events(RECORDS, chunk=1)
+
+    assert len(list(db.load_trade_events())) == 3
+
+
+def test_trade_events_store_aware_timestamps_as_utc(tmp_path, monkeypatch):
+    rec = dict(RECORDS[0], timestamp=RECORDS[0]["timestamp"].replace(tzinfo=timezone.utc))
+    db.save_trade_events([rec])
+
+    (loaded,) = db.load_trade_events()
+    assert loaded["timestamp"] == RECORDS[0]["timestamp"]
+
+
+def test_restart_offers_only_logs_not_stored_yet(tmp_path, monkeypatch):
+    from app.tail import LogTailer
+    from app.web.hub import Broadcaster
+
+    def run():
+        ingest = main._Ingest(LogTailer([str(logs)]))
+        ingest.step(Broadcaster())
+        ingest.persist()
+
+    logs = tmp_path / "logs"
+    (logs / "logbackups").mkdir(parents=True)
+    (logs / "logbackups" / "old.log").write_text(BUY_LINE + "\n")
+    (logs / "Game.log").write_text(SELL_LINE + "\n")
+    run()
+    assert len(list(db.load_trade_events())) == 2
+
+    # the game went on, and an even older backup was copied in meanwhile
+    with (logs / "Game.log").open("a") as fh:
+        fh.write(MOVE_LINE + "\n")
+    late = BUY_LINE.replace("2025-06-21", "2025-06-01")
+    (logs / "logbackups" / "older.log").write_text(late + "\n")
+    offered = []
+    with monkeypatch.context() as m:
+        m.setattr(main, "save_trade_events", lambda recs: offered.extend(recs))
+        run()
+    # the stored backup is skipped; the others go whole, duplicates ignored
+    assert sorted(r["operation"] for r in offered) == ["Buy", "Move", "Sell"]
+    run()
+    ops = [r["operation"] for r in db.load_trade_events()]
+    assert ops == ["Buy", "Buy", "Sell", "Move"]
+
+
+def test_names_are_cached_until_a_write(tmp_path, monkeypatch):
+    db.save_resource_name("r1", "Gold")
+    names = db.get_all_names()
+    assert names == {"resourceNames": {"r1": "Gold"}, "shopNames": {}}
+
+    # a write behind the module's back is not seen: no query per call
+    with db.engine.begin() as conn:
+        conn.execute(db.ShopName.__table__.insert(), {"shop_id": "s1", "name": "Port"})
+    assert db.get_all_names() is names
+
+    version = db.names_version
+    db.save_shop_name("s2", "Area18")
+    assert db.names_version == version + 1
+    assert db.get_all_names()["shopNames"] == {"s1": "Port", "s2": "Area18"}
+
+
+def test_save_names_upserts_in_bulk(tmp_path, monkeypatch):
+    db.save_names(resources={"r1": "Gold", "r2": "Tin"}, shops={"s1": "Port"})
+    db.save_names(resources={"r2": "Tungsten", "r3": "Quartz"})
+
+    assert db.get_all_names() == {
+        "resourceNames": {"r1": "Gold", "r2": "Tungsten", "r3": "Quartz"},
+        "shopNames": {"s1": "Port"},
+    }
+
+
+def test_engine_options_from_environment(monkeypatch):
+    assert db._engine_options("sqlite:///names.db") == {}
+    assert db._engine_options("mysql+pymysql://u@h/db")["pool_pre_ping"] is True
+
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+    options = db._engine_options("mysql+pymysql://u@h/db")
+    assert (options["pool_size"], options["pool_pre_ping"]) == (20, False)
+
+
+def test_bulk_names_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "LOG_ROOT", tmp_path)
+    monkeypatch.setattr(main, "CACHE_PATH", "")
+    monkeypatch.setattr(main, "WATCH_BACKEND", "poll")
+    names = {"resourceNames": {"r1": "Gold"}, "shopNames": {"s1": "Port", "s2": "Lorville"}}
+
+    with TestClient(main.app) as client:
+        out = client.post("/api/names/bulk", json=names).json()
+        assert (out["resources"], out["shops"]) == (1, 2)
+        client.post("/api/names/shop", json={"shop_id": "s2", "name": "Area18"})
+        assert client.get("/api/names").json() == {
+            "resourceNames": {"r1": "Gold"},
+            "shopNames": {"s1": "Port", "s2": "Area18"},
+        }
+
+
+def test_trade_event_timestamps_keep_fractions_on_mysql():
+    from sqlalchemy.dialects import mysql
+    from sqlalchemy.schema import CreateTable
+
+    ddl = str(CreateTable(db.TradeEvent.__table__).compile(dialect=mysql.dialect()))
+    assert "timestamp DATETIME(6) NOT NULL" in ddl
@@ -22,3 +22,90 @@ def test_generate_report_creates_excel(tmp_path):
     ], cwd=repo_root, env=env)
 
     assert xls.exists()
+
+
+def test_generate_report_parallel_jobs(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    script = repo_root / "scripts" / "generate_report.py"
+    logs = Path(__file__).parent / "logs"
+    html = tmp_path / "report.html"
+
+    env = dict(**os.environ, PYTHONPATH=str(repo_root))
+    subprocess.check_call([
+        sys.executable,
+        str(script),
+        str(logs),
+        str(html),
+        "--jobs",
+        "2",
+    ], cwd=repo_root, env=env)
+
+    assert html.exists()
+
+
+def test_generate_report_with_cache(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    script = repo_root / "scripts" / "generate_report.py"
+    logs = Path(__file__).parent / "logs"
+    cache = tmp_path / "cache.db"
+
+    env = dict(**os.environ, PYTHONPATH=str(repo_root))
+    for extra in ([], ["--rebuild-cache"]):
+        subprocess.check_call([
+            sys.executable,
+            str(script),
+            str(logs),
+            str(tmp_path / "report.html"),
+            "--cache",
+            str(cache),
+        ] + extra, cwd=repo_root, env=env)
+
+    assert cache.exists()
+
+
+def test_generate_report_rebuild_cache_needs_cache(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    script = repo_root / "scripts" / "generate_report.py"
+    logs = Path(__file__).parent / "logs"
+
+    env = dict(**os.environ, PYTHONPATH=str(repo_root))
+    proc = subprocess.run([
+        sys.executable,
+        str(script),
+        str(logs),
+        str(tmp_path / "report.html"),
+        "--rebuild-cache",
+    ], cwd=repo_root, env=env, capture_output=True, text=True)
+
+    assert proc.returncode == 2
+    assert "--rebuild-cache needs --cache" in proc.stderr
+    assert not (tmp_path / "report.html").exists()
+
+
+def test_generate_report_with_db(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    script = repo_root / "scripts" / "generate_report.py"
+    logs = Path(__file__).parent / "logs"
+    html = tmp_path / "report.html"
+    database = tmp_path / "trades.db"
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(repo_root),
+        "DATABASE_URL": f"sqlite:///{database}",
+    }
+    for _ in range(2):  # the second run finds every trade already stored
+        subprocess.check_call([
+            sys.executable,
+            str(script),
+            str(logs),
+            str(html),
+            "--db",
+        ], cwd=repo_root, env=env)
+
+    assert html.exists()
+    import sqlite3
+
+    with sqlite3.connect(database) as conn:
+        (count,) = conn.execute("SELECT count(*) FROM trade_events").fetchone()
+    assert count > 0
@@ -4,8 +4,15 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.hauls import track_hauls
-from app.log_parser import _parse_line, collect_files, iter_records
+from app.hauls import HaulTracker, track_hauls
+from app.log_parser import (
+    _parse_line,
+    collect_files,
+    iter_file,
+    iter_records,
+    merge_by_time,
+)
+from app.synth import synthetic_records
 from tests.test_log_parser import BUY_LINE, SELL_LINE, MOVE_LINE
 
 
@@ -48,3 +55,39 @@ def test_hauls_from_sample_logs():
     profits = [float(h["profit"]) for h in hauls]
     assert profits[0] == 120937.0
     assert profits[1] == 90993.0
+
+
+def test_streamed_merge_matches_sorted():
+    log_dir = Path(__file__).parent / "logs"
+    files = collect_files([str(log_dir)])
+    expected = track_hauls(list(iter_records(files)))
+    streamed = track_hauls(
+        merge_by_time(iter_file(f) for f in files), ordered=True
+    )
+    assert streamed == expected
+
+
+def test_stock_follows_moves_and_sells():
+    buy = _parse_line(BUY_LINE)
+    move = _parse_line(MOVE_LINE.replace("quantity[10]", "quantity[50]"))
+    tracker = HaulTracker()
+    tracker.consume([buy, move])
+    res = buy["resourceGUID"]
+    assert tracker.stock(res) == {
+        buy["shopId"]: Decimal("70"),
+        move["shopId"]: Decimal("50"),
+    }
+    # the part left behind is sold first, the moved lot stays queued
+    tracker.process({**_parse_line(SELL_LINE), "quantity": Decimal("80")})
+    assert [h["quantity"] for h in tracker.hauls] == [Decimal("70"), Decimal("10")]
+    assert tracker.stock(res) == {move["shopId"]: Decimal("40")}
+
+
+def test_quantity_is_conserved_on_synthetic_stream():
+    records = list(synthetic_records(5_000, shops=5, resources=2, mix=(0.5, 0.3, 0.2)))
+    tracker = HaulTracker()
+    tracker.consume(records)
+    sold = sum(h["quantity"] for h in tracker.hauls)
+    held = sum(sum(tracker.stock(r).values()) for r in tracker.inventory)
+    bought = sum(r["quantity"] for r in records if r["operation"] == "Buy")
+    assert sold + held == bought
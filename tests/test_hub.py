@@ -0,0 +1,68 @@
+from pathlib import Path
+import asyncio
+import copy
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.web.hub import Broadcaster, apply_patch, json_diff
+
+
+def test_diff_round_trips():
+    old = {
+        "kpi": {"total_buys": 1, "total_sells": 0},
+        "rows": [{"a": 1}, {"a": 2}],
+        "tail": [1, 2],
+        "gone": True,
+        "a/b~c": 1,
+    }
+    new = {
+        "kpi": {"total_buys": 2, "total_sells": 0},
+        "rows": [{"a": 1}, {"a": 3}],
+        "tail": [1, 2, 3, 4],
+        "added": "x",
+        "a/b~c": 2,
+    }
+    ops = json_diff(old, new)
+    assert {"op": "add", "path": "/tail/-", "value": 3} in ops
+    assert {"op": "replace", "path": "/rows/1/a", "value": 3} in ops
+    assert {"op": "replace", "path": "/a~1b~0c", "value": 2} in ops
+    assert apply_patch(copy.deepcopy(old), ops) == new
+    assert json_diff(new, new) == []
+
+
+def test_publish_skips_unchanged_context():
+    hub = Broadcaster()
+    assert hub.publish({"kpi": {"total_buys": 1}})
+    assert not hub.publish({"kpi": {"total_buys": 1}})
+    assert hub.version == 1
+
+
+def test_message_picks_patch_or_snapshot():
+    hub = Broadcaster()
+    hub.publish({"kpi": {"total_buys": 1}, "rows": list(range(50))})
+    hub.publish({"kpi": {"total_buys": 2}, "rows": list(range(50))})
+
+    assert json.loads(hub.message(1)) == hub.latest
+    patch = json.loads(hub.message(1, patches=True))
+    assert patch == {
+        "type": "patch",
+        "version": 2,
+        "ops": [{"op": "replace", "path": "/kpi/total_buys", "value": 2}],
+    }
+    # a client that missed a version needs the whole document
+    snap = json.loads(hub.message(0, patches=True))
+    assert snap["type"] == "snapshot" and snap["data"] == hub.latest
+
+
+def test_wait_wakes_on_publish():
+    async def run():
+        hub = Broadcaster()
+        waiter = asyncio.create_task(hub.wait(0))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        hub.publish({"x": 1})
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(run()) == 1
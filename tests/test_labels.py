@@ -0,0 +1,89 @@
+from pathlib import Path
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.labels import label_context, label_rows, relabel_rows
+from app.web import main
+from tests.test_log_parser import BUY_LINE, SELL_LINE
+
+NAMES = {"resourceNames": {"r1": "Gold"}, "shopNames": {"s1": "Area18"}}
+
+
+def test_label_rows_adds_a_label_per_id_column():
+    rows = label_rows(
+        [
+            {"resourceGUID": "r1", "buyShopId": "s1", "sellShopId": "s2"},
+            {"resourceGUID": "r2", "buyShopId": "s2", "sellShopId": "s1"},
+        ],
+        NAMES,
+    )
+    assert [(r["resourceName"], r["buyShopLabel"], r["sellShopLabel"]) for r in rows] == [
+        ("Gold", "Area18", None),
+        (None, None, "Area18"),
+    ]
+
+
+def test_relabel_copies_only_affected_rows():
+    rows = label_rows(
+        [{"shopId": "s1", "resourceGUID": "r1"}, {"shopId": "s2", "resourceGUID": "r2"}],
+        NAMES,
+    )
+    out = relabel_rows(rows, {"resourceNames": {"r2": "Tin"}, "shopNames": {}})
+    assert out[0] is rows[0]
+    assert out[1] is not rows[1] and out[1]["resourceName"] == "Tin"
+    assert rows[1]["resourceName"] is None
+
+    # renaming to the current name, or an id not shown, changes nothing
+    assert relabel_rows(rows, {"resourceNames": {"r1": "Gold", "r9": "X"}}) is None
+
+
+def test_label_context_labels_every_table():
+    ctx = {
+        "kpi": {},
+        "pending_goods": [{"resourceGUID": "r1", "suggested shopId": "s1"}],
+        "best_routes": [],
+    }
+    label_context(ctx, NAMES)
+    assert ctx["pending_goods"][0]["resourceName"] == "Gold"
+    assert ctx["pending_goods"][0]["suggested shopLabel"] == "Area18"
+
+
+def test_saving_a_name_relabels_the_live_tables(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "Game.log").write_text(BUY_LINE + "\n" + SELL_LINE + "\n")
+    guid = "096618a0-1f7d-48db-9c6a-9ac459386527"
+    monkeypatch.setattr(main, "LOG_ROOT", logs)
+    monkeypatch.setattr(main, "CACHE_PATH", "")
+    monkeypatch.setattr(main, "WATCH_BACKEND", "poll")
+    monkeypatch.setattr(main, "WATCH_INTERVAL", 30)  # only a rename wakes it
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws") as ws:
+            before = ws.receive_json()
+            while "tables" not in before:  # skip the bootstrap message
+                before = ws.receive_json()
+            row = client.get("/api/tables/buy_summary").json()["rows"][0]
+            assert row["resourceName"] is None
+
+            client.post("/api/names/resource", json={"guid": guid, "name": "Gold"})
+            named = ws.receive_json()
+            # the buying shop shows up in fewer tables than the commodity
+            client.post(
+                "/api/names/shop", json={"shop_id": "4511624678944", "name": "Rayari"}
+            )
+            after = ws.receive_json()
+
+        assert named["hauls"]["names"] > before["hauls"]["names"]
+        changed = {
+            name for name, meta in after["tables"].items()
+            if meta != named["tables"][name]
+        }
+        assert changed == {"buy_summary", "best_routes", "last_transactions"}
+        row = client.get("/api/tables/buy_summary").json()["rows"][0]
+        assert (row["resourceName"], row["shopLabel"]) == ("Gold", "Rayari")
+        (haul,) = client.get("/api/hauls").json()["hauls"]
+        assert (haul["resourceName"], haul["buy_shop_label"]) == ("Gold", "Rayari")
@@ -4,7 +4,14 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.log_parser import _parse_line, iter_records, collect_files
+from app.log_parser import (
+    _parse_line,
+    collect_files,
+    iter_records,
+    read_records,
+    sniff_encoding,
+)
+from app.tail import LogTailer
 
 BUY_LINE = "<2025-06-21T22:00:18.409Z> [Notice] <CEntityComponentCommodityUIProvider::SendCommodityBuyRequest> Sending SShopCommodityBuyRequest - playerId[3563068139983] shopId[4511624678944] shopName[SCShop_ht_delta_rayari_m_store] kioskId[4511624678943] price[2159456.000000] shopPricePerCentiSCU[179.954651] resourceGUID[096618a0-1f7d-48db-9c6a-9ac459386527] autoLoading[0] quantity[12000.000000 cSCU] Cargo Box Data: boxSize[8.000000] | unitAmount[15] [Team_CoreGameplayFeatures][Shops][UI]"
 
@@ -63,3 +70,102 @@ def test_collect_files_absolute_glob(tmp_path):
     assert log_file in files
     records = list(iter_records(files))
     assert len(records) == 1
+
+
+def test_scanner_matches_line_parser():
+    files = collect_files([str(Path(__file__).parent / "logs")])
+    assert list(iter_records(files)) == list(iter_records(files, scan=False))
+
+
+def test_scanner_handles_chunk_boundaries(tmp_path, monkeypatch):
+    import app.log_parser as log_parser
+
+    log_file = tmp_path / "chunks.log"
+    noise = "<2025-06-21T22:00:00.000Z> [Notice] <Other> noise line\n"
+    log_file.write_text(
+        noise * 3 + BUY_LINE + "\n" + noise + SELL_LINE + "\n" + MOVE_LINE
+    )
+    monkeypatch.setattr(log_parser, "_CHUNK_SIZE", 37)
+
+    records, offset = read_records(log_file)
+    assert [r["operation"] for r in records] == ["Buy", "Sell", "Move"]
+    assert offset == log_file.stat().st_size
+
+    records, offset = read_records(log_file, partial=False)
+    assert [r["operation"] for r in records] == ["Buy", "Sell"]
+    assert offset == log_file.stat().st_size - len(MOVE_LINE)
+
+
+def test_parallel_matches_serial():
+    files = collect_files([str(Path(__file__).parent / "logs")])
+    assert list(iter_records(files, jobs=2)) == list(iter_records(files))
+
+
+NOISE = "<2025-06-21T22:00:00.000Z> [Notice] <Other> noise line"
+LINES = [NOISE, BUY_LINE, NOISE, SELL_LINE, MOVE_LINE, STOCK_LINE]
+
+
+def test_sniff_encoding(tmp_path):
+    text = "\n".join(LINES) + "\n"
+    cases = {
+        "utf-8": "utf-8",
+        "utf-8-sig": "utf-8",
+        "latin-1": "utf-8",  # pure ASCII reads the same either way
+        "utf-16": "utf-16-le",
+        "utf-16-le": "utf-16-le",
+        "utf-16-be": "utf-16-be",
+    }
+    for written, sniffed in cases.items():
+        path = tmp_path / f"{written}.log"
+        path.write_text(text, encoding=written)
+        assert sniff_encoding(path) == sniffed, written
+
+    path = tmp_path / "accents.log"
+    path.write_text(text.replace("noise line", "Café"), encoding="latin-1")
+    assert sniff_encoding(path) == "latin-1"
+
+
+def test_utf16_logs_are_parsed(tmp_path, monkeypatch):
+    import app.log_parser as log_parser
+
+    expected = [_parse_line(line) for line in LINES if _parse_line(line)]
+    for encoding in ("utf-16", "utf-16-be"):
+        path = tmp_path / f"{encoding}.log"
+        path.write_text("\r\n".join(LINES) + "\r\n", encoding=encoding)
+        # odd chunk sizes cut code units in half
+        for chunk in (4 << 20, 37):
+            monkeypatch.setattr(log_parser, "_CHUNK_SIZE", chunk)
+            records, offset = read_records(path)
+            assert records == expected, (encoding, chunk)
+            assert offset == path.stat().st_size
+        assert list(iter_records([path], scan=False)) == expected
+
+
+def test_tailer_follows_a_utf16_log(tmp_path):
+    path = tmp_path / "Game.log"
+    path.write_text(BUY_LINE + "\n", encoding="utf-16")
+    tailer = LogTailer([str(tmp_path)])
+    assert [r["operation"] for r in tailer.poll()] == ["Buy"]
+
+    with path.open("ab") as fh:
+        # a line is written in two parts; the first waits for its newline
+        tail = (SELL_LINE + "\n").encode("utf-16-le")
+        fh.write(tail[:101])
+        fh.flush()
+        assert tailer.poll() == []
+        fh.write(tail[101:])
+    assert [r["operation"] for r in tailer.poll()] == ["Sell"]
+    (cur,) = tailer.cursors.values()
+    assert cur.encoding == "utf-16-le"
+
+
+def test_stray_latin1_line_in_utf8_log(tmp_path):
+    path = tmp_path / "mixed.log"
+    accented = BUY_LINE.replace("SCShop_ht_delta_rayari_m_store", "Café")
+    # past the sniffed sample, so the file reads as UTF-8
+    path.write_bytes(
+        (NOISE + " ✓\n").encode() * 100 + accented.encode("latin-1") + b"\n"
+    )
+    assert sniff_encoding(path) == "utf-8"
+    (rec,) = read_records(path)[0]
+    assert rec["shopName"] == "Café"
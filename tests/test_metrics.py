@@ -0,0 +1,99 @@
+from pathlib import Path
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import metrics
+from app.log_parser import read_records
+from app.web import main
+from tests.test_log_parser import BUY_LINE, SELL_LINE
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", True)
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_parser_counts_bytes_lines_and_records(tmp_path):
+    log = tmp_path / "Game.log"
+    log.write_text(f"noise\n{BUY_LINE}\n{SELL_LINE}\n")
+    read_records(log)
+
+    counters = metrics.timings()["counters"]
+    assert counters["log_bytes"] == log.stat().st_size
+    assert counters["log_lines"] == 3
+    assert counters["records_parsed"] == 2
+
+
+def test_cycle_keeps_a_stage_breakdown():
+    with metrics.cycle():
+        with metrics.timed("parse"):
+            time.sleep(0.01)
+        with metrics.timed("parse"):
+            pass
+        metrics.counter("log_bytes", "").inc(10)
+
+    out = metrics.timings()
+    last = out["last_cycle"]
+    assert last["stages_ms"]["parse"] >= 10
+    assert last["total_ms"] >= last["stages_ms"]["parse"]
+    assert last["counts"]["log_bytes"] == 10
+    assert out["stages"]["parse"]["count"] == 2
+    assert out["stages"]["cycle"]["count"] == 1
+
+
+def test_prometheus_text_format():
+    metrics.stage_seconds.observe("parse", 0.003)
+    metrics.stage_seconds.observe("parse", 2.0)
+    text = metrics.render_prometheus()
+
+    assert "# TYPE sctrade_stage_seconds histogram" in text
+    assert 'sctrade_stage_seconds_bucket{stage="parse",le="0.001"} 0' in text
+    assert 'sctrade_stage_seconds_bucket{stage="parse",le="0.005"} 1' in text
+    assert 'sctrade_stage_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+    assert 'sctrade_stage_seconds_count{stage="parse"} 2' in text
+    assert "# TYPE sctrade_log_bytes counter" in text
+    assert "sctrade_log_bytes_total 0" in text
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", False)
+    with metrics.cycle():
+        with metrics.timed("parse"):
+            metrics.counter("log_bytes", "").inc(10)
+
+    out = metrics.timings()
+    assert out["last_cycle"] is None
+    assert out["stages"] == {}
+    assert out["counters"]["log_bytes"] == 0
+
+
+def test_endpoints_report_the_live_pipeline(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "Game.log").write_text(BUY_LINE + "\n" + SELL_LINE + "\n")
+    monkeypatch.setattr(main, "LOG_ROOT", logs)
+    monkeypatch.setattr(main, "CACHE_PATH", "")
+    monkeypatch.setattr(main, "WATCH_BACKEND", "poll")
+
+    with TestClient(main.app) as client:
+        for _ in range(100):
+            out = client.get("/api/debug/timings").json()
+            if out["last_cycle"]:
+                break
+            time.sleep(0.05)
+        stages = out["last_cycle"]["stages_ms"]
+        assert {"discover", "parse", "aggregate", "serialise", "persist"} <= set(stages)
+        assert out["last_cycle"]["counts"]["records_parsed"] == 2
+
+        resp = client.get("/metrics")
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "sctrade_records_parsed_total 2" in resp.text
+        assert "sctrade_log_files 1" in resp.text
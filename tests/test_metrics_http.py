@@ -0,0 +1,109 @@
+from pathlib import Path
+import gzip
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.web import hub as hub_module
+from app.web import main
+from app.web.hub import Broadcaster, is_fresh, pick_encoding
+
+CTX = {"kpi": {"total_buys": 3}, "rows": [{"shopId": str(i)} for i in range(100)]}
+
+
+def _client(monkeypatch, ctx=CTX):
+    hub = Broadcaster()
+    if ctx is not None:
+        hub.publish(ctx)
+    monkeypatch.setattr(main, "hub", hub)
+    # no ``with``: the lifespan (and its log watcher) is not started
+    return TestClient(main.app), hub
+
+
+def test_metrics_bootstrapping(monkeypatch):
+    client, _ = _client(monkeypatch, None)
+    assert client.get("/api/metrics").json() == {"status": "bootstrapping"}
+
+
+def test_metrics_etag_and_304(monkeypatch):
+    client, hub = _client(monkeypatch)
+    resp = client.get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.json() == CTX
+    etag = resp.headers["etag"]
+    # the test client accepts gzip by default
+    assert etag == hub.current.etag_for("gzip")
+
+    again = client.get("/api/metrics", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    since = client.get(
+        "/api/metrics", headers={"If-Modified-Since": resp.headers["last-modified"]}
+    )
+    assert since.status_code == 304
+
+    hub.publish({**CTX, "kpi": {"total_buys": 4}})
+    changed = client.get("/api/metrics", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_if_modified_since_misses_a_version_from_the_same_second(monkeypatch):
+    now = [1_750_000_000.2]
+    monkeypatch.setattr(hub_module.time, "time", lambda: now[0])
+    client, hub = _client(monkeypatch)
+    first = client.get("/api/metrics", headers={"Accept-Encoding": "identity"})
+    since = {"If-Modified-Since": first.headers["last-modified"]}
+    assert client.get("/api/metrics", headers=since).status_code == 304
+
+    now[0] += 0.5
+    hub.publish({**CTX, "kpi": {"total_buys": 4}})
+    assert client.get("/api/metrics", headers=since).status_code == 200
+
+
+def test_metrics_gzip_is_built_once_per_version(monkeypatch):
+    client, hub = _client(monkeypatch)
+    resp = client.get("/api/metrics", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.json() == CTX
+    cached = hub.encoded("gzip")
+    client.get("/api/metrics", headers={"Accept-Encoding": "gzip"})
+    assert hub.encoded("gzip") is cached
+    assert gzip.decompress(cached) == hub.body
+
+    plain = client.get("/api/metrics", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_metrics_etag_per_encoding(monkeypatch):
+    client, hub = _client(monkeypatch)
+    plain = client.get("/api/metrics", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/api/metrics", headers={"Accept-Encoding": "gzip"})
+    assert plain.headers["etag"] == hub.etag
+    assert zipped.headers["etag"] == hub.etag[:-1] + '-gzip"'
+    assert zipped.headers["vary"] == "Accept-Encoding"
+
+    # a validator only matches the representation it was sent with
+    cross = client.get(
+        "/api/metrics",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]},
+    )
+    assert cross.status_code == 200
+    same = client.get(
+        "/api/metrics",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": zipped.headers["etag"]},
+    )
+    assert same.status_code == 304
+    assert same.headers["etag"] == zipped.headers["etag"]
+
+
+def test_negotiation_helpers():
+    assert pick_encoding("gzip, deflate", 10_000) == "gzip"
+    assert pick_encoding("gzip;q=0", 10_000) is None
+    assert pick_encoding("gzip", 10) is None
+    assert is_fresh({"if-none-match": 'W/"abc", "def"'}, '"abc"', 0)
+    assert not is_fresh({"if-none-match": '"x"'}, '"abc"', 0)
+    assert not is_fresh({}, '"abc"', 0)
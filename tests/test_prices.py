@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import db
+from app.prices import ALL_SHOPS, PriceRollups, pick_resolution
+from app.web import main
+from tests.test_log_parser import BUY_LINE
+
+T0 = datetime(2025, 6, 21, 22, 0, 5)
+
+
+def _buy(ts, unit, qty=100, shop="s1", resource="r1"):
+    return {
+        "timestamp": ts,
+        "operation": "Buy",
+        "shopId": shop,
+        "shopName": shop,
+        "resourceGUID": resource,
+        "quantity": Decimal(qty),
+        "price": Decimal(unit) * qty,
+    }
+
+
+def _bars(rollups, resolution, shop=ALL_SHOPS):
+    return [
+        (b["bucket"], b["open"], b["high"], b["low"], b["close"], b["trades"])
+        for b in rollups.series("r1", "buy", resolution, shop)
+    ]
+
+
+def test_rollups_build_ohlc_bars_at_each_resolution():
+    rollups = PriceRollups()
+    rollups.extend([
+        _buy(T0, 10),
+        _buy(T0 + timedelta(seconds=20), 14),
+        _buy(T0 + timedelta(seconds=40), 9),
+        _buy(T0 + timedelta(minutes=1), 12, shop="s2"),
+    ])
+
+    assert _bars(rollups, "minute") == [
+        (datetime(2025, 6, 21, 22, 0), 10, 14, 9, 9, 3),
+        (datetime(2025, 6, 21, 22, 1), 12, 12, 12, 12, 1),
+    ]
+    assert _bars(rollups, "hour") == [(datetime(2025, 6, 21, 22), 10, 14, 9, 12, 4)]
+    assert _bars(rollups, "day") == [(datetime(2025, 6, 21), 10, 14, 9, 12, 4)]
+    # per-shop series start at hourly bars
+    assert _bars(rollups, "minute", "s1") == []
+    assert _bars(rollups, "hour", "s1") == [(datetime(2025, 6, 21, 22), 10, 14, 9, 9, 3)]
+
+
+def test_rollups_place_late_records_by_timestamp():
+    rollups = PriceRollups()
+    rollups.extend([_buy(T0 + timedelta(seconds=30), 20), _buy(T0 + timedelta(seconds=50), 30)])
+    rollups.flush()
+    rollups.add(_buy(T0, 5))  # older than everything seen so far
+
+    assert _bars(rollups, "minute") == [(datetime(2025, 6, 21, 22, 0), 5, 30, 5, 30, 3)]
+    # only the bars the late record touched are flushed again
+    assert len(rollups.flush()) == 5
+
+
+def test_rollups_skip_moves_and_empty_trades():
+    rollups = PriceRollups()
+    rollups.add({**_buy(T0, 10), "operation": "Move"})
+    rollups.add(_buy(T0, 10, qty=0))
+    assert rollups.bars == {}
+
+
+def test_pick_resolution():
+    start = datetime(2025, 6, 1)
+    assert pick_resolution(start, start + timedelta(hours=2)) == "minute"
+    assert pick_resolution(start, start + timedelta(days=3)) == "hour"
+    assert pick_resolution(start, start + timedelta(days=90)) == "day"
+    assert pick_resolution(start, start + timedelta(days=3), points=24) == "day"
+
+
+def test_price_bars_upsert_and_read_back(tmp_path, monkeypatch):
+    rollups = PriceRollups()
+    rollups.add(_buy(T0, 10))
+    db.save_price_bars(rollups.flush())
+    rollups.add(_buy(T0 + timedelta(seconds=1), 20))
+    db.save_price_bars(rollups.flush())
+
+    (bar,) = db.get_price_bars("r1", "buy", "minute")
+    assert (bar["open"], bar["close"], bar["trades"]) == (10, 20, 2)
+    assert db.price_bounds("r1", "buy") == (datetime(2025, 6, 21),) * 2
+    assert db.price_bounds("r1", "buy", resolution="hour") == (
+        datetime(2025, 6, 21, 22),
+    ) * 2
+    assert db.price_bounds("r1", "sell") == (None, None)
+
+
+def test_restart_keeps_bars_of_rotated_logs(tmp_path, monkeypatch):
+    from app.tail import LogTailer
+    from app.web.hub import Broadcaster
+
+    def trade(hhmm):
+        return BUY_LINE.replace("22:00:18", f"{hhmm}:18") + "\n"
+
+    logs = tmp_path / "logs"
+    (logs / "logbackups").mkdir(parents=True)
+    (logs / "logbackups" / "Game Build(1).log").write_text(trade("09:00"))
+    (logs / "Game.log").write_text(trade("22:00"))
+    first = main._Ingest(LogTailer([str(logs)]))
+    first.step(Broadcaster())
+    first.persist()
+
+    # the backup is rotated away and the game carries on the same day
+    (logs / "logbackups" / "Game Build(1).log").unlink()
+    with (logs / "Game.log").open("a") as fh:
+        fh.write(trade("22:30"))
+    restarted = main._Ingest(LogTailer([str(logs)]))
+    restarted.step(Broadcaster())
+    restarted.persist()
+
+    guid = "096618a0-1f7d-48db-9c6a-9ac459386527"
+    hours = db.get_price_bars(guid, "buy", "hour")
+    assert [(b["bucket"].hour, b["trades"]) for b in hours] == [(9, 1), (22, 2)]
+    (day,) = db.get_price_bars(guid, "buy", "day")
+    assert day["trades"] == 3
+    assert db.get_price_bars(guid, "buy", "day", "4511624678944")[0]["trades"] == 3
+
+
+def test_prices_endpoint_serves_live_history(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    second = BUY_LINE.replace("22:00:18", "22:05:00").replace(
+        "price[2159456.000000]", "price[2400000.000000]"
+    )
+    (logs / "Game.log").write_text(BUY_LINE + "\n" + second + "\n")
+    guid = "096618a0-1f7d-48db-9c6a-9ac459386527"
+    monkeypatch.setattr(main, "LOG_ROOT", logs)
+    monkeypatch.setattr(main, "CACHE_PATH", "")
+    monkeypatch.setattr(main, "WATCH_BACKEND", "poll")
+    monkeypatch.setattr(main, "WATCH_INTERVAL", 0.05)
+
+    with TestClient(main.app) as client:
+        for _ in range(100):
+            data = client.get("/api/prices", params={"resource": guid}).json()
+            if data["points"]:
+                break
+            time.sleep(0.05)
+        # the stored history spans minutes, so minute bars fit
+        assert data["resolution"] == "minute"
+        assert [p["bucket"] for p in data["points"]] == [
+            "2025-06-21T22:00:00",
+            "2025-06-21T22:05:00",
+        ]
+        assert data["points"][1]["close"] == 20000.0  # per SCU
+        # the raw events are stored alongside
+        assert len(list(db.load_trade_events())) == 2
+
+        week = client.get(
+            "/api/prices",
+            params={
+                "resource": guid,
+                "since": "2025-06-15T00:00:00Z",
+                "until": "2025-06-22T00:00:00Z",
+                "points": 200,
+            },
+        ).json()
+        assert week["resolution"] == "hour"
+        (bar,) = week["points"]
+        assert (bar["trades"], bar["high"]) == (2, 20000.0)
+
+        assert client.get(
+            "/api/prices", params={"resource": guid, "side": "both"}
+        ).status_code == 422
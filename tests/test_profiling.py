@@ -0,0 +1,122 @@
+from pathlib import Path
+import asyncio
+import cProfile
+import sys
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.profiling import NO_CAPTURE, ProfileMiddleware, Profiler, profiler
+from app.web import main
+from tests.test_log_parser import BUY_LINE
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+def _allocate():
+    return [str(i) * 10 for i in range(20000)]
+
+
+def test_captures_only_while_armed(tmp_path):
+    prof = Profiler(tmp_path)
+    assert prof.start("cycle") is NO_CAPTURE
+
+    prof.arm(cycles=2)
+    for _ in range(3):
+        capture = prof.start("cycle")
+        capture.call(_busy, 10000)
+        prof.finish(capture)
+
+    assert prof.state()["armed"] == {"cycles": 0, "requests": 0}
+    assert len(prof.captures) == 2
+    assert len(list(tmp_path.glob("cycle-*.prof"))) == 2
+    top = prof.summary(top=5)["top_functions"]
+    assert any("_busy" in f["function"] or "genexpr" in f["function"] for f in top)
+
+
+def test_one_capture_at_a_time(tmp_path):
+    prof = Profiler(tmp_path)
+    prof.arm(cycles=2, requests=1)
+    first = prof.start("cycle")
+    assert prof.start("cycle") is NO_CAPTURE
+    # one profiler per interpreter from Python 3.12, whatever the kind
+    assert prof.start("request") is NO_CAPTURE
+    assert prof.armed["request"] == 1
+    prof.finish(first)
+    second = prof.start("cycle")
+    assert second is not NO_CAPTURE
+
+    prof.discard(second)  # an idle cycle gives its slot back
+    assert prof.armed["cycle"] == 1
+    assert len(prof.captures) == 1
+
+
+def test_failed_enable_releases_the_capture(tmp_path, monkeypatch):
+    class Busy(cProfile.Profile):
+        def enable(self, *args, **kw):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile, "Profile", Busy)
+    prof = Profiler(tmp_path)
+    prof.arm(requests=2)
+
+    async def app(scope, receive, send):
+        pass
+
+    middleware = ProfileMiddleware(app, prof)
+    scope = {"type": "http", "method": "GET", "path": "/api/names"}
+    with pytest.raises(ValueError):
+        asyncio.run(middleware(scope, None, None))
+    assert prof.active == {}
+    assert prof.start("request") is not NO_CAPTURE
+
+
+def test_memory_capture_reports_allocation_sites(tmp_path):
+    assert not tracemalloc.is_tracing()
+    prof = Profiler(tmp_path)
+    prof.arm(cycles=1, memory=True)
+    capture = prof.start("cycle")
+    kept = capture.call(_allocate)
+    prof.finish(capture)
+
+    assert not tracemalloc.is_tracing()  # stopped once nothing is armed
+    assert len(list(tmp_path.glob("cycle-*.tracemalloc"))) == 1
+    (site, *_) = prof.summary()["top_allocations"]
+    assert "test_profiling.py" in site["site"] and site["size_kb"] > 100
+    del kept
+
+
+def test_endpoints_profile_requests_and_cycles(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    monkeypatch.setattr(main, "LOG_ROOT", logs)
+    monkeypatch.setattr(main, "CACHE_PATH", "")
+    monkeypatch.setattr(main, "WATCH_BACKEND", "poll")
+    monkeypatch.setattr(main, "WATCH_INTERVAL", 0.05)
+    monkeypatch.setattr(profiler, "directory", tmp_path / "profiles")
+    monkeypatch.setattr(profiler, "captures", type(profiler.captures)(maxlen=20))
+
+    with TestClient(main.app) as client:
+        state = client.post("/api/debug/profile", params={"requests": 1, "cycles": 1}).json()
+        assert state["armed"] == {"cycles": 1, "requests": 1}
+        client.get("/api/names")
+        client.get("/api/names")  # only the first is captured
+        (logs / "Game.log").write_text(BUY_LINE + "\n")
+        for _ in range(100):
+            out = client.get("/api/debug/profile").json()
+            if out["captures"] == 2:
+                break
+            time.sleep(0.05)
+        client.post("/api/debug/profile")
+
+    assert sorted(c["kind"] for c in out["recent"]) == ["cycle", "request"]
+    (request,) = [c for c in out["recent"] if c["kind"] == "request"]
+    assert request["label"] == "GET /api/names"
+    assert out["top_functions"]
+    assert len(list((tmp_path / "profiles").glob("*.prof"))) == 2
@@ -0,0 +1,93 @@
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.analysis import analyse
+from app.query import VIEWS, QueryEngine
+from app.synth import synthetic_records
+from app.web import main
+
+RECORDS = list(synthetic_records(3_000, shops=8, resources=4))
+SINCE, UNTIL = datetime(2025, 1, 1, 12), datetime(2025, 1, 2, 12)
+
+
+def _expected(since=None, until=None, shops=(), resources=()):
+    rows = [
+        r
+        for r in RECORDS
+        if (since is None or r["timestamp"] >= since)
+        and (until is None or r["timestamp"] <= until)
+        and (not shops or r["shopId"] in shops)
+        and (not resources or r["resourceGUID"] in resources)
+    ]
+    return len(rows), analyse(pd.DataFrame(rows))
+
+
+def test_views_match_analyse_on_filtered_records():
+    engine = QueryEngine(RECORDS)
+    resource = RECORDS[0]["resourceGUID"]
+    shops = [RECORDS[1]["shopId"], RECORDS[2]["shopId"]]
+    for filters in (
+        {},
+        {"since": SINCE, "until": UNTIL},
+        {"since": SINCE, "resources": [resource]},
+        {"until": UNTIL, "shops": shops, "resources": [resource]},
+    ):
+        count, expected = _expected(**filters)
+        assert count
+        for view in VIEWS:
+            got = engine.query(view, **filters)
+            assert got["count"] == count
+            assert got["result"] == expected[view], (view, filters)
+
+
+def test_empty_windows():
+    engine = QueryEngine(RECORDS)
+    assert engine.query("kpi", since=datetime(2030, 1, 1))["count"] == 0
+    assert engine.query("buy_summary", shops=["unknown"])["result"] == []
+    for view in VIEWS:
+        assert QueryEngine().query(view)["count"] == 0
+
+
+def test_cache_is_dropped_when_records_arrive():
+    engine = QueryEngine(RECORDS[:2_000])
+    first = engine.query("kpi", since=SINCE)
+    assert engine.query("kpi", since=SINCE) is first
+    assert engine.hits == 1
+
+    engine.extend(RECORDS[2_000:])
+    fresh = engine.query("kpi", since=SINCE)
+    assert fresh is not first
+    assert fresh["result"] == _expected(since=SINCE)[1]["kpi"]
+
+
+def test_out_of_order_batch_is_resorted():
+    engine = QueryEngine(RECORDS[1_000:])
+    engine.extend(RECORDS[:1_000])
+    assert engine.query("daily_profit") == {
+        "count": len(RECORDS),
+        "result": analyse(pd.DataFrame(RECORDS))["daily_profit"],
+    }
+
+
+def test_query_endpoint(monkeypatch):
+    monkeypatch.setattr(main, "query_engine", QueryEngine(RECORDS))
+    client = TestClient(main.app)
+    resource = RECORDS[0]["resourceGUID"]
+    resp = client.get(
+        "/api/query/buy_summary",
+        params={"since": "2025-01-01T12:00:00Z", "resource": resource},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    count, expected = _expected(since=SINCE, resources=[resource])
+    assert body["view"] == "buy_summary"
+    assert body["count"] == count
+    assert len(body["result"]) == len(expected["buy_summary"])
+
+    assert client.get("/api/query/nope").status_code == 404
@@ -0,0 +1,42 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.analysis import analyse
+from app.hauls import track_hauls
+from app.log_parser import collect_files, iter_records, read_records
+from app.records import RecordStore
+from app.synth import synthetic_records
+
+LOG_DIR = Path(__file__).parent / "logs"
+
+
+def test_store_round_trips_parser_records():
+    records = list(iter_records(collect_files([str(LOG_DIR)])))
+    store = RecordStore(records)
+    assert len(store) == len(records)
+    assert list(store) == records
+
+
+def test_parser_appends_into_store():
+    store = RecordStore()
+    for path in collect_files([str(LOG_DIR)]):
+        read_records(path, into=store)
+    assert list(store) == list(iter_records(collect_files([str(LOG_DIR)])))
+
+
+def test_analyse_and_hauls_accept_store():
+    records = list(iter_records(collect_files([str(LOG_DIR)])))
+    store = RecordStore(records)
+    assert analyse(store) == analyse(pd.DataFrame(records))
+    assert track_hauls(store) == track_hauls(records)
+
+
+def test_store_is_compact():
+    store = RecordStore(synthetic_records(10_000, shops=40, resources=15))
+    assert store.nbytes / len(store) < 64
+    assert len(store.shops.values) <= 40
+    assert len(store.resources.values) <= 15
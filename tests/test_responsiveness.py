@@ -0,0 +1,53 @@
+from pathlib import Path
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.web import main
+from tests.test_log_parser import BUY_LINE
+
+RESCAN_SECONDS = 1.5
+
+
+def test_metrics_stay_responsive_during_rescan(tmp_path, monkeypatch):
+    (tmp_path / "Game.log").write_text(BUY_LINE + "\n")
+    monkeypatch.setattr(main, "LOG_ROOT", tmp_path)
+    monkeypatch.setattr(main, "CACHE_PATH", "")
+    monkeypatch.setattr(main, "WATCH_BACKEND", "poll")
+    monkeypatch.setattr(main, "WATCH_INTERVAL", 0.05)
+    monkeypatch.setattr(main, "ingest_stats", main.IngestStats())
+
+    real_step = main._Ingest.step
+
+    def slow_step(self, hub, force=False):
+        # pure-Python busy work holds the GIL like parsing does
+        end = time.perf_counter() + RESCAN_SECONDS
+        n = 0
+        while time.perf_counter() < end:
+            n += 1
+        return real_step(self, hub, force)
+
+    monkeypatch.setattr(main._Ingest, "step", slow_step)
+
+    with TestClient(main.app) as client:
+        for _ in range(100):
+            if main.ingest_stats.running:
+                break
+            time.sleep(0.01)
+        worst = 0.0
+        polled = 0
+        while main.ingest_stats.running:
+            start = time.perf_counter()
+            assert client.get("/api/metrics").status_code == 200
+            worst = max(worst, time.perf_counter() - start)
+            polled += 1
+        assert polled >= 5
+        assert worst < 0.5
+
+        health = client.get("/api/health").json()
+        assert health["ingest"]["runs"] >= 1
+        assert health["ingest"]["last_ms"] >= RESCAN_SECONDS * 1000
+        assert health["loop_lag"]["max_ms"] < 500
@@ -0,0 +1,61 @@
+from datetime import datetime
+from pathlib import Path
+import io
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.log_parser import _parse_line, collect_files, iter_records
+from app.synth import append_live, format_line, log_lines, synthetic_records, write_logs
+from app.tail import LogTailer
+
+MIX = (0.3, 0.3, 0.2, 0.2)
+
+
+def test_format_line_round_trips_through_the_parser():
+    records = list(synthetic_records(500, mix=MIX))
+    assert {r["operation"] for r in records} == {"Buy", "Sell", "Move", "Stock"}
+    for rec in records:
+        assert _parse_line(format_line(rec)) == rec
+
+
+def test_default_mix_stream_is_unchanged_by_stock_support():
+    ops = [r["operation"] for r in synthetic_records(200)]
+    assert "Stock" not in ops
+
+
+def test_noise_lines_are_ignored():
+    records = list(synthetic_records(50, seed=3))
+    lines = list(log_lines(records, noise=10, seed=3))
+    assert len(lines) > 5 * len(records)
+    assert [p for p in map(_parse_line, lines) if p] == records
+
+
+def test_write_logs_splits_into_named_files(tmp_path):
+    records = list(synthetic_records(300, seed=1, mix=MIX))
+    paths = write_logs(tmp_path, records, files=3, noise=5, newline="\r\n")
+
+    assert len(paths) == 3
+    assert all(p.name.startswith("Game Build(") for p in paths)
+    assert set(collect_files([str(tmp_path)])) == set(paths)
+    assert list(iter_records(paths)) == records
+
+
+def test_append_live_feeds_the_tailer(tmp_path):
+    log = tmp_path / "Game.log"
+    log.write_text("")
+    tailer = LogTailer([str(tmp_path)])
+    assert tailer.poll() == []
+
+    with log.open("a") as fh:
+        n = append_live(fh, synthetic_records(5), rate=0, noise=3)
+    new = tailer.poll()
+    assert n == len(new) == 5
+    # stamped with the current time, not the synthetic one
+    assert new[0]["timestamp"] > datetime(2025, 1, 2)
+
+
+def test_append_live_paces_by_rate():
+    waits = []
+    append_live(io.StringIO(), synthetic_records(3), rate=4, sleep=waits.append)
+    assert waits == [0.25] * 3
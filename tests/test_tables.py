@@ -0,0 +1,102 @@
+from pathlib import Path
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.analysis import TradeAggregator
+from app.synth import synthetic_records
+from app.tail import LogTailer
+from app.web import main
+from app.web.hub import Broadcaster
+from app.web.tables import TABLES, TableSet
+from tests.test_log_parser import BUY_LINE, SELL_LINE
+
+ROWS = [
+    {"shopId": "a", "qty": 3.0, "timestamp": "2025-01-02 00:00:00"},
+    {"shopId": "b", "qty": None, "timestamp": "2025-01-03 00:00:00"},
+    {"shopId": "c", "qty": 1.0, "timestamp": "2025-01-01 00:00:00"},
+]
+
+
+def test_default_order_is_newest_first():
+    tables = TableSet({"last_transactions": ROWS})
+    page = tables.page("last_transactions", limit=2)
+    assert page["total"] == 3
+    assert page["columns"] == ["shopId", "qty", "timestamp"]
+    assert [r["shopId"] for r in page["rows"]] == ["b", "a"]
+
+
+def test_sort_keeps_missing_values_last():
+    tables = TableSet({"t": ROWS})
+    asc = tables.page("t", sort="qty")["rows"]
+    desc = tables.page("t", sort="qty", desc=True)["rows"]
+    assert [r["shopId"] for r in asc] == ["c", "a", "b"]
+    assert [r["shopId"] for r in desc] == ["a", "c", "b"]
+    assert tables.ordered("t", "qty", True) is tables.ordered("t", "qty", True)
+
+
+def test_etag_follows_content():
+    assert TableSet({"t": ROWS}).meta == TableSet({"t": list(ROWS)}).meta
+    assert TableSet({"t": ROWS}).meta != TableSet({"t": ROWS[:2]}).meta
+
+
+def test_pushed_context_carries_table_digests_only(tmp_path, monkeypatch):
+    (tmp_path / "Game.log").write_text(BUY_LINE + "\n" + SELL_LINE + "\n")
+    ingest = main._Ingest(LogTailer([str(tmp_path)]))
+    hub = Broadcaster()
+    snap, tables = ingest.step(hub)
+    ctx = snap.ctx
+    assert set(ctx) == {"kpi", "daily_profit", "tables", "log_info", "hauls"}
+    assert set(ctx["tables"]) == set(TABLES)
+    assert ctx["tables"]["buy_summary"]["total"] == 1
+    assert tables.tables["sell_summary"][0]["shopId"] == "4511623301041"
+
+
+def test_table_endpoint(monkeypatch):
+    agg = TradeAggregator()
+    agg.extend(synthetic_records(2_000, shops=10, resources=5))
+    ctx = agg.result()
+    monkeypatch.setattr(
+        main, "table_set", TableSet({name: ctx[name] for name in TABLES})
+    )
+    client = TestClient(main.app)
+
+    rows = ctx["buy_summary"]
+    resp = client.get(
+        "/api/tables/buy_summary",
+        params={"offset": 10, "limit": 5, "sort": "avgPriceperSCU", "order": "desc"},
+    ).json()
+    expected = sorted(rows, key=lambda r: r["avgPriceperSCU"], reverse=True)
+    assert resp["total"] == len(rows)
+    assert resp["rows"] == expected[10:15]
+    assert resp["etag"] == main.table_set.meta["buy_summary"]["etag"]
+
+    assert client.get("/api/tables/nope").status_code == 404
+
+
+def test_relabel_shares_untouched_tables():
+    rows = [{"shopId": "a", "shopLabel": None, "qty": 1.0}]
+    other = [{"resourceGUID": "r", "resourceName": "Gold"}]
+    tables = TableSet({"t": rows, "u": other}, names_version=1)
+    tables.ordered("u", "resourceName", False)
+    tables.ordered("t", "shopLabel", False)
+
+    renamed = tables.relabel({"shopNames": {"a": "Area18"}, "resourceNames": {}}, 2)
+
+    assert renamed.names_version == 2
+    assert renamed.tables["t"][0]["shopLabel"] == "Area18"
+    assert rows[0]["shopLabel"] is None  # the old version is left alone
+    assert renamed.meta["t"] != tables.meta["t"]
+    assert renamed.tables["u"] is other and renamed.meta["u"] == tables.meta["u"]
+    assert set(renamed._orders) == {("u", "resourceName", False)}
+
+
+def test_tables_are_empty_before_the_first_version(monkeypatch):
+    monkeypatch.setattr(main, "table_set", TableSet({name: [] for name in TABLES}))
+    client = TestClient(main.app)
+    resp = client.get("/api/tables/best_routes")
+    assert resp.status_code == 200
+    assert (resp.json()["total"], resp.json()["rows"]) == (0, [])
+    assert client.get("/api/tables/nope").status_code == 404
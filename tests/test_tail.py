@@ -0,0 +1,113 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import tail
+from app.tail import LogTailer
+from tests.test_log_parser import BUY_LINE, SELL_LINE, MOVE_LINE
+
+
+def test_poll_returns_only_appended_records(tmp_path):
+    log_file = tmp_path / "Game.log"
+    log_file.write_text(BUY_LINE + "\n")
+
+    tailer = LogTailer([str(tmp_path)])
+    assert [r["operation"] for r in tailer.poll()] == ["Buy"]
+    assert tailer.changed
+
+    assert tailer.poll() == []
+    assert not tailer.changed
+
+    with log_file.open("a") as fh:
+        fh.write(SELL_LINE + "\n")
+    assert [r["operation"] for r in tailer.poll()] == ["Sell"]
+    assert [r["operation"] for r in tailer.records()] == ["Buy", "Sell"]
+    assert not tailer.reset
+
+
+def test_partial_line_waits_for_newline(tmp_path):
+    log_file = tmp_path / "Game.log"
+    log_file.write_text(BUY_LINE[:80])
+
+    tailer = LogTailer([str(tmp_path)])
+    assert tailer.poll() == []
+
+    with log_file.open("a") as fh:
+        fh.write(BUY_LINE[80:] + "\n")
+    assert [r["operation"] for r in tailer.poll()] == ["Buy"]
+
+
+def test_untouched_files_are_not_reopened(tmp_path, monkeypatch):
+    (tmp_path / "old.log").write_text(BUY_LINE + "\n")
+    live = tmp_path / "live.log"
+    live.write_text("")
+
+    tailer = LogTailer([str(tmp_path)])
+    tailer.poll()
+
+    opened = []
+    real_read = tail.read_records
+
+    def spy(path, *args, **kwargs):
+        opened.append(path.name)
+        return real_read(path, *args, **kwargs)
+
+    monkeypatch.setattr(tail, "read_records", spy)
+    with live.open("a") as fh:
+        fh.write(MOVE_LINE + "\n")
+    assert [r["operation"] for r in tailer.poll()] == ["Move"]
+    assert opened == ["live.log"]
+
+
+def test_truncated_file_is_reread(tmp_path):
+    log_file = tmp_path / "Game.log"
+    log_file.write_text(BUY_LINE + "\n" + SELL_LINE + "\n")
+
+    tailer = LogTailer([str(tmp_path)])
+    assert len(tailer.poll()) == 2
+
+    log_file.write_text(MOVE_LINE + "\n")
+    assert [r["operation"] for r in tailer.poll()] == ["Move"]
+    assert tailer.reset
+    assert [r["operation"] for r in tailer.records()] == ["Move"]
+
+
+def test_renamed_file_keeps_cursor(tmp_path):
+    live = tmp_path / "Game.log"
+    live.write_text(BUY_LINE + "\n")
+    tailer = LogTailer([str(tmp_path)])
+    tailer.poll()
+
+    backups = tmp_path / "logbackups"
+    backups.mkdir()
+    live.rename(backups / "Game Build(1) 01 Jan 25 (00 00 00).log")
+
+    assert tailer.poll() == []
+    assert not tailer.reset
+    assert [r["operation"] for r in tailer.records()] == ["Buy"]
+
+
+def test_restart_moves_log_and_starts_a_new_one(tmp_path):
+    live = tmp_path / "Game.log"
+    live.write_text(BUY_LINE + "\n")
+    tailer = LogTailer([str(tmp_path)])
+    tailer.poll()
+
+    # the game backs the log up and opens a fresh one before the next poll
+    backups = tmp_path / "logbackups"
+    backups.mkdir()
+    live.rename(backups / "Game Build(1) 01 Jan 25 (00 00 00).log")
+    live.write_text(SELL_LINE + "\n")
+
+    assert [r["operation"] for r in tailer.poll()] == ["Sell"]
+    assert not tailer.reset
+    assert sorted(r["operation"] for r in tailer.records()) == ["Buy", "Sell"]
+
+
+def test_parallel_cold_start(tmp_path):
+    (tmp_path / "a.log").write_text(BUY_LINE + "\n")
+    (tmp_path / "b.log").write_text(SELL_LINE + "\n")
+
+    tailer = LogTailer([str(tmp_path)], jobs=2)
+    assert sorted(r["operation"] for r in tailer.poll()) == ["Buy", "Sell"]
@@ -0,0 +1,110 @@
+from pathlib import Path
+import asyncio
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.watcher import InotifyWatcher, PollingWatcher, make_watcher
+
+
+def _inotify(root, **kwargs):
+    try:
+        return InotifyWatcher(root, **kwargs)
+    except (OSError, AttributeError):
+        pytest.skip("inotify not available")
+
+
+def test_inotify_wakes_on_write(tmp_path):
+    watcher = _inotify(tmp_path, interval=5, debounce=0.01)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, (tmp_path / "Game.log").write_text, "line\n")
+        start = time.monotonic()
+        woke = await watcher.wait()
+        return woke, time.monotonic() - start
+
+    try:
+        woke, elapsed = asyncio.run(run())
+    finally:
+        watcher.close()
+    assert woke
+    assert elapsed < 2
+
+
+def test_inotify_watches_new_directories(tmp_path):
+    watcher = _inotify(tmp_path, interval=5, debounce=0.01)
+    backups = tmp_path / "logbackups"
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, backups.mkdir)
+        assert await watcher.wait()
+        loop.call_later(0.05, (backups / "old.log").write_text, "line\n")
+        return await watcher.wait()
+
+    try:
+        assert asyncio.run(run())
+    finally:
+        watcher.close()
+
+
+def test_inotify_does_not_spin_on_pending_events(tmp_path):
+    watcher = _inotify(tmp_path, interval=5, debounce=0.01)
+    calls = []
+    readable = watcher._on_readable
+
+    def counting():
+        calls.append(1)
+        readable()
+
+    watcher._on_readable = counting
+    log = tmp_path / "Game.log"
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, log.write_text, "line\n")
+        assert await watcher.wait()
+        # events arrive while nobody waits, as during a rescan
+        with log.open("a") as fh:
+            for _ in range(50):
+                fh.write("line\n")
+                fh.flush()
+        before = len(calls)
+        await asyncio.sleep(0.3)
+        during = len(calls) - before
+        assert await watcher.wait()
+        return during
+
+    try:
+        during = asyncio.run(run())
+    finally:
+        watcher.close()
+    assert during <= 1
+
+
+def test_inotify_times_out_without_changes(tmp_path):
+    watcher = _inotify(tmp_path, interval=0.1)
+    try:
+        assert asyncio.run(watcher.wait()) is False
+    finally:
+        watcher.close()
+
+
+def test_polling_watcher_times_out(tmp_path):
+    watcher = make_watcher(tmp_path, "poll", interval=0.01)
+    assert isinstance(watcher, PollingWatcher)
+    assert asyncio.run(watcher.wait()) is False
+
+
+def test_auto_falls_back_to_polling(tmp_path):
+    watcher = make_watcher(tmp_path / "missing", "auto", interval=0.01)
+    assert isinstance(watcher, PollingWatcher)
+
+
+def test_unknown_backend_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        make_watcher(tmp_path, "kqueue")
@@ -1,9 +1,7 @@
 import asyncio
-import json
 from pathlib import Path
 import sys
 from fastapi.testclient import TestClient
-from fastapi import WebSocketDisconnect
 import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -11,6 +9,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from app.web import main
 from app.log_parser import collect_files, iter_records
 from app.analysis import analyse
+from app.web.hub import apply_patch
 from tests.test_log_parser import BUY_LINE
 
 
@@ -26,20 +25,10 @@ def test_websocket_updates_with_log(tmp_path, monkeypatch):
             df = pd.DataFrame(iter_records(files))
             ctx = analyse(df)
             ctx["log_info"] = {"path": str(tmp_path), "count": len(files)}
-            main._latest_ctx = ctx
+            main.hub.publish(ctx)
             await asyncio.sleep(0.05)
 
-    async def fast_ws_dashboard(ws):
-        await ws.accept()
-        try:
-            while True:
-                await ws.send_text(json.dumps(main._latest_ctx or {}))
-                await asyncio.sleep(0.05)
-        except WebSocketDisconnect:
-            pass
-
     monkeypatch.setattr(main, "watch_logs", fast_watch_logs)
-    monkeypatch.setattr(main, "ws_dashboard", fast_ws_dashboard)
 
     with TestClient(main.app) as client:
         with client.websocket_connect("/ws") as ws:
@@ -54,3 +43,33 @@ def test_websocket_updates_with_log(tmp_path, monkeypatch):
                     break
             else:
                 raise AssertionError("WebSocket did not reflect log update")
+
+
+def test_websocket_sends_patches_between_versions(tmp_path, monkeypatch):
+    log_file = tmp_path / "test.log"
+    log_file.write_text(BUY_LINE + "\n")
+
+    async def fast_watch_logs():
+        while True:
+            files = collect_files([str(tmp_path)])
+            main.hub.publish(analyse(pd.DataFrame(iter_records(files))))
+            await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(main, "watch_logs", fast_watch_logs)
+
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/ws?patch=1") as ws:
+            msg = ws.receive_json()
+            while msg["version"] == 0:
+                msg = ws.receive_json()
+            assert msg["type"] == "snapshot"
+            doc = msg["data"]
+
+            with log_file.open("a") as fh:
+                fh.write(BUY_LINE + "\n")
+            msg = ws.receive_json()
+            assert msg["type"] == "patch"
+            assert all(op["path"] != "" for op in msg["ops"])
+            doc = apply_patch(doc, msg["ops"])
+            assert doc["kpi"]["total_buys"] == 2
+            assert doc == main.hub.latest